@@ -89,19 +89,17 @@ class AdvancedPumpDumpDetector:
                 klines_1h = self.binance.get_klines(symbol, '1h', limit=100)
             if order_book is None:
                 try:
-                    order_book = self.binance.client.get_order_book(symbol=symbol, limit=100)
+                    order_book = self.binance.get_order_book(symbol, limit=100)
                 except:
                     order_book = None
             if trades is None:
                 try:
-                    trades = self.binance.client.get_recent_trades(symbol=symbol, limit=500)
+                    trades = self.binance.get_recent_trades(symbol, limit=500)
                 except:
                     trades = []
             if market_data is None:
-                try:
-                    market_data = self.binance.client.get_ticker(symbol=symbol)
-                except:
-                    market_data = {}
+                # Shared bulk ticker snapshot - no per-symbol request
+                market_data = self.binance.get_ticker(symbol) or {}
             
             # Use 5m for main analysis, 1h for confirmation
             klines = klines_5m if klines_5m is not None and not klines_5m.empty else klines_1h
@@ -0,0 +1,293 @@
+"""
+Async Binance Data Client
+asyncio counterpart of BinanceClient for high-fanout market-data scans
+
+A full-market scan is hundreds of independent kline requests. Running them
+on one event loop (aiohttp) instead of a 10-30 thread pool removes the
+per-thread stack cost and the pool-size concurrency cap - the request
+governor becomes the only limiter, as it should be.
+
+AsyncBinanceClient shares the sync client's kline cache, WebSocket hub and
+request governor, so anything it fetches is a cache hit for the sync
+get_klines() calls the analyzers make afterwards.
+
+AsyncLoopThread runs the client on a background event loop so threaded code
+(scanners, Telegram handlers) can call it via BinanceClient.get_klines_batch.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import aiohttp
+from binance.exceptions import BinanceAPIException
+
+from request_governor import current_priority, endpoint_weight, run_in_lane
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_URL = 'https://api.binance.com/api'
+
+
+class AsyncBinanceClient:
+    """
+    Async market-data client sharing a BinanceClient's cache and governor
+
+    Usage:
+        client = AsyncBinanceClient(binance)
+        df = await client.get_klines('BTCUSDT', '1h', limit=200)
+        frames = await client.get_klines_many(symbols, '5m', limit=10)
+        await client.close()
+    """
+
+    def __init__(self, binance, max_concurrency: int = 50, timeout: float = 15.0):
+        """
+        Initialize async client
+
+        Args:
+            binance: BinanceClient whose cache, stream hub and governor are shared
+            max_concurrency: Max requests in flight at once
+            timeout: Per-request timeout in seconds
+        """
+        self.binance = binance
+        self.governor = binance.governor
+        self.api_url = getattr(binance.client, 'API_URL', DEFAULT_API_URL)
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+        # Created on first use, bound to the loop the client runs on
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _ensure_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def close(self):
+        """Close the HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _get(self, endpoint: str, params: Dict):
+        """GET /api/v3/<endpoint>, charged to the shared governor"""
+        session = self._ensure_session()
+        await self.governor.acquire_async(endpoint_weight(endpoint, params))
+
+        async with self._semaphore:
+            async with session.get(f"{self.api_url}/v3/{endpoint}", params=params) as response:
+                self.governor.observe_response(response)
+                text = await response.text()
+                if response.status >= 400:
+                    raise BinanceAPIException(response, response.status, text)
+                return await response.json(content_type=None)
+
+    async def _request_klines(self, symbol: str, interval: str, **params) -> List[List]:
+        return await self._get('klines', {'symbol': symbol, 'interval': interval, **params})
+
+    async def get_klines(self, symbol: str, interval: str, limit: int = 500):
+        """
+        Async BinanceClient.get_klines - same caching, returns DataFrame or None
+        """
+        binance = self.binance
+        try:
+            # Serve from the WebSocket hub when its buffer is warm
+            hub = binance.stream_hub
+            if hub is not None:
+                rows = hub.get_klines(symbol, interval, limit)
+                if rows is not None:
+                    return binance._klines_to_dataframe(rows)
+
+            cached_data = binance._get_cached_klines(symbol, interval, limit)
+            if cached_data is not None:
+                return cached_data
+
+            # Single flight shared with the sync client's threads
+            key = (symbol, interval)
+            waited = False
+            while True:
+                future, owner = binance._inflight.claim(key)
+                cached_data = binance._get_cached_klines(symbol, interval, limit)
+                if cached_data is not None:
+                    if owner:
+                        binance._inflight.release(key, future)
+                    if waited:
+                        binance._inflight.count_coalesced()
+                    return cached_data
+                if owner:
+                    break
+                await asyncio.wrap_future(future)
+                waited = True
+
+            try:
+                return await self._fetch_window(symbol, interval, limit)
+            finally:
+                binance._inflight.release(key, future)
+
+        except BinanceAPIException as e:
+            logger.error(f"Binance API error for {symbol}: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Error getting klines for {symbol} (async): {e!r}")
+            return None
+
+    async def _fetch_window(self, symbol: str, interval: str, limit: int):
+        """Fetch one cache window (caller owns its in-flight slot) - BinanceClient._plan_klines_window over aiohttp"""
+        binance = self.binance
+        plan = binance._plan_klines_window(symbol, interval, limit)
+        try:
+            params = next(plan)
+            while True:
+                params = plan.send(await self._request_klines(symbol, interval, **params))
+        except StopIteration as done:
+            df, exhausted, cached_at = done.value
+
+        if cached_at is None and binance.archive is not None:
+            # Disk writes (and any gap backfill) run off the event loop
+            await asyncio.get_running_loop().run_in_executor(
+                None, binance._archive_klines, symbol, interval, df
+            )
+
+        binance._store_klines_window(symbol, interval, df, exhausted, cached_at)
+        return df.iloc[-limit:]
+
+    async def get_multi_timeframe_data(self, symbol: str, intervals: Iterable[str],
+                                       limit: int = 500) -> Dict:
+        """Async BinanceClient.get_multi_timeframe_data - timeframes fetched concurrently"""
+        intervals = list(intervals)
+        plan = self.binance.plan_timeframes(intervals, limit)
+        fetched = [(i, depth) for i, (source, depth) in plan.items() if i == source]
+        frames = await asyncio.gather(*(self.get_klines(symbol, i, depth) for i, depth in fetched))
+        sources = {i: df for (i, _), df in zip(fetched, frames)}
+
+        data = {}
+        for interval in intervals:
+            df = self.binance._derive_timeframe(symbol, interval, plan, sources, limit)
+            if df is None and plan[interval][0] != interval:
+                df = await self.get_klines(symbol, interval, limit)
+            if df is not None and len(df) > 0:
+                data[interval] = df
+            else:
+                logger.warning(f"No data for {symbol} on {interval}")
+        return data
+
+    async def get_klines_many(self, symbols: Iterable[str], interval: str,
+                              limit: int = 500) -> Dict:
+        """
+        Klines for many symbols at once
+
+        Returns:
+            {symbol: DataFrame or None}
+        """
+        symbols = list(symbols)
+        frames = await asyncio.gather(*(self.get_klines(s, interval, limit) for s in symbols))
+        return dict(zip(symbols, frames))
+
+    async def iter_klines(self, symbols: Iterable[str], interval: str, limit: int = 500,
+                          max_concurrency: Optional[int] = None):
+        """
+        Klines for many symbols, yielded as each one completes
+
+        Args:
+            max_concurrency: Max fetches of this batch in flight (default: client limit)
+
+        Yields:
+            (symbol, DataFrame or None) in completion order
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        async def fetch(symbol):
+            async with semaphore:
+                try:
+                    return symbol, await self.get_klines(symbol, interval, limit)
+                except Exception as e:
+                    logger.error(f"Error getting klines for {symbol} (batch): {e!r}")
+                    return symbol, None
+
+        for next_done in asyncio.as_completed([fetch(s) for s in symbols]):
+            yield await next_done
+
+    async def get_multi_timeframe_many(self, symbols: Iterable[str], intervals: Iterable[str],
+                                       limit: int = 500) -> Dict:
+        """
+        Multi-timeframe klines for many symbols at once
+
+        Each symbol goes through get_multi_timeframe_data, so timeframes
+        planned for resampling are built locally rather than fetched.
+
+        Returns:
+            {symbol: {interval: DataFrame}} (failed timeframes omitted)
+        """
+        symbols = list(symbols)
+        intervals = list(intervals)
+        results = await asyncio.gather(*(
+            self.get_multi_timeframe_data(s, intervals, limit) for s in symbols
+        ))
+        return dict(zip(symbols, results))
+
+
+class AsyncLoopThread:
+    """
+    Event loop on a daemon thread for calling coroutines from threaded code
+
+    Usage:
+        runner = AsyncLoopThread()
+        runner.start()
+        result = runner.run(client.get_klines_many(symbols, '5m', 10))
+    """
+
+    def __init__(self, name: str = 'async-binance'):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the loop thread"""
+        if self.running:
+            return
+        self._started.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        self._started.wait(timeout=5)
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._started.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        """
+        Schedule a coroutine on the loop without waiting
+
+        The coroutine's requests run in the caller's request_priority lane.
+        """
+        if not self.running:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(run_in_lane(coro, current_priority()), self._loop)
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Run a coroutine on the loop and wait for its result"""
+        return self.submit(coro).result(timeout)
+
+    def stop(self):
+        """Stop the loop thread"""
+        if self._loop is not None and self.running:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
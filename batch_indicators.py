@@ -0,0 +1,250 @@
+"""
+Batch Indicator Engine
+RSI / MFI for many symbols at once on stacked (n_symbols, n_bars) arrays
+
+A market scan calls analyze_multi_timeframe() once per symbol, and for the
+small frames it works on (200 candles) pandas' per-call ewm / rolling
+overhead costs far more than the arithmetic. This engine stacks one
+timeframe of every symbol into 2-D arrays and computes the indicators for
+all rows together:
+
+    - rsi_2d: RMA RSI, same recurrence as indicators.calculate_rsi
+    - mfi_2d: windowed MFI, same sums as indicators.calculate_mfi
+
+Shorter histories are right-aligned and NaN-padded at the front; each row
+starts where its data starts, so results match the per-symbol functions.
+analyze_multi_timeframe_batch() returns the same dicts as
+analyze_multi_timeframe() for every symbol.
+"""
+
+import logging
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from indicators import get_signal
+
+logger = logging.getLogger(__name__)
+
+# validate_dataframe() rules
+REQUIRED_COLUMNS = ('high', 'low', 'close', 'volume')
+MIN_BARS = 14
+
+
+def stack_columns(frames: Dict[str, pd.DataFrame],
+                  columns: Iterable[str]) -> Tuple[List[str], Dict[str, np.ndarray], List[pd.Index]]:
+    """
+    Stack DataFrame columns into right-aligned 2-D arrays
+
+    Frames are cleaned like validate_dataframe() - rows with a NaN in
+    high/low/close/volume are dropped and frames left with fewer than
+    MIN_BARS rows (or missing a column) are skipped - without its per-frame
+    pandas overhead.
+
+    Args:
+        frames: {symbol: OHLCV DataFrame}
+        columns: Column names to stack
+
+    Returns:
+        (symbols, {column: float64 array of shape (len(symbols), n_bars)},
+        cleaned frame indexes) - rows are NaN-padded at the front
+    """
+    columns = list(columns)
+    required = [i for i, col in enumerate(columns) if col in REQUIRED_COLUMNS]
+    symbols, blocks, indexes = [], [], []
+    for symbol, df in frames.items():
+        if df is None or len(df) < MIN_BARS or not all(col in df.columns for col in columns):
+            continue
+        block = np.empty((len(columns), len(df)))
+        for i, col in enumerate(columns):
+            values = df[col]
+            if values.dtype != np.float64:
+                values = pd.to_numeric(values, errors='coerce')
+            block[i] = values.to_numpy(dtype=np.float64)
+
+        index = df.index
+        valid = ~np.isnan(block[required]).any(axis=0)
+        if not valid.all():
+            block, index = block[:, valid], index[valid]
+            if len(index) < MIN_BARS:
+                continue
+        symbols.append(symbol)
+        blocks.append(block)
+        indexes.append(index)
+
+    n_bars = max((len(index) for index in indexes), default=0)
+    stacked = np.full((len(columns), len(blocks), n_bars), np.nan)
+    for row, block in enumerate(blocks):
+        stacked[:, row, n_bars - block.shape[1]:] = block
+    return symbols, dict(zip(columns, stacked)), indexes
+
+
+def _started(values: np.ndarray) -> np.ndarray:
+    """Mask of positions at or after each row's first finite value"""
+    return np.logical_or.accumulate(np.isfinite(values), axis=1)
+
+
+def rsi_2d(src: np.ndarray, period: int = 6) -> np.ndarray:
+    """
+    RMA RSI per row (indicators.calculate_rsi on each row)
+
+    Args:
+        src: (n_symbols, n_bars) prices, NaN-padded at the front
+        period: RSI period
+
+    Returns:
+        RSI array of the same shape (NaN before each row's data, and for
+        rows shorter than period + 1)
+    """
+    src = np.asarray(src, dtype=np.float64)
+    started = _started(src)
+
+    delta = np.full_like(src, np.nan)
+    delta[:, 1:] = src[:, 1:] - src[:, :-1]
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+
+    # RMA = EMA with alpha = 1/period; gains before a row starts are 0, so
+    # every row's average is 0 at its first bar, as in pandas ewm(adjust=False)
+    alpha = 1.0 / period
+    avg_gain = np.empty_like(src)
+    avg_loss = np.empty_like(src)
+    g = np.zeros(src.shape[0])
+    l = np.zeros(src.shape[0])
+    for t in range(src.shape[1]):
+        g = (1 - alpha) * g + alpha * gain[:, t]
+        l = (1 - alpha) * l + alpha * loss[:, t]
+        avg_gain[:, t] = g
+        avg_loss[:, t] = l
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+    rsi = np.where(np.isnan(rsi), 100.0, rsi)
+
+    too_short = started.sum(axis=1) < period + 1
+    rsi[~started | too_short[:, None]] = np.nan
+    return rsi
+
+
+def mfi_2d(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+           period: int = 6) -> np.ndarray:
+    """
+    MFI per row (indicators.calculate_mfi on each row)
+
+    Args:
+        high, low, close, volume: (n_symbols, n_bars) arrays, NaN-padded at the front
+        period: MFI period
+
+    Returns:
+        MFI array of the same shape (NaN before each row's data; the first
+        period - 1 bars are 100 like calculate_mfi's fillna)
+    """
+    tp = (np.asarray(high, dtype=np.float64) + low + close) / 3
+    started = _started(tp)
+    mf = tp * volume
+
+    tp_change = np.full_like(tp, np.nan)
+    tp_change[:, 1:] = tp[:, 1:] - tp[:, :-1]
+    positive = np.where(tp_change > 0, mf, 0.0)
+    negative = np.where(tp_change < 0, mf, 0.0)
+
+    positive_sum = np.full_like(tp, np.nan)
+    negative_sum = np.full_like(tp, np.nan)
+    if tp.shape[1] >= period:
+        positive_sum[:, period - 1:] = sliding_window_view(positive, period, axis=1).sum(axis=2)
+        negative_sum[:, period - 1:] = sliding_window_view(negative, period, axis=1).sum(axis=2)
+
+    # A window reaching into the padding has fewer than `period` real bars
+    bars = np.cumsum(started, axis=1)
+    positive_sum[bars < period] = np.nan
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mfi = 100 - (100 / (1 + positive_sum / negative_sum))
+    mfi = np.where(np.isnan(mfi), 100.0, mfi)
+    mfi[~started] = np.nan
+    return mfi
+
+
+def analyze_symbols_batch(frames: Dict[str, pd.DataFrame], rsi_period, mfi_period,
+                          rsi_lower, rsi_upper, mfi_lower, mfi_upper) -> Dict[str, Dict]:
+    """
+    indicators.analyze_symbol() for many symbols on one timeframe
+
+    Args:
+        frames: {symbol: OHLCV DataFrame}
+        Other args: indicator parameters
+
+    Returns:
+        {symbol: analysis dict} for symbols with enough valid data
+    """
+    symbols, arrays, indexes = stack_columns(frames, ('open', 'high', 'low', 'close', 'volume'))
+    if not symbols:
+        return {}
+
+    hlcc4 = (arrays['high'] + arrays['low'] + arrays['close'] + arrays['open']) / 4
+    rsi = rsi_2d(hlcc4, rsi_period)
+    mfi = mfi_2d(arrays['high'], arrays['low'], arrays['close'], arrays['volume'], mfi_period)
+
+    results = {}
+    for row, symbol in enumerate(symbols):
+        index = indexes[row]
+        n = len(index)
+        if n < max(rsi_period, mfi_period) + 1:
+            continue
+
+        latest_rsi, latest_mfi = rsi[row, -1], mfi[row, -1]
+        if np.isnan(latest_rsi) or np.isnan(latest_mfi):
+            continue
+        last_rsi, last_mfi = rsi[row, -2], mfi[row, -2]
+
+        results[symbol] = {
+            'rsi': round(latest_rsi, 2),
+            'mfi': round(latest_mfi, 2),
+            'last_rsi': round(last_rsi, 2),
+            'last_mfi': round(last_mfi, 2),
+            'rsi_change': round(latest_rsi - last_rsi, 2),
+            'mfi_change': round(latest_mfi - last_mfi, 2),
+            'signal': get_signal(latest_rsi, latest_mfi, rsi_lower, rsi_upper, mfi_lower, mfi_upper),
+            'rsi_series': pd.Series(rsi[row, -n:], index=index),
+            'mfi_series': pd.Series(mfi[row, -n:], index=index),
+        }
+    return results
+
+
+def analyze_multi_timeframe_batch(klines_by_symbol: Dict[str, Dict[str, pd.DataFrame]], rsi_period,
+                                  mfi_period, rsi_lower, rsi_upper, mfi_lower, mfi_upper) -> Dict[str, Dict]:
+    """
+    indicators.analyze_multi_timeframe() for many symbols at once
+
+    Each timeframe is evaluated for all symbols in one vectorized pass.
+
+    Args:
+        klines_by_symbol: {symbol: {timeframe: DataFrame}}
+        Other args: indicator parameters
+
+    Returns:
+        {symbol: analyze_multi_timeframe() result}
+    """
+    params = (rsi_period, mfi_period, rsi_lower, rsi_upper, mfi_lower, mfi_upper)
+    timeframes = list(dict.fromkeys(tf for klines in klines_by_symbol.values() for tf in klines))
+
+    results = {symbol: {} for symbol in klines_by_symbol}
+    for tf in timeframes:
+        frames = {symbol: klines[tf] for symbol, klines in klines_by_symbol.items() if tf in klines}
+        for symbol, analysis in analyze_symbols_batch(frames, *params).items():
+            results[symbol][tf] = analysis
+
+    output = {}
+    for symbol, klines in klines_by_symbol.items():
+        # Same timeframe order as the per-symbol analysis
+        timeframe_results = {tf: results[symbol][tf] for tf in klines if tf in results[symbol]}
+        total_signal = sum(a['signal'] for a in timeframe_results.values())
+        output[symbol] = {
+            'timeframes': timeframe_results,
+            'consensus': 'BUY' if total_signal > 0 else 'SELL' if total_signal < 0 else 'NEUTRAL',
+            'consensus_strength': abs(total_signal),
+            'total_signal': total_signal,
+        }
+    return output
@@ -9,17 +9,95 @@ import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 import pandas as pd
+import concurrent.futures
 import logging
 from datetime import datetime, timedelta
+import queue
 import time
+import threading
+from request_governor import get_shared_governor
+from ticker_snapshot import TickerSnapshot
+from exchange_metadata import ExchangeMetadata
+from candles import Candles
+from kline_stream_hub import INTERVAL_MS
 
 logger = logging.getLogger(__name__)
 
+MAX_KLINES_LIMIT = 1000  # Binance klines max limit per request
+DAY_MS = INTERVAL_MS['1d']
+
+
+class InflightFetches:
+    """
+    Single-flight registry for kline fetches, shared by the sync and async paths
+    
+    The first caller for a (symbol, interval) claims it and resolves a
+    concurrent.futures.Future when its fetch is done; callers arriving in the
+    meantime - threads or asyncio tasks - wait on that future and are then
+    served from the cache.
+    """
+    
+    def __init__(self):
+        self._futures = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0  # Callers served by another caller's fetch
+    
+    def claim(self, key):
+        """
+        Returns:
+            (future, owner) - owner is True if the caller must fetch and release()
+        """
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                return future, False
+            future = self._futures[key] = concurrent.futures.Future()
+            return future, True
+    
+    def release(self, key, future):
+        """Wake the waiters (also after a failed fetch - they re-check and retry)"""
+        with self._lock:
+            if self._futures.get(key) is future:
+                del self._futures[key]
+        future.set_result(None)
+    
+    def count_coalesced(self):
+        """Record a caller that waited on another fetch and was served from it"""
+        with self._lock:
+            self.coalesced += 1
+
 
 class BinanceClient:
-    def __init__(self, api_key, api_secret):
-        """Initialize Binance client"""
-        self.client = Client(api_key, api_secret)
+    def __init__(self, api_key, api_secret, use_kline_streams=True, governor=None, archive_dir=None,
+                 api_url=None, stream_url=None, use_depth_streams=True, max_order_books=20,
+                 use_trade_streams=True, max_trade_symbols=200, resample_timeframes=True):
+        """
+        Initialize Binance client
+        
+        Args:
+            api_key: Binance API key
+            api_secret: Binance API secret
+            use_kline_streams: Allow subscribe_klines() to start the WebSocket kline hub
+            governor: RequestGovernor to charge request weight to (default: process-wide)
+            archive_dir: Directory for the on-disk kline archive (None = disabled)
+            api_url: REST base URL override, e.g. a BinanceReplayServer's
+                'http://127.0.0.1:8765/api' (None = api.binance.com)
+            stream_url: WebSocket base URL override for the kline hub and order books (None = Binance)
+            use_depth_streams: Allow track_order_books() to keep local order books
+            max_order_books: Maximum symbols with a live local order book
+            use_trade_streams: Allow track_trade_streams() to start the aggTrade hub
+            max_trade_symbols: Maximum symbols with an aggTrade ring buffer
+            resample_timeframes: Let get_multi_timeframe_data() build coarser
+                timeframes from finer candles instead of fetching them
+        """
+        if api_url:
+            # python-binance builds every URI from the class-level API_URL
+            # (including the ping in Client.__init__), so override it there
+            client_class = type('BinanceClientOverride', (Client,), {'API_URL': api_url.rstrip('/')})
+        else:
+            client_class = Client
+        self.client = client_class(api_key, api_secret)
+        self.stream_url = stream_url
         # Ensure the underlying requests session has a sufficiently large connection pool
         # to avoid "Connection pool is full" warnings when the application makes many
         # concurrent requests (e.g., scanning hundreds of symbols).
@@ -27,80 +105,491 @@ class BinanceClient:
             sess = getattr(self.client, 'session', None)
             if isinstance(sess, requests.Session):
                 # Configure retries and larger pool sizes
-                retry_strategy = Retry(total=3, status_forcelist=[429, 500, 502, 503, 504], backoff_factor=0.3)
+                # (429 is not retried here - the request governor backs off instead,
+                # blind retries of 429s are what escalate to 418 IP bans)
+                retry_strategy = Retry(total=3, status_forcelist=[500, 502, 503, 504], backoff_factor=0.3)
                 adapter = HTTPAdapter(pool_connections=50, pool_maxsize=50, max_retries=retry_strategy)
                 sess.mount('https://', adapter)
                 sess.mount('http://', adapter)
                 logger.info('Configured HTTPAdapter for Binance client (pool_maxsize=50)')
         except Exception as e:
             logger.warning(f'Unable to configure Binance client session adapter: {e}')
-        # Cache for symbol exchange info (to get precisions)
-        self._symbol_info_cache = {}
+        # Exchange info cache (TTL 1h) with precomputed symbol / precision tables
+        self.exchange_meta = ExchangeMetadata(self.client, ttl=3600)
         
         # Cache for klines data - reduce API calls
-        # {(symbol, interval): {'data': df, 'timestamp': datetime}}
+        # {(symbol, interval): {'data': df, 'timestamp': datetime, 'exhausted': bool}}
+        # One entry per (symbol, interval) holds the deepest window fetched so far;
+        # smaller limits are served as a tail slice. Expired entries are kept and
+        # refreshed with a delta fetch (only new candles). 'exhausted' marks entries
+        # that already reach back to the symbol's first candle.
         self._klines_cache = {}
         self._cache_duration = 60  # Cache for 60 seconds
+        self._cache_max_entries = 2000  # Room for ~400 symbols x 4 timeframes between scans
+        self._cache_lock = threading.Lock()
+        
+        # Single-flight: one fetch per (symbol, interval) at a time across
+        # threads and the async client; concurrent callers wait for it and
+        # are then served from the cache
+        self._inflight = InflightFetches()
         
-        # Rate limiting - track API weight usage
-        self._last_request_time = 0
-        self._min_request_interval = 0.1  # Minimum 100ms between requests
+        # On-disk archive of closed candles - cold caches after a restart are
+        # seeded from disk and topped up with a delta fetch
+        self.archive = None
+        if archive_dir:
+            try:
+                from kline_archive import KlineArchive
+                self.archive = KlineArchive(archive_dir)
+                self.archive.prune()
+                logger.info(f"Kline archive enabled at {archive_dir}")
+            except Exception as e:
+                logger.warning(f"Kline archive disabled: {e}")
+        
+        # Bulk 24h ticker snapshot - one weight-80 request per 10s instead of
+        # two requests per symbol in get_24h_data / get_current_price
+        self.ticker_snapshot = TickerSnapshot(self.client, max_age=10)
+        
+        # Rate limiting - every request made through self.client (including direct
+        # self.binance.client.* calls in detectors) is charged its endpoint weight
+        self.governor = governor or get_shared_governor()
+        self.governor.install(self.client)
+        
+        # Shared WebSocket kline hub - started lazily by subscribe_klines()
+        self.use_kline_streams = use_kline_streams
+        self.stream_hub = None
+        self._stream_hub_lock = threading.Lock()
+        
+        # Local L2 order books from depth diff streams - started by track_order_books()
+        self.use_depth_streams = use_depth_streams
+        self.max_order_books = max_order_books
+        self.order_books = None
+        self._order_books_lock = threading.Lock()
+        
+        # aggTrade ring buffers for monitored symbols - started by track_trade_streams()
+        self.use_trade_streams = use_trade_streams
+        self.max_trade_symbols = max_trade_symbols
+        self.trade_hub = None
+        self._trade_hub_lock = threading.Lock()
+        
+        # Higher timeframes derived locally from finer candles (see plan_timeframes)
+        self.resample_timeframes = resample_timeframes
+        
+        # Async client for high-fanout scans - started lazily by get_async_client()
+        self.async_client = None
+        self._async_runner = None
+        self._async_lock = threading.Lock()
         
         logger.info("Binance client initialized")
     
-    def _apply_rate_limit(self):
-        """Apply rate limiting between API requests"""
-        elapsed = time.time() - self._last_request_time
-        if elapsed < self._min_request_interval:
-            time.sleep(self._min_request_interval - elapsed)
-        self._last_request_time = time.time()
+    @property
+    def _coalesced_count(self):
+        """Requests served by another thread's or task's in-flight fetch"""
+        return self._inflight.coalesced
     
-    def _get_cached_klines(self, symbol, interval):
-        """Get klines from cache if available and fresh"""
-        cache_key = (symbol, interval)
-        if cache_key in self._klines_cache:
-            cached = self._klines_cache[cache_key]
+    def get_request_budget(self):
+        """
+        Current Binance request-weight budget (see RequestGovernor.get_budget)
+        
+        Schedulers can use 'available_1m' to decide how many symbols to scan now.
+        """
+        return self.governor.get_budget()
+    
+    def _is_cache_fresh(self, entry):
+        """True if a cache entry is younger than the cache duration"""
+        return (datetime.now() - entry['timestamp']).total_seconds() < self._cache_duration
+    
+    def _get_cached_klines(self, symbol, interval, limit=None):
+        """
+        Get klines from cache if available, fresh and deep enough
+        
+        Returns the last `limit` candles of the cached window. Expired entries
+        stay in the cache so get_klines() can refresh them with a delta fetch.
+        """
+        cached = self._klines_cache.get((symbol, interval))
+        if cached is None or not self._is_cache_fresh(cached):
+            return None
+        
+        df = cached['data']
+        if limit is None:
+            return df
+        if len(df) >= limit or cached.get('exhausted'):
             age = datetime.now() - cached['timestamp']
-            if age.total_seconds() < self._cache_duration:
-                logger.debug(f"Cache hit for {symbol} {interval} (age: {age.total_seconds():.1f}s)")
-                return cached['data']
-            else:
-                # Cache expired, remove it - safe deletion of specific key
-                try:
-                    del self._klines_cache[cache_key]
-                except KeyError:
-                    pass  # Already deleted by another thread
+            logger.debug(f"Cache hit for {symbol} {interval} (age: {age.total_seconds():.1f}s, "
+                         f"{min(limit, len(df))}/{len(df)} candles)")
+            return df.iloc[-limit:]
         return None
     
-    def _cache_klines(self, symbol, interval, df):
-        """Cache klines data"""
+    def _plan_klines_window(self, symbol, interval, limit):
+        """
+        Delta / extend / full fetch of one cache window (caller owns its in-flight slot)
+        
+        Shared by get_klines() and AsyncBinanceClient: a generator that yields
+        the keyword arguments of each klines request (limit / startTime /
+        endTime) and is sent back the rows it returned, so each client makes
+        the requests its own way (see _fetch_klines_window).
+        
+        An expired entry is refreshed with a startTime delta (the last cached
+        candle is usually the still-forming one, so the fetch starts at its
+        open time and replaces it) unless the data is too old for one delta
+        to reach (see _delta_can_reach); a window shallower than `limit` is
+        deepened with an endTime fetch of only the older candles; anything
+        else is a full fetch.
+        
+        Returns (as the generator's return value):
+            (DataFrame, exhausted, cached_at) - exhausted is True when Binance
+            has no older candles (newly listed symbol); cached_at is the
+            entry's timestamp when only older history was added, else None
+        """
+        entry = self._klines_cache.get((symbol, interval))
+        if entry is not None:
+            stale_df, stale_at = entry['data'], entry['timestamp']
+        else:
+            stale_df, stale_at = self._read_archive(symbol, interval, limit)
+        exhausted = bool(entry and entry.get('exhausted'))
+        depth = min(1000, max(limit, len(stale_df) if stale_df is not None else 0))
+        
+        df = None
+        cached_at = None
+        if entry is not None and self._is_cache_fresh(entry):
+            # Fresh but too shallow - only the older candles are missing
+            df = stale_df
+            cached_at = entry['timestamp']
+        elif stale_df is not None and len(stale_df) > 0 and self._delta_can_reach(interval, stale_at, depth):
+            # Expired entry - fetch only the candles newer than what we hold
+            klines = yield {'limit': depth, 'startTime': self._open_time_ms(stale_df, -1)}
+            df = self._merge_klines_delta(stale_df, klines, depth)
+            if df is not None:
+                logger.debug(f"Delta refresh {symbol} {interval}: {len(klines)} new/updated candles")
+        
+        if df is not None and len(df) < limit and not exhausted:
+            missing = limit - len(df)
+            older = yield {'limit': missing, 'endTime': self._open_time_ms(df, 0) - 1}
+            exhausted = len(older) < missing
+            if older:
+                df = self._concat_history(older, df)
+            logger.debug(f"Extended {symbol} {interval} history by {len(older)} candles (depth {len(df)})")
+        
+        if df is None:
+            klines = yield {'limit': depth}
+            exhausted = len(klines) < depth
+            df = self._klines_to_dataframe(klines)
+        
+        return df, exhausted, cached_at
+    
+    def _fetch_klines_window(self, symbol, interval, limit):
+        """_plan_klines_window with blocking python-binance requests"""
+        plan = self._plan_klines_window(symbol, interval, limit)
+        try:
+            params = next(plan)
+            while True:
+                params = plan.send(self.client.get_klines(symbol=symbol, interval=interval, **params))
+        except StopIteration as done:
+            return done.value
+    
+    def _store_klines_window(self, symbol, interval, df, exhausted, cached_at):
+        """Seed the stream hub and cache a window built by _plan_klines_window"""
+        # Seed the stream buffer with the whole merged window (a delta
+        # fetch alone would never fill it) so later calls can skip REST
+        hub = self.stream_hub
+        if hub is not None and hub.is_subscribed(symbol, interval):
+            hub.seed(symbol, interval, Candles.from_frame(df.iloc[-hub.max_candles:]).to_klines())
+        
+        # Cache the full window
+        self._cache_klines(symbol, interval, df, exhausted, cached_at)
+    
+    @staticmethod
+    def _delta_can_reach(interval, stale_at, depth):
+        """
+        False if at least `depth` candles have opened since stale data was
+        current (cache fetch / archive write time) - such a delta response
+        could never be merged, so the full fetch is made straight away
+        """
+        step = INTERVAL_MS.get(interval)
+        if step is None or stale_at is None:
+            return True
+        opened = (datetime.now() - stale_at).total_seconds() * 1000 // step
+        return opened + 1 < depth
+    
+    @staticmethod
+    def _open_time_ms(df, position):
+        """Open time in ms of the candle at `position` (e.g. 0 or -1)"""
+        return int(df.index[position].value // 1_000_000)
+    
+    @classmethod
+    def _merge_klines_delta(cls, cached_df, klines, limit):
+        """
+        Merge a startTime delta response into a cached window
+        
+        Returns:
+            Merged DataFrame, or None if the response can't be merged safely
+        """
+        # Too many new candles to be sure the window is contiguous - refetch fully
+        if not klines or len(klines) >= limit or klines[0][0] != cls._open_time_ms(cached_df, -1):
+            return None
+        
+        new_df = cls._klines_to_dataframe(klines)
+        df = pd.concat([cached_df.iloc[:-1], new_df])
+        return df.iloc[-max(limit, len(cached_df)):]
+    
+    @classmethod
+    def _concat_history(cls, older_klines, df):
+        """Prepend older raw kline rows (endTime response) to a window"""
+        return pd.concat([cls._klines_to_dataframe(older_klines), df])
+    
+    def _cache_klines(self, symbol, interval, df, exhausted=False, timestamp=None):
+        """
+        Cache klines data (the entry holds the deepest window fetched)
+        
+        Args:
+            timestamp: Age of the newest candles - pass the old entry's timestamp
+                when only older history was added so freshness isn't extended
+        """
         cache_key = (symbol, interval)
-        self._klines_cache[cache_key] = {
-            'data': df,
-            'timestamp': datetime.now()
-        }
-        # Keep cache size under control (max 100 entries)
-        if len(self._klines_cache) > 100:
-            try:
-                # Remove oldest entry - use list() to avoid "dictionary changed during iteration" error
-                # Create items list to avoid KeyError if cache changes during min() operation
-                cache_items = [(k, v['timestamp']) for k, v in list(self._klines_cache.items())]
-                if cache_items:
-                    oldest_key = min(cache_items, key=lambda x: x[1])[0]
-                    if oldest_key in self._klines_cache and oldest_key != cache_key:
-                        del self._klines_cache[oldest_key]
-            except (KeyError, ValueError) as e:
-                # Cache was modified by another thread, skip cleanup
-                logger.debug(f"Cache cleanup skipped due to concurrent modification")
-
+        with self._cache_lock:
+            self._klines_cache[cache_key] = {
+                'data': df,
+                'timestamp': timestamp or datetime.now(),
+                'exhausted': exhausted
+            }
+            # Keep cache size under control - remove oldest entry
+            if len(self._klines_cache) > self._cache_max_entries:
+                oldest_key = min(self._klines_cache, key=lambda k: self._klines_cache[k]['timestamp'])
+                if oldest_key != cache_key:
+                    del self._klines_cache[oldest_key]
+    
+    def _read_archive(self, symbol, interval, limit):
+        """
+        Archived candles to seed a cold cache entry
+        
+        Returns:
+            (DataFrame, datetime the file was last written) or (None, None) if not archived
+        """
+        if self.archive is None:
+            return None, None
+        try:
+            written = self.archive.last_write_time(symbol, interval)
+            df = self.archive.read_frame(symbol, interval, min(limit, 1000))
+            if df is None or written is None:
+                return None, None
+            logger.debug(f"Archive hit for {symbol} {interval} ({len(df)} candles)")
+            return df, datetime.fromtimestamp(written)
+        except Exception as e:
+            logger.warning(f"Error reading kline archive for {symbol} {interval}: {e}")
+            return None, None
+    
+    def _archive_klines(self, symbol, interval, df):
+        """
+        Append the closed candles of a freshly fetched window to the archive
+        
+        No backfill: a gap after downtime restarts the file at this window
+        rather than spending requests on history nobody asked for.
+        """
+        if self.archive is None:
+            return
+        try:
+            self.archive.append(symbol, interval, Candles.from_frame(df))
+        except Exception as e:
+            logger.warning(f"Error archiving klines for {symbol} {interval}: {e}")
+    
+    def _claim_fetch(self, symbol, interval, limit):
+        """
+        Wait out other fetches of (symbol, interval) until the cache covers
+        `limit` or this thread may fetch
+        
+        Returns:
+            The cached DataFrame, or the claimed Future to pass to release()
+        """
+        key = (symbol, interval)
+        waited = False
+        while True:
+            future, owner = self._inflight.claim(key)
+            # Re-check - another fetch may have finished since the caller's cache miss
+            cached_data = self._get_cached_klines(symbol, interval, limit)
+            if cached_data is not None:
+                if owner:
+                    self._inflight.release(key, future)
+                if waited:
+                    self._inflight.count_coalesced()
+                return cached_data
+            if owner:
+                return future
+            future.result()
+            waited = True
+    
+    @staticmethod
+    def _klines_to_dataframe(klines):
+        """
+        Convert raw kline rows (REST layout) to the OHLCV DataFrame used everywhere
+        
+        Parsed once into a columnar Candles block; the float columns of the
+        returned frame are views of it (float64, no further conversion needed).
+        """
+        return Candles.from_klines(klines).to_frame()
+    
+    def subscribe_klines(self, symbols, intervals):
+        """
+        Stream klines for symbols over WebSocket so get_klines() can skip REST
+        
+        Starts the shared KlineStreamHub on first use. Buffers become warm
+        after the next REST fetch of each (symbol, interval) seeds them.
+        
+        Args:
+            symbols: List of symbols (e.g. ['BTCUSDT', 'ETHUSDT'])
+            intervals: Interval string or list of intervals
+        
+        Returns:
+            Number of newly subscribed streams (0 if streaming is disabled)
+        """
+        if not self.use_kline_streams:
+            return 0
+        
+        try:
+            with self._stream_hub_lock:
+                if self.stream_hub is None:
+                    from kline_stream_hub import KlineStreamHub
+                    if self.stream_url:
+                        self.stream_hub = KlineStreamHub(stream_url=self.stream_url)
+                    else:
+                        self.stream_hub = KlineStreamHub()
+                    self.stream_hub.start()
+            return self.stream_hub.subscribe(symbols, intervals)
+        except Exception as e:
+            logger.warning(f"Kline streams unavailable, using REST only: {e}")
+            return 0
+    
+    def _get_order_book_manager(self):
+        """Start the shared OrderBookManager on first use"""
+        with self._order_books_lock:
+            if self.order_books is None:
+                from order_book_manager import OrderBookManager
+                fetch = lambda symbol, limit: self.client.get_order_book(symbol=symbol, limit=limit)
+                if self.stream_url:
+                    self.order_books = OrderBookManager(fetch, stream_url=self.stream_url,
+                                                        max_books=self.max_order_books)
+                else:
+                    self.order_books = OrderBookManager(fetch, max_books=self.max_order_books)
+                self.order_books.start()
+            return self.order_books
+    
+    def track_order_books(self, symbols):
+        """
+        Keep live local order books for symbols (e.g. a watchlist)
+        
+        Returns:
+            Number of newly tracked symbols (0 if depth streams are disabled)
+        """
+        if not self.use_depth_streams:
+            return 0
+        try:
+            return self._get_order_book_manager().track(symbols)
+        except Exception as e:
+            logger.warning(f"Depth streams unavailable, using REST only: {e}")
+            return 0
+    
+    def get_order_book(self, symbol, limit=100):
+        """
+        Get the L2 order book (same layout as client.get_order_book)
+        
+        Served from the locally maintained book when the symbol is tracked
+        (track_order_books), in sync and `limit` is within the manager's
+        max_depth; otherwise from REST. Reads never start tracking - a
+        full-market sweep would only churn the books.
+        
+        Args:
+            symbol: Trading symbol
+            limit: Levels per side
+        
+        Returns:
+            {'lastUpdateId': int, 'bids': [[price, qty], ...], 'asks': [[price, qty], ...]}
+        """
+        manager = self.order_books
+        if manager is not None and limit <= manager.max_depth:
+            depth = manager.get_order_book(symbol, limit)
+            if depth is not None:
+                return depth
+        
+        return self.client.get_order_book(symbol=symbol, limit=limit)
+    
+    def track_trade_streams(self, symbols):
+        """
+        Keep aggTrade ring buffers for symbols (e.g. the coins BotMonitor scans)
+        
+        Starts the shared TradeStreamHub on first use. Buffers become warm
+        once the next REST read of each symbol seeds them and a streamed
+        trade joins up with the seed.
+        
+        Returns:
+            Number of newly tracked symbols (0 if trade streams are disabled)
+        """
+        if not self.use_trade_streams:
+            return 0
+        
+        try:
+            with self._trade_hub_lock:
+                if self.trade_hub is None:
+                    from trade_stream_hub import TradeStreamHub
+                    if self.stream_url:
+                        self.trade_hub = TradeStreamHub(stream_url=self.stream_url,
+                                                        max_symbols=self.max_trade_symbols)
+                    else:
+                        self.trade_hub = TradeStreamHub(max_symbols=self.max_trade_symbols)
+                    self.trade_hub.start()
+            return self.trade_hub.track(symbols)
+        except Exception as e:
+            logger.warning(f"Trade streams unavailable, using REST only: {e}")
+            return 0
+    
+    def _tracked_trade_records(self, symbol, limit):
+        """
+        Newest aggregate trades of a tracked symbol as ring-buffer records
+        
+        Served from the ring when warm; otherwise one REST aggTrades call
+        re-seeds it. Returns None for symbols that are not tracked.
+        """
+        hub = self.trade_hub
+        if hub is None or not hub.is_tracked(symbol):
+            return None
+        
+        from trade_stream_hub import agg_trades_to_records
+        records = hub.get_records(symbol, limit)
+        if records is not None:
+            return records
+        
+        rows = self.client.get_aggregate_trades(symbol=symbol, limit=hub.capacity)
+        hub.seed(symbol, rows, complete=len(rows) < hub.capacity)
+        return agg_trades_to_records(rows[-limit:])
+    
+    def get_aggregate_trades(self, symbol, limit=1000):
+        """
+        Get recent aggregate trades (same layout as client.get_aggregate_trades)
+        
+        Tracked symbols are served from their aggTrade ring buffer.
+        """
+        records = self._tracked_trade_records(symbol, limit)
+        if records is None:
+            return self.client.get_aggregate_trades(symbol=symbol, limit=limit)
+        
+        from trade_stream_hub import records_to_agg_trades
+        return records_to_agg_trades(records)
+    
+    def get_recent_trades(self, symbol, limit=500):
+        """
+        Get recent trades (same layout as client.get_recent_trades)
+        
+        Tracked symbols are served from their aggTrade ring buffer - one
+        entry per aggregate trade - instead of the weight-25 trades endpoint.
+        """
+        records = self._tracked_trade_records(symbol, limit)
+        if records is None:
+            return self.client.get_recent_trades(symbol=symbol, limit=limit)
+        
+        from trade_stream_hub import records_to_trades
+        return records_to_trades(records)
+    
     def _load_symbol_info(self, symbol):
-        """Load and cache symbol info from exchange info for precision calculation"""
+        """Get symbol info from the cached exchange metadata"""
         try:
-            if not self._symbol_info_cache:
-                exchange_info = self.client.get_exchange_info()
-                for s in exchange_info.get('symbols', []):
-                    self._symbol_info_cache[s['symbol']] = s
-            return self._symbol_info_cache.get(symbol)
+            return self.exchange_meta.get_symbol_info(symbol)
         except Exception as e:
             logger.error(f"Error loading exchange info: {e}")
             return None
@@ -111,19 +600,7 @@ class BinanceClient:
         Falls back to 8 decimals if unknown.
         """
         try:
-            info = self._load_symbol_info(symbol)
-            if not info:
-                return 8
-
-            for f in info.get('filters', []):
-                if f.get('filterType') == 'PRICE_FILTER':
-                    tick = f.get('tickSize', '0.00000001')
-                    # Count decimals in tickSize
-                    if '.' in tick:
-                        return max(0, len(tick.rstrip('0').split('.')[-1]))
-                    else:
-                        return 0
-            return 8
+            return self.exchange_meta.get_price_precision(symbol)
         except Exception as e:
             logger.error(f"Error getting price precision for {symbol}: {e}")
             return 8
@@ -158,42 +635,18 @@ class BinanceClient:
             excluded_keywords = []
         
         try:
-            # Get exchange info
-            exchange_info = self.client.get_exchange_info()
+            # Tradeable symbols from the cached exchange metadata (no request)
+            symbol_table = self.exchange_meta.get_tradeable_symbols(quote_asset, excluded_keywords)
             
-            # Get 24h ticker for accurate volume data
-            tickers = self.client.get_ticker()
-            # Create dict: symbol -> {volume, price_change, etc}
-            ticker_dict = {}
-            for t in tickers:
-                ticker_dict[t['symbol']] = {
-                    'volume': float(t.get('quoteVolume', 0)),  # Volume in quote asset (USDT)
-                    'base_volume': float(t.get('volume', 0)),  # Volume in base asset
-                    'price_change_percent': float(t.get('priceChangePercent', 0)),
-                    'last_price': float(t.get('lastPrice', 0))
-                }
+            # Get 24h ticker for accurate volume data (shared bulk snapshot)
+            tickers = self.ticker_snapshot.get_all()
             
             valid_symbols = []
             
-            for symbol_info in exchange_info['symbols']:
-                symbol = symbol_info['symbol']
-                
-                # Check if it ends with quote asset
-                if not symbol.endswith(quote_asset):
-                    continue
-                
-                # Check if trading is enabled
-                if symbol_info['status'] != 'TRADING':
-                    continue
-                
-                # Check for excluded keywords
-                if any(keyword in symbol for keyword in excluded_keywords):
-                    logger.debug(f"Excluding {symbol} - contains excluded keyword")
-                    continue
-                
+            for symbol, base_asset, symbol_quote in symbol_table:
                 # Get ticker data
-                ticker_data = ticker_dict.get(symbol, {})
-                quote_volume = ticker_data.get('volume', 0)  # Volume in USDT (quoteVolume)
+                ticker = tickers.get(symbol)
+                quote_volume = float(ticker.get('quoteVolume', 0)) if ticker else 0  # Volume in USDT
                 
                 # Check minimum volume (if min_volume > 0)
                 if min_volume > 0 and quote_volume < min_volume:
@@ -202,10 +655,10 @@ class BinanceClient:
                 
                 valid_symbols.append({
                     'symbol': symbol,
-                    'base_asset': symbol_info['baseAsset'],
-                    'quote_asset': symbol_info['quoteAsset'],
+                    'base_asset': base_asset,
+                    'quote_asset': symbol_quote,
                     'volume': quote_volume,  # Accurate 24h volume in USDT
-                    'price_change_percent': ticker_data.get('price_change_percent', 0)
+                    'price_change_percent': float(ticker.get('priceChangePercent', 0)) if ticker else 0
                 })
             
             logger.info(f"Found {len(valid_symbols)} valid symbols (volume filter: {min_volume:,.0f})")
@@ -255,40 +708,33 @@ class BinanceClient:
             pandas DataFrame with OHLCV data
         """
         try:
-            # Check cache first
-            cached_data = self._get_cached_klines(symbol, interval)
+            # Serve from the WebSocket hub when its buffer is warm
+            hub = self.stream_hub
+            if hub is not None:
+                rows = hub.get_klines(symbol, interval, limit)
+                if rows is not None:
+                    logger.debug(f"Stream hit for {symbol} {interval} ({len(rows)} candles)")
+                    return self._klines_to_dataframe(rows)
+            
+            # Check cache first (tail slice of the deepest cached window)
+            cached_data = self._get_cached_klines(symbol, interval, limit)
             if cached_data is not None:
                 return cached_data
             
-            # Apply rate limiting before API call
-            self._apply_rate_limit()
-            
-            klines = self.client.get_klines(
-                symbol=symbol,
-                interval=interval,
-                limit=limit
-            )
+            future = self._claim_fetch(symbol, interval, limit)
+            if not isinstance(future, concurrent.futures.Future):
+                return future  # Another thread or async task fetched this window
             
-            # Convert to DataFrame
-            df = pd.DataFrame(klines, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_volume', 'trades', 'taker_buy_base',
-                'taker_buy_quote', 'ignore'
-            ])
-            
-            # Convert types - ensure all numeric columns are float
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            for col in ['open', 'high', 'low', 'close', 'volume', 'quote_volume', 
-                       'taker_buy_base', 'taker_buy_quote']:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            
-            df.set_index('timestamp', inplace=True)
-            
-            # Cache the data
-            self._cache_klines(symbol, interval, df)
+            try:
+                df, exhausted, cached_at = self._fetch_klines_window(symbol, interval, limit)
+                if cached_at is None:
+                    self._archive_klines(symbol, interval, df)
+                self._store_klines_window(symbol, interval, df, exhausted, cached_at)
+            finally:
+                self._inflight.release((symbol, interval), future)
             
             logger.debug(f"Fetched {symbol} {interval} from API (cached for {self._cache_duration}s)")
-            return df
+            return df.iloc[-limit:]
             
         except BinanceAPIException as e:
             logger.error(f"Binance API error for {symbol}: {e}")
@@ -297,10 +743,26 @@ class BinanceClient:
             logger.error(f"Error getting klines for {symbol}: {e}")
             return None
     
+    def get_candles(self, symbol, interval, limit=500):
+        """
+        get_klines() as a columnar Candles container (typed array views)
+        
+        Returns:
+            Candles or None
+        """
+        df = self.get_klines(symbol, interval, limit)
+        if df is None:
+            return None
+        return Candles.from_frame(df)
+    
     def get_multi_timeframe_data(self, symbol, intervals, limit=500):
         """
         Get kline data for multiple timeframes
         
+        Timeframes that can be built from a finer one in the same request
+        (see plan_timeframes) are resampled locally, e.g. 4h from 1h for
+        limit <= 249, so ['5m', '1h', '4h', '1d'] costs three requests.
+        
         Args:
             symbol: Trading pair symbol
             intervals: List of intervals (e.g., ['5m', '1h', '4h', '1d'])
@@ -309,10 +771,17 @@ class BinanceClient:
         Returns:
             Dictionary of {interval: DataFrame}
         """
-        data = {}
+        plan = self.plan_timeframes(intervals, limit)
+        sources = {}
+        for interval, (source, depth) in plan.items():
+            if interval == source:
+                sources[interval] = self.get_klines(symbol, interval, depth)
         
+        data = {}
         for interval in intervals:
-            df = self.get_klines(symbol, interval, limit)
+            df = self._derive_timeframe(symbol, interval, plan, sources, limit)
+            if df is None and plan[interval][0] != interval:
+                df = self.get_klines(symbol, interval, limit)
             if df is not None and len(df) > 0:
                 data[interval] = df
             else:
@@ -320,11 +789,257 @@ class BinanceClient:
         
         return data
     
+    def plan_timeframes(self, intervals, limit):
+        """
+        Decide which timeframes to fetch and which to resample locally
+        
+        A timeframe is derived from the coarsest fetched timeframe that
+        divides it (and a day, so buckets match Binance's UTC boundaries)
+        when `limit` of its candles fit in one request of the finer one.
+        The finer fetch is deepened to cover them.
+        
+        Args:
+            intervals: List of intervals
+            limit: Candles wanted per timeframe
+        
+        Returns:
+            {interval: (source_interval, source_limit)} - fetched timeframes
+            map to themselves
+        """
+        plan = {}
+        fetched = []
+        known = sorted((i for i in dict.fromkeys(intervals) if i in INTERVAL_MS), key=INTERVAL_MS.get)
+        for interval in known:
+            step = INTERVAL_MS[interval]
+            source = None
+            if self.resample_timeframes and DAY_MS % step == 0:
+                for candidate in reversed(fetched):
+                    ratio = step // INTERVAL_MS[candidate]
+                    # One extra bucket covers a partial leading bucket
+                    if step % INTERVAL_MS[candidate] == 0 and (limit + 1) * ratio <= MAX_KLINES_LIMIT:
+                        source = candidate
+                        break
+            
+            if source is None:
+                fetched.append(interval)
+                plan[interval] = (interval, limit)
+            else:
+                ratio = step // INTERVAL_MS[source]
+                plan[interval] = (source, limit)
+                depth = max(plan[source][1], (limit + 1) * ratio)
+                plan[source] = (source, depth)
+        
+        for interval in intervals:
+            plan.setdefault(interval, (interval, limit))
+        return plan
+    
+    def _derive_timeframe(self, symbol, interval, plan, sources, limit):
+        """
+        Resample a planned timeframe from its fetched source
+        
+        Returns:
+            DataFrame (the source's tail for fetched timeframes), or None if
+            the source is missing or could not cover `limit` candles
+        """
+        source, depth = plan[interval]
+        df = sources.get(source)
+        if df is None:
+            return None
+        if source == interval:
+            return df.iloc[-limit:]
+        
+        derived = Candles.from_frame(df).resample(INTERVAL_MS[interval])
+        if len(derived) < limit and len(df) >= depth:
+            # More history exists than the source window reaches
+            logger.debug(f"Resampled {symbol} {interval} too shallow ({len(derived)}/{limit}) - fetching")
+            return None
+        
+        derived_df = derived.to_frame()
+        self._cache_derived(symbol, interval, source, derived_df, exhausted=len(df) < depth)
+        return derived_df.iloc[-limit:]
+    
+    def _cache_derived(self, symbol, interval, source, df, exhausted):
+        """
+        Cache a resampled window so later get_klines() calls of the derived
+        timeframe (analyzers asking for e.g. 4h x 100) skip REST
+        
+        The entry takes the source entry's age, so it expires with the
+        candles it was built from. A fresh entry at least as deep is kept.
+        """
+        entry = self._klines_cache.get((symbol, interval))
+        if entry is not None and self._is_cache_fresh(entry) and len(entry['data']) >= len(df):
+            return
+        
+        source_entry = self._klines_cache.get((symbol, source))
+        cached_at = None
+        if source_entry is not None and self._is_cache_fresh(source_entry):
+            cached_at = source_entry['timestamp']
+        self._store_klines_window(symbol, interval, df, exhausted, cached_at)
+    
+    def get_async_client(self):
+        """
+        AsyncBinanceClient sharing this client's cache, stream hub and governor
+        
+        Returns:
+            (AsyncBinanceClient, AsyncLoopThread) - run coroutines with runner.run(coro)
+        """
+        with self._async_lock:
+            if self.async_client is None:
+                from async_binance_client import AsyncBinanceClient, AsyncLoopThread
+                self._async_runner = AsyncLoopThread()
+                self._async_runner.start()
+                self.async_client = AsyncBinanceClient(self)
+            return self.async_client, self._async_runner
+    
+    def close_async_client(self):
+        """Close the async client's HTTP session and stop its loop thread"""
+        with self._async_lock:
+            if self.async_client is None:
+                return
+            try:
+                self._async_runner.run(self.async_client.close(), timeout=5)
+            except Exception as e:
+                logger.debug(f"Error closing async client: {e}")
+            self._async_runner.stop()
+            self.async_client = None
+            self._async_runner = None
+    
+    def get_klines_batch(self, symbols, interval, limit=500, max_concurrency=None, stream=False):
+        """
+        Get klines for many symbols on one interval
+        
+        Fetches run concurrently on the async client (bounded by
+        max_concurrency and the request governor) through the same cache,
+        stream hub and archive as get_klines(). A failing symbol yields None
+        without affecting the rest of the batch.
+        
+        Args:
+            symbols: List of symbols
+            interval: Kline interval
+            limit: Candles per symbol
+            max_concurrency: Max requests of this batch in flight (default: async client limit)
+            stream: Return an iterator of (symbol, df) in completion order, so
+                analysis can start before the whole batch has arrived
+        
+        Returns:
+            {symbol: DataFrame or None} in input order, or an iterator of
+            (symbol, DataFrame or None) if stream=True
+        """
+        symbols = list(dict.fromkeys(symbols))
+        batch = self._iter_klines_batch(symbols, interval, limit, max_concurrency)
+        if stream:
+            return batch
+        
+        results = dict.fromkeys(symbols)
+        for symbol, df in batch:
+            results[symbol] = df
+        return results
+    
+    def _iter_klines_batch(self, symbols, interval, limit, max_concurrency):
+        """Generator behind get_klines_batch (falls back to sequential get_klines)"""
+        if not symbols:
+            return
+        
+        start = time.time()
+        try:
+            client, runner = self.get_async_client()
+        except Exception as e:
+            logger.warning(f"Async client unavailable, fetching batch sequentially: {e}")
+            for symbol in symbols:
+                yield symbol, self.get_klines(symbol, interval, limit)
+            return
+        
+        results = queue.Queue()
+        done = object()
+        
+        async def produce():
+            try:
+                async for item in client.iter_klines(symbols, interval, limit, max_concurrency):
+                    results.put(item)
+            finally:
+                results.put(done)
+        
+        future = runner.submit(produce())
+        loaded = 0
+        try:
+            while True:
+                item = results.get()
+                if item is done:
+                    break
+                loaded += item[1] is not None
+                yield item
+        finally:
+            if not future.done():
+                future.cancel()  # Consumer stopped early
+        
+        logger.info(f"Fetched {loaded}/{len(symbols)} {interval} kline windows "
+                    f"(limit {limit}) in {time.time() - start:.1f}s")
+    
+    def prefetch_klines(self, symbols, intervals, limit=500):
+        """
+        Load klines for many symbols into the cache (get_klines_batch per interval)
+        
+        The per-symbol get_klines() calls that follow are cache hits.
+        
+        Args:
+            symbols: List of symbols
+            intervals: Interval string or list of intervals
+            limit: Candles per (symbol, interval) - use the limit the analyzers request
+        
+        Returns:
+            Number of (symbol, interval) windows loaded
+        """
+        if isinstance(intervals, str):
+            intervals = [intervals]
+        
+        loaded = 0
+        for interval in intervals:
+            frames = self.get_klines_batch(symbols, interval, limit)
+            loaded += sum(1 for df in frames.values() if df is not None and len(df) > 0)
+        return loaded
+    
+    def prefetch_multi_timeframe_data(self, symbols, intervals, limit=500):
+        """
+        prefetch_klines() for a later get_multi_timeframe_data(symbol, intervals, limit)
+        
+        Only the timeframes plan_timeframes() fetches are loaded, at the depth
+        the resampled timeframes need.
+        
+        Returns:
+            Number of (symbol, interval) windows loaded
+        """
+        if isinstance(intervals, str):
+            intervals = [intervals]
+        
+        loaded = 0
+        for interval, (source, depth) in self.plan_timeframes(intervals, limit).items():
+            if interval == source:
+                loaded += self.prefetch_klines(symbols, interval, depth)
+        return loaded
+    
+    def get_ticker(self, symbol):
+        """
+        Get the raw Binance 24hr ticker for a symbol from the bulk snapshot
+        
+        Same fields as client.get_ticker(symbol=...) without a per-symbol request.
+        
+        Returns:
+            Ticker dict or None if the symbol is not listed
+        """
+        try:
+            return self.ticker_snapshot.get(symbol)
+        except Exception as e:
+            logger.error(f"Error getting ticker for {symbol}: {e}")
+            return None
+    
     def get_current_price(self, symbol):
-        """Get current price for a symbol"""
+        """Get current price for a symbol (last price from the ticker snapshot)"""
         try:
-            ticker = self.client.get_symbol_ticker(symbol=symbol)
-            return float(ticker['price'])
+            ticker = self.ticker_snapshot.get(symbol)
+            if ticker is None:
+                logger.error(f"Error getting price for {symbol}: symbol not in ticker snapshot")
+                return None
+            return float(ticker['lastPrice'])
         except Exception as e:
             logger.error(f"Error getting price for {symbol}: {e}")
             return None
@@ -337,7 +1052,10 @@ class BinanceClient:
             Dictionary with high, low, volume, price_change_percent, last_price
         """
         try:
-            ticker = self.client.get_ticker(symbol=symbol)
+            ticker = self.ticker_snapshot.get(symbol)
+            if ticker is None:
+                logger.error(f"Error getting 24h data for {symbol}: symbol not in ticker snapshot")
+                return None
             
             # Get accurate volume data
             quote_volume = float(ticker.get('quoteVolume', 0))  # Volume in USDT
@@ -0,0 +1,657 @@
+"""
+Binance Replay Server
+Local HTTP + WebSocket stand-in for Binance spot market data
+
+Serves recorded (or synthetic) responses for the endpoints the bot uses:
+
+    /api/v3/ping, /api/v3/time, /api/v3/exchangeInfo, /api/v3/klines,
+    /api/v3/ticker/24hr, /api/v3/depth, /api/v1|v3/trades, /api/v3/aggTrades
+    /stream?streams=<symbol>@kline_<interval>/...   (combined kline streams)
+    /stream?streams=<symbol>@depth@100ms            (diff depth streams)
+    /stream?streams=<symbol>@aggTrade               (aggregate trade streams)
+
+WebSocket clients may also SUBSCRIBE / UNSUBSCRIBE streams on a live
+connection, as on Binance.
+
+with configurable latency and Binance-style rate limiting (per-minute
+request weight, X-MBX-USED-WEIGHT-1M headers, 429 + Retry-After, 418 bans),
+so scan throughput can be measured offline and in CI:
+
+    server = BinanceReplayServer(MarketRecording.synthetic(symbols), latency=0.05)
+    server.start()
+    client = BinanceClient(key, secret, api_url=server.api_url, stream_url=server.stream_url)
+
+A replay clock hides candles that open after it; advance() moves it forward
+and pushes the newly visible candles to WebSocket subscribers.
+
+Recordings are captured from the real API with MarketRecording.record() or
+from the command line:
+
+    python binance_replay_server.py record --symbols BTCUSDT ETHUSDT -o market.json
+    python binance_replay_server.py serve --recording market.json --port 8765 --latency 0.05
+    python binance_replay_server.py serve --synthetic 300 --port 8765
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from aiohttp import web, WSMsgType
+
+from kline_stream_hub import INTERVAL_MS, stream_name
+from order_book_manager import depth_stream_name
+from trade_stream_hub import agg_trade_stream_name
+from request_governor import DEFAULT_WEIGHT_LIMIT, endpoint_weight
+
+logger = logging.getLogger(__name__)
+
+
+class MarketRecording:
+    """
+    Recorded Binance market-data responses
+
+    klines are keyed by (symbol, interval); depth / trades / aggTrades by symbol.
+    """
+
+    def __init__(self, exchange_info: Optional[Dict] = None, tickers: Optional[List[Dict]] = None,
+                 klines: Optional[Dict[Tuple[str, str], List[List]]] = None,
+                 depth: Optional[Dict[str, Dict]] = None, trades: Optional[Dict[str, List[Dict]]] = None,
+                 agg_trades: Optional[Dict[str, List[Dict]]] = None):
+        self.exchange_info = exchange_info or {'timezone': 'UTC', 'rateLimits': [], 'symbols': []}
+        self.tickers = tickers or []
+        self.klines = klines or {}
+        self.depth = depth or {}
+        self.trades = trades or {}
+        self.agg_trades = agg_trades or {}
+
+    @property
+    def symbols(self) -> List[str]:
+        return [s['symbol'] for s in self.exchange_info.get('symbols', [])]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: str):
+        """Write the recording as JSON"""
+        with open(path, 'w') as f:
+            json.dump({
+                'exchange_info': self.exchange_info,
+                'tickers': self.tickers,
+                'klines': {f"{s}|{i}": rows for (s, i), rows in self.klines.items()},
+                'depth': self.depth,
+                'trades': self.trades,
+                'agg_trades': self.agg_trades,
+            }, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'MarketRecording':
+        """Read a recording written by save()"""
+        with open(path) as f:
+            data = json.load(f)
+        klines = {tuple(key.split('|', 1)): rows for key, rows in data.get('klines', {}).items()}
+        return cls(data.get('exchange_info'), data.get('tickers'), klines,
+                   data.get('depth'), data.get('trades'), data.get('agg_trades'))
+
+    @classmethod
+    def record(cls, client, symbols: Iterable[str], intervals: Iterable[str] = ('5m', '1h', '4h', '1d'),
+               limit: int = 1000) -> 'MarketRecording':
+        """
+        Capture responses from a live python-binance Client
+
+        Args:
+            client: python-binance Client (or BinanceClient.client)
+            symbols: Symbols to record
+            intervals: Kline intervals to record
+            limit: Candles per (symbol, interval)
+        """
+        symbols = list(symbols)
+        wanted = set(symbols)
+        exchange_info = client.get_exchange_info()
+        exchange_info['symbols'] = [s for s in exchange_info['symbols'] if s['symbol'] in wanted]
+        tickers = [t for t in client.get_ticker() if t['symbol'] in wanted]
+
+        recording = cls(exchange_info, tickers)
+        for symbol in symbols:
+            for interval in intervals:
+                recording.klines[(symbol, interval)] = client.get_klines(
+                    symbol=symbol, interval=interval, limit=limit
+                )
+            recording.depth[symbol] = client.get_order_book(symbol=symbol, limit=100)
+            recording.trades[symbol] = client.get_recent_trades(symbol=symbol, limit=500)
+            recording.agg_trades[symbol] = client.get_aggregate_trades(symbol=symbol, limit=500)
+            logger.info(f"Recorded {symbol}")
+        return recording
+
+    @classmethod
+    def synthetic(cls, symbols: Iterable[str], intervals: Iterable[str] = ('5m', '1h', '4h', '1d'),
+                  n_candles: int = 1000, seed: int = 0, end_ms: Optional[int] = None) -> 'MarketRecording':
+        """
+        Random-walk market for any number of symbols (no network needed)
+
+        Args:
+            symbols: Symbol names (e.g. [f'C{i}USDT' for i in range(300)])
+            intervals: Kline intervals (fixed-length intervals only)
+            n_candles: Candles per (symbol, interval)
+            seed: RNG seed (recordings are reproducible)
+            end_ms: Open time of the newest candle is the last one before this (default: now)
+        """
+        rng = np.random.default_rng(seed)
+        end_ms = end_ms if end_ms is not None else int(time.time() * 1000)
+        recording = cls()
+
+        for symbol in symbols:
+            base = symbol[:-4] if symbol.endswith('USDT') else symbol[:-3]
+            quote = symbol[len(base):]
+            price0 = float(10 ** rng.uniform(-2, 4))
+            tick = 10 ** (np.floor(np.log10(price0)) - 4)
+            recording.exchange_info['symbols'].append({
+                'symbol': symbol, 'status': 'TRADING', 'baseAsset': base, 'quoteAsset': quote,
+                'filters': [{'filterType': 'PRICE_FILTER', 'minPrice': f'{tick:.8f}',
+                             'maxPrice': '1000000.00000000', 'tickSize': f'{tick:.8f}'}],
+            })
+
+            for interval in intervals:
+                step = INTERVAL_MS[interval]
+                first_open = (end_ms // step - n_candles + 1) * step
+                returns = rng.normal(0, 0.01, n_candles)
+                close = price0 * np.exp(np.cumsum(returns))
+                open_ = np.concatenate([[price0], close[:-1]])
+                spread = np.abs(rng.normal(0, 0.005, n_candles)) * close
+                high = np.maximum(open_, close) + spread
+                low = np.minimum(open_, close) - spread
+                volume = rng.lognormal(8, 1, n_candles)
+                trades = rng.integers(50, 5000, n_candles)
+                taker = rng.uniform(0.3, 0.7, n_candles)
+
+                recording.klines[(symbol, interval)] = [
+                    [first_open + i * step, f'{open_[i]:.8f}', f'{high[i]:.8f}', f'{low[i]:.8f}',
+                     f'{close[i]:.8f}', f'{volume[i]:.8f}', first_open + (i + 1) * step - 1,
+                     f'{volume[i] * close[i]:.8f}', int(trades[i]), f'{volume[i] * taker[i]:.8f}',
+                     f'{volume[i] * taker[i] * close[i]:.8f}', '0']
+                    for i in range(n_candles)
+                ]
+
+            last = float(close[-1])
+            recording.tickers.append({
+                'symbol': symbol, 'priceChange': f'{last - price0:.8f}',
+                'priceChangePercent': f'{(last / price0 - 1) * 100:.3f}',
+                'lastPrice': f'{last:.8f}', 'openPrice': f'{price0:.8f}',
+                'highPrice': f'{last * 1.05:.8f}', 'lowPrice': f'{last * 0.95:.8f}',
+                'volume': f'{float(volume.sum()):.8f}', 'quoteVolume': f'{float((volume * close).sum()):.8f}',
+                'count': int(trades.sum()),
+            })
+            recording.depth[symbol] = {
+                'lastUpdateId': 1,
+                'bids': [[f'{last * (1 - 0.0005 * (k + 1)):.8f}', f'{rng.lognormal(2, 1):.8f}'] for k in range(100)],
+                'asks': [[f'{last * (1 + 0.0005 * (k + 1)):.8f}', f'{rng.lognormal(2, 1):.8f}'] for k in range(100)],
+            }
+            trade_times = end_ms - np.sort(rng.integers(0, 600_000, 500))[::-1]
+            prices = last * (1 + rng.normal(0, 0.001, 500))
+            qtys = rng.lognormal(0, 1, 500)
+            makers = rng.random(500) < 0.5
+            recording.trades[symbol] = [
+                {'id': k + 1, 'price': f'{prices[k]:.8f}', 'qty': f'{qtys[k]:.8f}',
+                 'quoteQty': f'{prices[k] * qtys[k]:.8f}', 'time': int(trade_times[k]),
+                 'isBuyerMaker': bool(makers[k]), 'isBestMatch': True}
+                for k in range(500)
+            ]
+            recording.agg_trades[symbol] = [
+                {'a': k + 1, 'p': f'{prices[k]:.8f}', 'q': f'{qtys[k]:.8f}', 'f': k + 1, 'l': k + 1,
+                 'T': int(trade_times[k]), 'm': bool(makers[k]), 'M': True}
+                for k in range(500)
+            ]
+
+        return recording
+
+
+class BinanceReplayServer:
+    """
+    Local Binance stand-in serving a MarketRecording
+
+    Usage:
+        server = BinanceReplayServer(recording, latency=0.05, weight_limit=6000)
+        server.start()
+        ... BinanceClient(key, secret, api_url=server.api_url, stream_url=server.stream_url)
+        server.stats()
+        server.stop()
+    """
+
+    def __init__(self, recording: MarketRecording, host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.0,
+                 weight_limit: Optional[int] = DEFAULT_WEIGHT_LIMIT, window_seconds: float = 60.0,
+                 retry_after: int = 10, ban_after: int = 5, ban_seconds: int = 120,
+                 clock_ms: Optional[int] = None):
+        """
+        Initialize replay server
+
+        Args:
+            recording: Responses to serve
+            host, port: Bind address (port 0 = pick a free port)
+            latency: Seconds added to every HTTP response
+            jitter: Extra uniform random latency in [0, jitter] seconds
+            weight_limit: Request weight allowed per window (None = unlimited)
+            window_seconds: Length of the weight window (60 on Binance)
+            retry_after: Retry-After seconds sent with 429s
+            ban_after: 429s in one window before answering 418 (IP ban)
+            ban_seconds: Retry-After seconds sent with 418s
+            clock_ms: Replay clock - candles opening after it are hidden (None = all visible)
+        """
+        self.recording = recording
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.weight_limit = weight_limit
+        self.window_seconds = window_seconds
+        self.retry_after = retry_after
+        self.ban_after = ban_after
+        self.ban_seconds = ban_seconds
+        self.clock_ms = clock_ms
+
+        self._window_start = time.time()
+        self._window_weight = 0
+        self._window_429s = 0
+        self._banned_until = 0.0
+
+        self.request_counts: Counter = Counter()
+        self.total_weight = 0
+        self.rejected = 0
+
+        self._ws_clients: Dict[web.WebSocketResponse, set] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    @property
+    def api_url(self) -> str:
+        """Value for BinanceClient(api_url=...) (python-binance API_URL layout)"""
+        return f"http://{self.host}:{self.port}/api"
+
+    @property
+    def stream_url(self) -> str:
+        """Value for BinanceClient(stream_url=...) / KlineStreamHub(stream_url=...)"""
+        return f"ws://{self.host}:{self.port}"
+
+    def start(self):
+        """Start serving on a background thread"""
+        self._thread = threading.Thread(target=self._run, name='binance-replay', daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout=5):
+            raise RuntimeError("Binance replay server failed to start")
+        logger.info(f"Binance replay server on {self.api_url} "
+                    f"({len(self.recording.symbols)} symbols, latency {self.latency * 1000:.0f}ms)")
+
+    def stop(self):
+        """Close connections and stop the server"""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        loop.run_until_complete(self._serve())
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    async def _serve(self):
+        app = web.Application()
+        for version in ('v1', 'v3'):
+            app.router.add_get(f'/api/{version}/{{endpoint:.+}}', self._handle_rest)
+        app.router.add_get('/stream', self._handle_stream)
+        app.router.add_get('/ws/{stream}', self._handle_stream)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def _shutdown(self):
+        for ws in list(self._ws_clients):
+            await ws.close()
+        await self._runner.cleanup()
+
+    # ------------------------------------------------------------------
+    # Rate limiting
+    # ------------------------------------------------------------------
+
+    def _charge(self, weight: int) -> Tuple[Optional[int], int]:
+        """
+        Charge request weight
+
+        Returns:
+            (rejection status or None, weight used in the current window)
+        """
+        now = time.time()
+        if now - self._window_start >= self.window_seconds:
+            self._window_start = now - (now - self._window_start) % self.window_seconds
+            self._window_weight = 0
+            self._window_429s = 0
+
+        if now < self._banned_until:
+            return 418, self._window_weight
+
+        self._window_weight += weight
+        self.total_weight += weight
+        if self.weight_limit is not None and self._window_weight > self.weight_limit:
+            self._window_429s += 1
+            if self._window_429s > self.ban_after:
+                self._banned_until = now + self.ban_seconds
+                return 418, self._window_weight
+            return 429, self._window_weight
+        return None, self._window_weight
+
+    # ------------------------------------------------------------------
+    # REST
+    # ------------------------------------------------------------------
+
+    async def _handle_rest(self, request: web.Request) -> web.Response:
+        endpoint = request.match_info['endpoint']
+        params = dict(request.query)
+        self.request_counts[endpoint] += 1
+
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+
+        status, used = self._charge(endpoint_weight(endpoint, params))
+        headers = {'X-MBX-USED-WEIGHT-1M': str(used)}
+        if status is not None:
+            self.rejected += 1
+            retry = self.ban_seconds if status == 418 else self.retry_after
+            headers['Retry-After'] = str(retry)
+            msg = 'Way too many requests; IP banned.' if status == 418 else 'Too many requests.'
+            return web.json_response({'code': -1003, 'msg': msg}, status=status, headers=headers)
+
+        try:
+            body = self._respond(endpoint, params)
+        except KeyError as e:
+            return web.json_response({'code': -1121, 'msg': f'Invalid symbol. ({e})'},
+                                     status=400, headers=headers)
+        if body is None:
+            return web.json_response({'code': -1100, 'msg': f'Unsupported endpoint {endpoint}'},
+                                     status=404, headers=headers)
+        return web.json_response(body, headers=headers)
+
+    def _respond(self, endpoint: str, params: Dict):
+        rec = self.recording
+        if endpoint == 'ping':
+            return {}
+        if endpoint == 'time':
+            return {'serverTime': self.clock_ms if self.clock_ms is not None else int(time.time() * 1000)}
+        if endpoint == 'exchangeInfo':
+            return rec.exchange_info
+        if endpoint == 'klines':
+            return self._klines(params)
+        if endpoint == 'ticker/24hr':
+            if 'symbol' in params:
+                return next(t for t in rec.tickers if t['symbol'] == params['symbol'])
+            return rec.tickers
+        if endpoint == 'depth':
+            book = rec.depth[params['symbol']]
+            limit = int(params.get('limit', 100))
+            return {'lastUpdateId': book['lastUpdateId'], 'bids': book['bids'][:limit], 'asks': book['asks'][:limit]}
+        if endpoint == 'trades':
+            return rec.trades[params['symbol']][-int(params.get('limit', 500)):]
+        if endpoint == 'aggTrades':
+            return rec.agg_trades[params['symbol']][-int(params.get('limit', 500)):]
+        return None
+
+    def _visible_klines(self, symbol: str, interval: str) -> List[List]:
+        rows = self.recording.klines[(symbol, interval)]
+        if self.clock_ms is None:
+            return rows
+        # Rows are sorted by open time - bisect on the replay clock
+        lo, hi = 0, len(rows)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if rows[mid][0] <= self.clock_ms:
+                lo = mid + 1
+            else:
+                hi = mid
+        return rows[:lo]
+
+    def _klines(self, params: Dict) -> List[List]:
+        rows = self._visible_klines(params['symbol'], params['interval'])
+        limit = min(int(params.get('limit', 500)), 1000)
+        start = int(params['startTime']) if 'startTime' in params else None
+        end = int(params['endTime']) if 'endTime' in params else None
+
+        if end is not None:
+            rows = [r for r in rows if r[0] <= end]
+        if start is not None:
+            return [r for r in rows if r[0] >= start][:limit]
+        return rows[-limit:]
+
+    # ------------------------------------------------------------------
+    # WebSocket
+    # ------------------------------------------------------------------
+
+    async def _handle_stream(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        streams = request.query.get('streams') or request.match_info.get('stream', '')
+        self._ws_clients[ws] = set(s for s in streams.split('/') if s)
+        try:
+            async for message in ws:
+                if message.type == WSMsgType.ERROR:
+                    break
+                if message.type == WSMsgType.TEXT:
+                    await self._handle_ws_request(ws, message.data)
+        finally:
+            self._ws_clients.pop(ws, None)
+        return ws
+
+    async def _handle_ws_request(self, ws: web.WebSocketResponse, data: str):
+        """Live SUBSCRIBE / UNSUBSCRIBE / LIST_SUBSCRIPTIONS requests"""
+        try:
+            request = json.loads(data)
+        except ValueError:
+            return
+        method = request.get('method')
+        streams = self._ws_clients.get(ws)
+        if streams is None:
+            return
+        result = None
+        if method == 'SUBSCRIBE':
+            streams.update(request.get('params', []))
+        elif method == 'UNSUBSCRIBE':
+            streams.difference_update(request.get('params', []))
+        elif method == 'LIST_SUBSCRIPTIONS':
+            result = sorted(streams)
+        await ws.send_str(json.dumps({'result': result, 'id': request.get('id')}))
+
+    @staticmethod
+    def _kline_message(symbol: str, interval: str, row: List, closed: bool) -> str:
+        return json.dumps({
+            'stream': stream_name(symbol, interval),
+            'data': {
+                'e': 'kline', 'E': int(time.time() * 1000), 's': symbol,
+                'k': {
+                    't': row[0], 'T': row[6], 's': symbol, 'i': interval,
+                    'o': str(row[1]), 'h': str(row[2]), 'l': str(row[3]), 'c': str(row[4]),
+                    'v': str(row[5]), 'q': str(row[7]), 'n': int(row[8]),
+                    'V': str(row[9]), 'Q': str(row[10]), 'x': closed,
+                },
+            },
+        })
+
+    async def _broadcast(self, messages: List[Tuple[str, str]]):
+        for ws, streams in list(self._ws_clients.items()):
+            for name, message in messages:
+                if name in streams:
+                    try:
+                        await ws.send_str(message)
+                    except Exception:
+                        pass
+
+    def push_depth_update(self, symbol: str, bids: List[List[str]] = (), asks: List[List[str]] = (),
+                          deliver: bool = True) -> Dict:
+        """
+        Apply a depth change to the recorded book and stream it as a depthUpdate
+
+        Later REST snapshots include the change. deliver=False applies it
+        without streaming it, which simulates a missed event (sequence gap).
+
+        Args:
+            symbol: Symbol whose book changes
+            bids, asks: [[price, qty], ...] levels; qty '0' removes the level
+
+        Returns:
+            The depthUpdate event
+        """
+        book = self.recording.depth[symbol]
+        first_id = book['lastUpdateId'] + 1
+        book['lastUpdateId'] = first_id + max(len(bids) + len(asks) - 1, 0)
+
+        for key, levels, descending in (('bids', bids, True), ('asks', asks, False)):
+            side = {float(p): [p, q] for p, q in book[key]}
+            for price, qty in levels:
+                if float(qty) == 0:
+                    side.pop(float(price), None)
+                else:
+                    side[float(price)] = [price, qty]
+            book[key] = [side[p] for p in sorted(side, reverse=descending)]
+
+        event = {'e': 'depthUpdate', 'E': int(time.time() * 1000), 's': symbol,
+                 'U': first_id, 'u': book['lastUpdateId'],
+                 'b': [list(level) for level in bids], 'a': [list(level) for level in asks]}
+        if deliver and self._loop is not None:
+            name = depth_stream_name(symbol)
+            message = json.dumps({'stream': name, 'data': event})
+            asyncio.run_coroutine_threadsafe(self._broadcast([(name, message)]), self._loop).result(timeout=10)
+        return event
+
+    def push_agg_trade(self, symbol: str, price: str, qty: str, is_buyer_maker: bool = False,
+                       deliver: bool = True) -> Dict:
+        """
+        Record a new aggregate trade and stream it to @aggTrade subscribers
+
+        deliver=False records it without streaming it (a missed event).
+
+        Returns:
+            The aggTrade event
+        """
+        agg_trades = self.recording.agg_trades.setdefault(symbol, [])
+        trades = self.recording.trades.setdefault(symbol, [])
+        agg_id = agg_trades[-1]['a'] + 1 if agg_trades else 1
+        trade_id = trades[-1]['id'] + 1 if trades else 1
+        now = self.clock_ms if self.clock_ms is not None else int(time.time() * 1000)
+
+        agg_trades.append({'a': agg_id, 'p': price, 'q': qty, 'f': trade_id, 'l': trade_id,
+                           'T': now, 'm': is_buyer_maker, 'M': True})
+        trades.append({'id': trade_id, 'price': price, 'qty': qty,
+                       'quoteQty': f'{float(price) * float(qty):.8f}', 'time': now,
+                       'isBuyerMaker': is_buyer_maker, 'isBestMatch': True})
+
+        event = {'e': 'aggTrade', 'E': now, 's': symbol, **agg_trades[-1]}
+        if deliver and self._loop is not None:
+            name = agg_trade_stream_name(symbol)
+            message = json.dumps({'stream': name, 'data': event})
+            asyncio.run_coroutine_threadsafe(self._broadcast([(name, message)]), self._loop).result(timeout=10)
+        return event
+
+    @property
+    def ws_client_count(self) -> int:
+        return len(self._ws_clients)
+
+    def advance(self, ms: int):
+        """
+        Move the replay clock forward
+
+        Candles that become visible are pushed to WebSocket subscribers
+        (closed ones with x=true, the newest one as the forming candle).
+        """
+        old_clock = self.clock_ms
+        if old_clock is None:
+            raise ValueError("advance() needs a replay clock (clock_ms)")
+        self.clock_ms = old_clock + ms
+
+        messages = []
+        for (symbol, interval), rows in self.recording.klines.items():
+            visible = self._visible_klines(symbol, interval)
+            new = [r for r in visible if r[0] > old_clock - INTERVAL_MS.get(interval, 0)]
+            for row in new:
+                closed = row[6] < self.clock_ms
+                messages.append((stream_name(symbol, interval),
+                                 self._kline_message(symbol, interval, row, closed)))
+        if messages and self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._broadcast(messages), self._loop).result(timeout=10)
+
+    def stats(self) -> Dict:
+        """Request counts per endpoint, weight served and rejections"""
+        return {
+            'requests': dict(self.request_counts),
+            'total_requests': sum(self.request_counts.values()),
+            'total_weight': self.total_weight,
+            'window_weight': self._window_weight,
+            'rejected': self.rejected,
+            'ws_clients': self.ws_client_count,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Binance market-data record/replay stand-in")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    rec = sub.add_parser('record', help='Record live responses to a JSON file')
+    rec.add_argument('--symbols', nargs='+', required=True)
+    rec.add_argument('--intervals', nargs='+', default=['5m', '1h', '4h', '1d'])
+    rec.add_argument('--limit', type=int, default=1000)
+    rec.add_argument('-o', '--output', required=True)
+
+    serve = sub.add_parser('serve', help='Serve a recording (or a synthetic market)')
+    serve.add_argument('--recording')
+    serve.add_argument('--synthetic', type=int, help='Number of synthetic USDT symbols')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--latency', type=float, default=0.0)
+    serve.add_argument('--jitter', type=float, default=0.0)
+    serve.add_argument('--weight-limit', type=int, default=DEFAULT_WEIGHT_LIMIT)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.command == 'record':
+        from binance.client import Client
+        MarketRecording.record(Client(), args.symbols, args.intervals, args.limit).save(args.output)
+        print(f"Saved {len(args.symbols)} symbols to {args.output}")
+        return
+
+    if args.recording:
+        recording = MarketRecording.load(args.recording)
+    else:
+        recording = MarketRecording.synthetic([f'SYM{i}USDT' for i in range(args.synthetic or 50)])
+
+    server = BinanceReplayServer(recording, host=args.host, port=args.port, latency=args.latency,
+                                 jitter=args.jitter, weight_limit=args.weight_limit)
+    server.start()
+    print(f"Serving {len(recording.symbols)} symbols - api_url={server.api_url} stream_url={server.stream_url}")
+    try:
+        while True:
+            time.sleep(60)
+            print(server.stats())
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
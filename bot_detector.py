@@ -41,16 +41,18 @@ class BotDetector:
         """
         try:
             # 1. Get Order Book Depth
-            depth = self.binance.client.get_order_book(symbol=symbol, limit=100)
+            depth = self.binance.get_order_book(symbol, limit=100)
             
             # 2. Get Recent Trades
-            trades = self.binance.client.get_recent_trades(symbol=symbol, limit=500)
+            trades = self.binance.get_recent_trades(symbol, limit=500)
             
             # 3. Get Aggregate Trades (for timing analysis)
-            agg_trades = self.binance.client.get_aggregate_trades(symbol=symbol, limit=1000)
+            agg_trades = self.binance.get_aggregate_trades(symbol, limit=1000)
             
-            # 4. Get 24h data for pump detection
-            ticker_24h = self.binance.client.get_ticker(symbol=symbol)
+            # 4. Get 24h data for pump detection (shared bulk ticker snapshot)
+            ticker_24h = self.binance.get_ticker(symbol)
+            if ticker_24h is None:
+                raise ValueError(f"No 24h ticker for {symbol}")
             
             # 5. Get recent klines for price action analysis
             klines = self.binance.get_klines(symbol, '5m', limit=100)
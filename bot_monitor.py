@@ -89,8 +89,8 @@ class BotMonitor:
             else:
                 logger.info(f"Fetching ALL USDT coins...")
             
-            # Get all USDT pairs ticker
-            tickers = self.binance.client.get_ticker()
+            # Get all USDT pairs ticker (shared bulk snapshot)
+            tickers = self.binance.ticker_snapshot.get_all().values()
             
             # Filter USDT pairs only
             usdt_pairs = [
@@ -164,6 +164,37 @@ class BotMonitor:
         
         logger.info("Bot monitor loop stopped")
     
+    def _track_trade_streams(self, symbols):
+        """
+        Monitor the scanned symbols' aggTrade streams
+        
+        Warm trade buffers serve BotDetector's trade reads from memory, so the
+        scan no longer needs a pause between coins (REST fallbacks are paced
+        by the request governor). 'all' mode lists coins by volume, so the
+        most active ones get the buffers.
+        """
+        try:
+            symbols = [s if s.endswith('USDT') else s + 'USDT' for s in symbols]
+            self.binance.track_trade_streams(symbols[:self.binance.max_trade_symbols])
+        except Exception as e:
+            logger.warning(f"Could not track trade streams: {e}")
+    
+    def _track_order_books(self, symbols):
+        """
+        Keep live local order books for watchlist coins
+        
+        Only in 'watchlist' mode - an 'all' sweep reads every USDT pair once
+        per cycle, far more than the order book limit, so those reads stay
+        on REST instead of churning the books.
+        """
+        if self.scan_mode != 'watchlist':
+            return
+        try:
+            symbols = [s if s.endswith('USDT') else s + 'USDT' for s in symbols]
+            self.binance.track_order_books(symbols[:self.binance.max_order_books])
+        except Exception as e:
+            logger.warning(f"Could not track order books: {e}")
+    
     def _scan_bot_activity(self, symbols):
         """
         Scan symbols for bot activity and pump patterns
@@ -175,6 +206,8 @@ class BotMonitor:
             List of detections requiring alerts
         """
         detections = []
+        self._track_trade_streams(symbols)
+        self._track_order_books(symbols)
         
         for symbol in symbols:
             try:
@@ -220,9 +253,6 @@ class BotMonitor:
                 else:
                     logger.debug(f"No alert for {symbol} - Bot: {bot_score}%, Pump: {pump_score}%")
                 
-                # Small delay between API calls
-                time.sleep(0.5)
-                
             except Exception as e:
                 logger.error(f"Error scanning {symbol}: {e}")
                 continue
@@ -334,6 +364,8 @@ class BotMonitor:
             
             logger.info(f"Manual bot scan for {len(symbols)} symbols (mode: {self.scan_mode})")
             detections = []
+            self._track_trade_streams(symbols)
+            self._track_order_books(symbols)
             
             for symbol in symbols:
                 try:
@@ -345,8 +377,6 @@ class BotMonitor:
                     if detection:
                         detections.append(detection)
                     
-                    time.sleep(0.5)
-                    
                 except Exception as e:
                     logger.error(f"Error in manual scan for {symbol}: {e}")
             
@@ -0,0 +1,211 @@
+"""
+Columnar Candle Container
+Array-backed OHLCV candles parsed once from raw Binance kline rows
+
+Klines arrive as lists of strings. Candles converts them to typed NumPy
+arrays in one pass: the float columns live in a single contiguous
+(8, n) float64 block (one row per column), so each column is a contiguous
+view and to_frame() can wrap the block in a DataFrame without copying.
+Detectors that work on arrays can use Candles.from_frame(df) to get the
+same views back instead of calling pd.to_numeric / .copy() / .iloc[i].
+"""
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+# Float columns in block order, with their index in a REST kline row
+FLOAT_COLUMNS = ('open', 'high', 'low', 'close', 'volume',
+                 'quote_volume', 'taker_buy_base', 'taker_buy_quote')
+_FLOAT_ROW_INDEX = [1, 2, 3, 4, 5, 7, 9, 10]
+
+# Integer columns: open time (index), close time and trade count
+_TIMESTAMP_ROW_INDEX = 0
+_CLOSE_TIME_ROW_INDEX = 6
+_TRADES_ROW_INDEX = 8
+
+
+class Candles:
+    """
+    Columnar OHLCV candles
+
+    Attributes:
+        timestamp: int64 open times in ms
+        close_time: int64 close times in ms
+        trades: int64 trade counts
+        open, high, low, close, volume, quote_volume, taker_buy_base,
+        taker_buy_quote: contiguous float64 views into one block
+
+    Usage:
+        candles = Candles.from_klines(client.get_klines(...))
+        candles.close[-1]
+        df = candles.to_frame()          # zero-copy DataFrame
+        candles = Candles.from_frame(df) # views back from a frame
+    """
+
+    __slots__ = ('timestamp', 'close_time', 'trades', '_block') + FLOAT_COLUMNS
+
+    def __init__(self, timestamp: np.ndarray, block: np.ndarray,
+                 close_time: np.ndarray = None, trades: np.ndarray = None):
+        """
+        Initialize from arrays
+
+        Args:
+            timestamp: int64 open times in ms, shape (n,)
+            block: float64 array of shape (8, n) in FLOAT_COLUMNS order
+            close_time: int64 close times in ms (derived from timestamp if None)
+            trades: int64 trade counts (zeros if None)
+        """
+        n = len(timestamp)
+        self.timestamp = np.asarray(timestamp, dtype=np.int64)
+        self._block = np.ascontiguousarray(block, dtype=np.float64).reshape(len(FLOAT_COLUMNS), n)
+        self.close_time = (np.asarray(close_time, dtype=np.int64) if close_time is not None
+                           else self.timestamp.copy())
+        self.trades = (np.asarray(trades, dtype=np.int64) if trades is not None
+                       else np.zeros(n, dtype=np.int64))
+        for i, name in enumerate(FLOAT_COLUMNS):
+            setattr(self, name, self._block[i])
+
+    @classmethod
+    def from_klines(cls, klines: Sequence[Sequence]) -> 'Candles':
+        """Parse raw REST/WebSocket kline rows (strings) into typed arrays"""
+        if len(klines) == 0:
+            return cls.empty()
+
+        rows = np.array(klines, dtype=object)
+        block = rows[:, _FLOAT_ROW_INDEX].T.astype(np.float64)
+        return cls(
+            rows[:, _TIMESTAMP_ROW_INDEX].astype(np.int64),
+            block,
+            close_time=rows[:, _CLOSE_TIME_ROW_INDEX].astype(np.int64),
+            trades=rows[:, _TRADES_ROW_INDEX].astype(np.int64),
+        )
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'Candles':
+        """
+        Columnar view of an OHLCV DataFrame
+
+        Zero-copy for frames built by to_frame() (and their row slices);
+        other frames are converted once. Missing optional columns are zero.
+        """
+        values = []
+        for name in FLOAT_COLUMNS:
+            if name not in df.columns:
+                values.append(np.zeros(len(df)))
+                continue
+            column = df[name]
+            if column.dtype != np.float64:
+                column = pd.to_numeric(column, errors='coerce')
+            values.append(column.to_numpy(dtype=np.float64))
+
+        if isinstance(df.index, pd.DatetimeIndex):
+            timestamp = df.index.asi8 // 1_000_000
+        else:
+            timestamp = np.arange(len(df), dtype=np.int64)
+
+        candles = cls.__new__(cls)
+        candles.timestamp = timestamp
+        candles.close_time = (df['close_time'].to_numpy(dtype=np.int64) if 'close_time' in df.columns
+                              else timestamp)
+        candles.trades = (pd.to_numeric(df['trades'], errors='coerce').fillna(0).to_numpy(dtype=np.int64)
+                          if 'trades' in df.columns else np.zeros(len(df), dtype=np.int64))
+        candles._block = None
+        for name, arr in zip(FLOAT_COLUMNS, values):
+            setattr(candles, name, arr)
+        return candles
+
+    @classmethod
+    def empty(cls) -> 'Candles':
+        return cls(np.empty(0, dtype=np.int64), np.empty((len(FLOAT_COLUMNS), 0)))
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def __getitem__(self, key) -> 'Candles':
+        """Row slice (candles[-100:]) - views, no copy"""
+        if not isinstance(key, slice):
+            raise TypeError("Candles supports slice indexing only")
+        candles = Candles.__new__(Candles)
+        candles.timestamp = self.timestamp[key]
+        candles.close_time = self.close_time[key]
+        candles.trades = self.trades[key]
+        candles._block = self._block[:, key] if self._block is not None else None
+        for name in FLOAT_COLUMNS:
+            setattr(candles, name, getattr(self, name)[key])
+        return candles
+
+    def resample(self, step_ms: int) -> 'Candles':
+        """
+        Aggregate into coarser candles aligned to UTC multiples of step_ms
+
+        Buckets follow Binance's boundaries for intervals that divide a day
+        (4h candles open at 00:00, 04:00, ... UTC). A leading bucket that
+        starts before the first candle is dropped since it would be missing
+        data; the last bucket may still be forming, like the open candle
+        REST returns.
+
+        Args:
+            step_ms: Target interval length in ms (a multiple of the source's)
+
+        Returns:
+            Candles with one row per bucket
+        """
+        buckets = self.timestamp // step_ms * step_ms
+        first = 0
+        if len(buckets) and buckets[0] != self.timestamp[0]:
+            first = int(np.searchsorted(buckets, buckets[0], side='right'))
+        if first >= len(buckets):
+            return Candles.empty()
+
+        source = self[first:] if first else self
+        buckets = buckets[first:]
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], len(buckets)] - 1
+
+        block = np.empty((len(FLOAT_COLUMNS), len(starts)))
+        block[0] = source.open[starts]
+        block[1] = np.maximum.reduceat(source.high, starts)
+        block[2] = np.minimum.reduceat(source.low, starts)
+        block[3] = source.close[ends]
+        for i, name in enumerate(FLOAT_COLUMNS[4:], start=4):
+            block[i] = np.add.reduceat(getattr(source, name), starts)
+
+        timestamp = buckets[starts]
+        return Candles(timestamp, block, close_time=timestamp + step_ms - 1,
+                       trades=np.add.reduceat(source.trades, starts))
+
+    def to_klines(self) -> list:
+        """
+        Rows in the REST kline layout (inverse of from_klines)
+
+        Prices and volumes are floats rather than Binance's strings; every
+        kline parser here accepts both.
+        """
+        columns = [self.timestamp.tolist()]
+        columns += [getattr(self, name).tolist() for name in FLOAT_COLUMNS[:5]]
+        columns += [self.close_time.tolist(), self.quote_volume.tolist(), self.trades.tolist(),
+                    self.taker_buy_base.tolist(), self.taker_buy_quote.tolist(), ['0'] * len(self)]
+        return [list(row) for row in zip(*columns)]
+
+    @property
+    def hlcc4(self) -> np.ndarray:
+        """(high + low + close + open) / 4"""
+        return (self.high + self.low + self.close + self.open) / 4
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        DataFrame in the legacy get_klines() layout
+
+        The float columns share memory with this container (one float block),
+        so the conversion is O(1) in the data size apart from the index.
+        """
+        block = self._block
+        if block is None:
+            block = np.vstack([getattr(self, name) for name in FLOAT_COLUMNS])
+        index = pd.DatetimeIndex(pd.to_datetime(self.timestamp, unit='ms'), name='timestamp')
+        df = pd.DataFrame(block.T, columns=list(FLOAT_COLUMNS), index=index, copy=False)
+        df['close_time'] = self.close_time
+        df['trades'] = self.trades
+        return df
@@ -48,6 +48,29 @@ QUOTE_ASSET = 'USDT'
 # Set to 0 to analyze ALL coins (no volume filter)
 MIN_VOLUME_USDT = 0  # Analyze all coins regardless of volume
 
+# Stream klines over WebSocket for scanned symbols (get_klines serves warm buffers from memory)
+USE_KLINE_STREAMS = True
+
+# Build higher timeframes (e.g. 4h from 1h) from finer candles when one request covers them
+RESAMPLE_TIMEFRAMES = True
+
+# Keep local order books (depth diff streams) for symbols the detectors analyze
+USE_DEPTH_STREAMS = True
+MAX_ORDER_BOOKS = 20  # Least recently analyzed symbol's book is dropped beyond this
+
+# aggTrade ring buffers for the coins BotMonitor scans (bot/pump trade analysis)
+USE_TRADE_STREAMS = True
+MAX_TRADE_SYMBOLS = 200  # Top coins by volume get buffers; the rest use REST
+
+# On-disk kline archive (closed candles) so restarts don't re-download every window
+# Point at a persistent volume on Railway; empty string disables it
+KLINE_ARCHIVE_DIR = os.getenv("KLINE_ARCHIVE_DIR", "data/klines")
+
+# Endpoint overrides - point at a local BinanceReplayServer for offline benchmarks
+# e.g. BINANCE_API_URL=http://127.0.0.1:8765/api BINANCE_STREAM_URL=ws://127.0.0.1:8765
+BINANCE_API_URL = os.getenv("BINANCE_API_URL") or None
+BINANCE_STREAM_URL = os.getenv("BINANCE_STREAM_URL") or None
+
 # ============================================================================
 # BOT SETTINGS
 # ============================================================================
@@ -0,0 +1,169 @@
+"""
+Exchange Metadata Cache
+TTL'd cache of Binance exchangeInfo with precomputed symbol tables
+
+exchangeInfo costs 20 weight and barely changes, yet get_all_symbols used to
+fetch it on every call (MarketScanner, pump quick scan / Layer 1, BotMonitor,
+TradingBot.scan_market). This cache fetches it once per TTL and precomputes:
+
+- arrays of symbol / base / quote / TRADING status
+- price precision (decimals of PRICE_FILTER.tickSize) per symbol
+- excluded-keyword and quote-asset masks, memoised per argument set
+
+so symbol-universe lookups and get_price_precision become memory reads.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRICE_PRECISION = 8
+
+
+def tick_size_precision(tick: str) -> int:
+    """Number of decimals in a tickSize string ('0.01000000' -> 2)"""
+    if '.' in tick:
+        return max(0, len(tick.rstrip('0').split('.')[-1]))
+    return 0
+
+
+class ExchangeMetadata:
+    """
+    Exchange metadata with precomputed symbol tables
+
+    Usage:
+        meta = ExchangeMetadata(client, ttl=3600)
+        meta.get_price_precision('BTCUSDT')              # -> 2
+        meta.get_tradeable_symbols('USDT', ['UP', 'DOWN'])  # -> [(symbol, base, quote), ...]
+    """
+
+    def __init__(self, client, ttl: float = 3600.0):
+        """
+        Initialize exchange metadata cache
+
+        Args:
+            client: python-binance Client
+            ttl: Seconds before exchangeInfo is fetched again
+        """
+        self.client = client
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._fetched_at = 0.0
+
+        self._symbol_info: Dict[str, Dict] = {}
+        self._index: Dict[str, int] = {}
+        self.symbols = np.array([], dtype=object)
+        self.base_assets = np.array([], dtype=object)
+        self.quote_assets = np.array([], dtype=object)
+        self.trading = np.array([], dtype=bool)
+        self.price_precision = np.array([], dtype=np.int8)
+
+        # Memoised per refresh: {(quote_asset, excluded_keywords): [(symbol, base, quote), ...]}
+        self._table_cache: Dict[Tuple, List[Tuple[str, str, str]]] = {}
+        self._keyword_masks: Dict[str, np.ndarray] = {}
+
+    @property
+    def age(self) -> float:
+        return time.time() - self._fetched_at if self._fetched_at else float('inf')
+
+    def _ensure_fresh(self):
+        if self.age < self.ttl:
+            return
+        with self._lock:
+            if self.age < self.ttl:
+                return
+            try:
+                self._build(self.client.get_exchange_info())
+            except Exception as e:
+                if self._fetched_at:
+                    logger.warning(f"Exchange info refresh failed, keeping {self.age:.0f}s old tables: {e}")
+                else:
+                    raise
+
+    def _build(self, exchange_info: Dict):
+        """Precompute symbol tables from an exchangeInfo response"""
+        infos = exchange_info.get('symbols', [])
+        n = len(infos)
+
+        symbols = np.empty(n, dtype=object)
+        base_assets = np.empty(n, dtype=object)
+        quote_assets = np.empty(n, dtype=object)
+        trading = np.zeros(n, dtype=bool)
+        precision = np.full(n, DEFAULT_PRICE_PRECISION, dtype=np.int8)
+
+        for i, info in enumerate(infos):
+            symbols[i] = info['symbol']
+            base_assets[i] = info.get('baseAsset', '')
+            quote_assets[i] = info.get('quoteAsset', '')
+            trading[i] = info.get('status') == 'TRADING'
+            for f in info.get('filters', []):
+                if f.get('filterType') == 'PRICE_FILTER':
+                    precision[i] = tick_size_precision(f.get('tickSize', '0.00000001'))
+                    break
+
+        self._symbol_info = {info['symbol']: info for info in infos}
+        self._index = {s: i for i, s in enumerate(symbols)}
+        self.symbols = symbols
+        self.base_assets = base_assets
+        self.quote_assets = quote_assets
+        self.trading = trading
+        self.price_precision = precision
+        self._table_cache = {}
+        self._keyword_masks = {}
+        self._fetched_at = time.time()
+
+        logger.info(f"Exchange metadata loaded: {n} symbols, {int(trading.sum())} trading (TTL {self.ttl:.0f}s)")
+
+    def _keyword_mask(self, keyword: str) -> np.ndarray:
+        mask = self._keyword_masks.get(keyword)
+        if mask is None:
+            mask = np.fromiter((keyword in s for s in self.symbols), dtype=bool, count=len(self.symbols))
+            self._keyword_masks[keyword] = mask
+        return mask
+
+    def get_symbol_info(self, symbol: str) -> Optional[Dict]:
+        """Raw exchangeInfo entry for a symbol"""
+        self._ensure_fresh()
+        return self._symbol_info.get(symbol)
+
+    def get_price_precision(self, symbol: str) -> int:
+        """Decimal places of the symbol's tick size (8 if unknown)"""
+        self._ensure_fresh()
+        i = self._index.get(symbol)
+        return int(self.price_precision[i]) if i is not None else DEFAULT_PRICE_PRECISION
+
+    def get_tradeable_symbols(self, quote_asset: str = 'USDT',
+                              excluded_keywords=None) -> List[Tuple[str, str, str]]:
+        """
+        TRADING symbols ending with quote_asset and containing none of the keywords
+
+        Returns:
+            List of (symbol, base_asset, quote_asset) in exchangeInfo order
+        """
+        self._ensure_fresh()
+        keywords = tuple(excluded_keywords or ())
+        key = (quote_asset, keywords)
+
+        table = self._table_cache.get(key)
+        if table is None:
+            # Under the lock so a concurrent refresh can't swap arrays mid-build
+            with self._lock:
+                mask = self.trading & np.fromiter(
+                    (s.endswith(quote_asset) for s in self.symbols), dtype=bool, count=len(self.symbols)
+                )
+                for keyword in keywords:
+                    mask &= ~self._keyword_mask(keyword)
+                idx = np.flatnonzero(mask)
+                table = list(zip(self.symbols[idx], self.base_assets[idx], self.quote_assets[idx]))
+                self._table_cache[key] = table
+        return table
+
+    def invalidate(self):
+        """Force a refresh on the next read"""
+        self._fetched_at = 0.0
@@ -14,6 +14,8 @@ import numpy as np
 import logging
 from typing import Dict, List, Optional
 
+from indicators import calculate_atr, find_first_touch
+
 logger = logging.getLogger(__name__)
 
 
@@ -45,22 +47,40 @@ class FairValueGapDetector:
     def _calculate_atr(self, df: pd.DataFrame, period: int = 14) -> pd.Series:
         """Calculate Average True Range"""
         try:
-            high = df['high']
-            low = df['low']
-            close = df['close']
-            
-            tr1 = high - low
-            tr2 = abs(high - close.shift(1))
-            tr3 = abs(low - close.shift(1))
-            
-            tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-            atr = tr.rolling(window=period).mean()
-            
-            return atr
+            return calculate_atr(df, period)
         except Exception as e:
             logger.error(f"Error calculating ATR: {e}")
             return pd.Series(dtype=float)
     
+    def _make_gap(self, top: float, bottom: float, reference: float, bar_index: int,
+                  filled_at: int, current_price: float) -> Dict:
+        """
+        Build the gap dict for one FVG
+        
+        Args:
+            top, bottom: Gap boundaries
+            reference: Price the size percentage is relative to (the old bar's edge)
+            bar_index: Index of the bar completing the gap
+            filled_at: Index of the filling bar, or -1 if unfilled
+            current_price: Latest close
+        """
+        gap_size = top - bottom
+        filled = filled_at >= 0
+        
+        return {
+            'top': top,
+            'bottom': bottom,
+            'midpoint': (top + bottom) / 2.0,
+            'size': gap_size,
+            'size_percentage': (gap_size / reference * 100) if reference > 0 else 0,
+            'bar_index': bar_index,
+            'filled': filled,
+            'filled_at_index': filled_at if filled else None,
+            'distance_to_top_percent': ((top - current_price) / current_price * 100),
+            'distance_to_bottom_percent': ((bottom - current_price) / current_price * 100),
+            'status': 'FILLED' if filled else 'ACTIVE'
+        }
+    
     def detect_fvgs(self, df: pd.DataFrame, max_gaps: int = 500) -> Optional[Dict]:
         """
         Detect Fair Value Gaps in given OHLCV dataframe
@@ -78,104 +98,30 @@ class FairValueGapDetector:
                 return None
             
             # Ensure numeric types
-            df = df.copy()
-            df['high'] = pd.to_numeric(df['high'], errors='coerce')
-            df['low'] = pd.to_numeric(df['low'], errors='coerce')
-            df['close'] = pd.to_numeric(df['close'], errors='coerce')
+            high = pd.to_numeric(df['high'], errors='coerce').to_numpy(dtype=np.float64)
+            low = pd.to_numeric(df['low'], errors='coerce').to_numpy(dtype=np.float64)
+            close = pd.to_numeric(df['close'], errors='coerce').to_numpy(dtype=np.float64)
             
-            bullish_fvgs = []
-            bearish_fvgs = []
-            current_price = float(df['close'].iloc[-1])
+            current_price = float(close[-1])
             
-            # Iterate through bars looking for gaps (need at least 3 bars)
-            for i in range(2, len(df)):
-                # Get three consecutive bars
-                bar_0 = df.iloc[i]      # Current bar
-                bar_1 = df.iloc[i-1]    # Middle bar
-                bar_2 = df.iloc[i-2]    # Old bar
-                
-                high_0 = float(bar_0['high'])
-                low_0 = float(bar_0['low'])
-                high_1 = float(bar_1['high'])
-                low_1 = float(bar_1['low'])
-                high_2 = float(bar_2['high'])
-                low_2 = float(bar_2['low'])
-                
-                # Detect Bullish FVG: bar_2.high < bar_0.low
-                # (Price gapped up, leaving imbalance zone)
-                if high_2 < low_0:
-                    gap_size = low_0 - high_2
-                    gap_midpoint = (low_0 + high_2) / 2.0
-                    
-                    # Check if gap has been filled
-                    filled = False
-                    filled_at_index = None
-                    
-                    for j in range(i+1, len(df)):
-                        future_low = float(df.iloc[j]['low'])
-                        if future_low <= high_2:  # Price came back and filled the gap
-                            filled = True
-                            filled_at_index = j
-                            break
-                    
-                    # Calculate gap percentage
-                    gap_percentage = (gap_size / high_2 * 100) if high_2 > 0 else 0
-                    
-                    # Distance from current price
-                    distance_to_top = ((low_0 - current_price) / current_price * 100)
-                    distance_to_bottom = ((high_2 - current_price) / current_price * 100)
-                    
-                    bullish_fvgs.append({
-                        'top': low_0,
-                        'bottom': high_2,
-                        'midpoint': gap_midpoint,
-                        'size': gap_size,
-                        'size_percentage': gap_percentage,
-                        'bar_index': i,
-                        'filled': filled,
-                        'filled_at_index': filled_at_index,
-                        'distance_to_top_percent': distance_to_top,
-                        'distance_to_bottom_percent': distance_to_bottom,
-                        'status': 'FILLED' if filled else 'ACTIVE'
-                    })
-                
-                # Detect Bearish FVG: bar_2.low > bar_0.high
-                # (Price gapped down, leaving imbalance zone)
-                if low_2 > high_0:
-                    gap_size = low_2 - high_0
-                    gap_midpoint = (low_2 + high_0) / 2.0
-                    
-                    # Check if gap has been filled
-                    filled = False
-                    filled_at_index = None
-                    
-                    for j in range(i+1, len(df)):
-                        future_high = float(df.iloc[j]['high'])
-                        if future_high >= low_2:  # Price came back and filled the gap
-                            filled = True
-                            filled_at_index = j
-                            break
-                    
-                    # Calculate gap percentage
-                    gap_percentage = (gap_size / low_2 * 100) if low_2 > 0 else 0
-                    
-                    # Distance from current price
-                    distance_to_top = ((low_2 - current_price) / current_price * 100)
-                    distance_to_bottom = ((high_0 - current_price) / current_price * 100)
-                    
-                    bearish_fvgs.append({
-                        'top': low_2,
-                        'bottom': high_0,
-                        'midpoint': gap_midpoint,
-                        'size': gap_size,
-                        'size_percentage': gap_percentage,
-                        'bar_index': i,
-                        'filled': filled,
-                        'filled_at_index': filled_at_index,
-                        'distance_to_top_percent': distance_to_top,
-                        'distance_to_bottom_percent': distance_to_bottom,
-                        'status': 'FILLED' if filled else 'ACTIVE'
-                    })
+            # Three-bar gaps for every bar i >= 2 at once (bar_2 = i-2, bar_0 = i)
+            # Bullish FVG: bar_2.high < bar_0.low (price gapped up, leaving imbalance zone)
+            # Bearish FVG: bar_2.low > bar_0.high (price gapped down, leaving imbalance zone)
+            bullish_idx = np.flatnonzero(high[:-2] < low[2:]) + 2
+            bearish_idx = np.flatnonzero(low[:-2] > high[2:]) + 2
+            
+            # A gap is filled by the first later bar trading back into it
+            bullish_fill = find_first_touch(low, bullish_idx + 1, high[bullish_idx - 2], 'below')
+            bearish_fill = find_first_touch(high, bearish_idx + 1, low[bearish_idx - 2], 'above')
+            
+            bullish_fvgs = [
+                self._make_gap(float(low[i]), float(high[i - 2]), float(high[i - 2]), int(i), int(j), current_price)
+                for i, j in zip(bullish_idx, bullish_fill)
+            ]
+            bearish_fvgs = [
+                self._make_gap(float(low[i - 2]), float(high[i]), float(low[i - 2]), int(i), int(j), current_price)
+                for i, j in zip(bearish_idx, bearish_fill)
+            ]
             
             # Filter only unfilled gaps and sort by proximity to current price
             unfilled_bullish = [fvg for fvg in bullish_fvgs if not fvg['filled']]
@@ -234,7 +234,8 @@ class GeminiAnalyzer:
                 config.RSI_LOWER,
                 config.RSI_UPPER,
                 config.MFI_LOWER,
-                config.MFI_UPPER
+                config.MFI_UPPER,
+                symbol=symbol
             )
             
             # Stoch+RSI analysis
@@ -308,8 +309,8 @@ class GeminiAnalyzer:
                     recent_trades = []
                     order_book = None
                     try:
-                        recent_trades = self.binance.client.get_recent_trades(symbol=symbol, limit=500)
-                        order_book = self.binance.client.get_order_book(symbol=symbol, limit=100)
+                        recent_trades = self.binance.get_recent_trades(symbol, limit=500)
+                        order_book = self.binance.get_order_book(symbol, limit=100)
                     except:
                         logger.debug("Could not fetch trades/orderbook for advanced detection")
                     
@@ -0,0 +1,128 @@
+"""
+Indicator Cache
+Process-wide memoization of indicator results per (symbol, interval) window
+
+GeminiAnalyzer.collect_data, TelegramCommandHandler._analyze_symbol_full,
+WatchlistMonitor.check_watchlist and StochRSIAnalyzer.analyze_multi_timeframe
+often evaluate the same RSI/MFI/Stoch series for the same symbol within
+seconds - on the same cached kline window. Results are cached under
+
+    (symbol, interval, indicator, params, window)
+
+where `window` identifies the candles: first and last open time, length,
+and the last candle's close and volume. The last candle's open time moves
+when a candle closes, and a still-forming last candle that ticks changes
+its close/volume, so a stale result is never served; repeats on an
+unchanged window are a dictionary lookup. Entries are evicted least
+recently used first.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def window_key(df: pd.DataFrame) -> Optional[tuple]:
+    """Identity of a kline window, or None if it can't be fingerprinted"""
+    if df is None or len(df) == 0 or not isinstance(df.index, pd.DatetimeIndex):
+        return None
+    try:
+        last = df.iloc[-1]
+        return (df.index[0].value, df.index[-1].value, len(df),
+                float(last['close']), float(last['volume']))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class IndicatorCache:
+    """
+    LRU cache of indicator results keyed by kline window
+
+    Usage:
+        cache = get_indicator_cache()
+        result = cache.get_or_compute('BTCUSDT', '1h', 'rsi_mfi', (6, 6), df,
+                                      lambda: analyze_symbol(df, ...))
+    """
+
+    def __init__(self, max_entries: int = 5000):
+        """
+        Initialize indicator cache
+
+        Args:
+            max_entries: Maximum cached results (least recently used is evicted)
+        """
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[tuple, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, symbol: str, interval: str, indicator: str, params: Hashable,
+                       df: pd.DataFrame, compute: Callable[[], Any]) -> Any:
+        """
+        Cached result for this window, computing it on a miss
+
+        Args:
+            symbol: Trading symbol
+            interval: Kline interval of df
+            indicator: Indicator / analysis name
+            params: Hashable parameters (e.g. a tuple of periods and thresholds)
+            df: Kline window the result is computed from
+            compute: Zero-argument function producing the result
+
+        Returns:
+            compute()'s result (None results are not cached)
+        """
+        window = window_key(df)
+        if window is None:
+            return compute()
+
+        key = (symbol, interval, indicator, params, window)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        result = compute()
+        if result is not None:
+            with self._lock:
+                self._entries[key] = result
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        """Cache statistics for logging / status commands"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_indicator_cache() -> IndicatorCache:
+    """Process-wide indicator cache (shared by every analyzer)"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = IndicatorCache()
+        return _shared_cache
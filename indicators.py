@@ -1,10 +1,23 @@
 """
 Technical Indicators Module
 Implements RSI and MFI calculations matching Pine Script logic
+
+Shared indicator library: StochRSIAnalyzer, MarketRegimeDetector and the
+FVG / Order Block / S/R / SMC detectors use these RSI, Stochastic, EMA,
+ATR and pivot functions instead of their own copies; find_first_touch
+resolves "when did price return to this level" for all of them.
 """
 
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _numeric(series):
+    """Series as float - a no-op for the float64 columns get_klines() returns"""
+    if series.dtype == np.float64:
+        return series
+    return pd.to_numeric(series, errors='coerce')
 
 
 def validate_dataframe(df):
@@ -20,17 +33,18 @@ def validate_dataframe(df):
     if df is None or len(df) < 14:
         return None
     
-    # Make a copy to avoid modifying original
-    df = df.copy()
-    
     # Ensure all required columns exist
     required_cols = ['high', 'low', 'close', 'volume']
     if not all(col in df.columns for col in required_cols):
         return None
     
-    # Convert all columns to numeric, replacing errors with NaN
-    for col in required_cols:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
+    # Typed frames from get_klines() need no conversion (and no copy)
+    if any(df[col].dtype != np.float64 for col in required_cols):
+        # Make a copy to avoid modifying original
+        df = df.copy()
+        # Convert all columns to numeric, replacing errors with NaN
+        for col in required_cols:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
     
     # Check for NaN values
     if df[required_cols].isnull().any().any():
@@ -52,10 +66,10 @@ def calculate_hlcc4(df):
     Ensures numeric data types before calculation
     """
     # Ensure columns are numeric (convert strings to float)
-    high = pd.to_numeric(df['high'], errors='coerce')
-    low = pd.to_numeric(df['low'], errors='coerce')
-    close = pd.to_numeric(df['close'], errors='coerce')
-    open_price = pd.to_numeric(df['open'], errors='coerce')
+    high = _numeric(df['high'])
+    low = _numeric(df['low'])
+    close = _numeric(df['close'])
+    open_price = _numeric(df['open'])
     
     return (high + low + close + open_price) / 4
 
@@ -82,7 +96,7 @@ def calculate_rsi(data, period=6):
     if not isinstance(data, pd.Series):
         data = pd.Series(data)
     
-    data = pd.to_numeric(data, errors='coerce')
+    data = _numeric(data)
     
     # Drop NaN values
     data = data.dropna()
@@ -90,24 +104,7 @@ def calculate_rsi(data, period=6):
     if len(data) < period + 1:
         return pd.Series([np.nan] * len(data), index=data.index)
     
-    delta = data.diff()
-    
-    # Separate gains and losses
-    gain = delta.where(delta > 0, 0.0)
-    loss = -delta.where(delta < 0, 0.0)
-    
-    # Calculate RMA (Rolling Moving Average, same as EMA with alpha=1/period)
-    avg_gain = gain.ewm(alpha=1/period, adjust=False).mean()
-    avg_loss = loss.ewm(alpha=1/period, adjust=False).mean()
-    
-    # Calculate RS and RSI
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    
-    # Handle division by zero
-    rsi = rsi.fillna(100)
-    
-    return rsi
+    return calculate_rsi_rma(data, period)
 
 
 def calculate_mfi(df, period=6):
@@ -124,10 +121,10 @@ def calculate_mfi(df, period=6):
         pandas Series of MFI values
     """
     # Ensure all columns are numeric
-    high = pd.to_numeric(df['high'], errors='coerce')
-    low = pd.to_numeric(df['low'], errors='coerce')
-    close = pd.to_numeric(df['close'], errors='coerce')
-    volume = pd.to_numeric(df['volume'], errors='coerce')
+    high = _numeric(df['high'])
+    low = _numeric(df['low'])
+    close = _numeric(df['close'])
+    volume = _numeric(df['volume'])
     
     # Typical Price
     tp = (high + low + close) / 3
@@ -252,22 +249,34 @@ def analyze_symbol(df, rsi_period, mfi_period, rsi_lower, rsi_upper, mfi_lower,
         return None
 
 
-def analyze_multi_timeframe(klines_dict, rsi_period, mfi_period, rsi_lower, rsi_upper, mfi_lower, mfi_upper):
+def analyze_multi_timeframe(klines_dict, rsi_period, mfi_period, rsi_lower, rsi_upper, mfi_lower, mfi_upper,
+                            symbol=None):
     """
     Analyze multiple timeframes and return consensus
     
     Args:
         klines_dict: Dictionary of {timeframe: DataFrame}
         Other args: indicator parameters
+        symbol: Trading symbol - when given, per-timeframe results are memoized
+            in the shared IndicatorCache (repeat calls on the same candles are lookups)
     
     Returns:
         dict with analysis results for each timeframe and overall consensus
     """
     results = {}
     total_signal = 0
+    params = (rsi_period, mfi_period, rsi_lower, rsi_upper, mfi_lower, mfi_upper)
+    cache = None
+    if symbol is not None:
+        from indicator_cache import get_indicator_cache
+        cache = get_indicator_cache()
     
     for tf, df in klines_dict.items():
-        analysis = analyze_symbol(df, rsi_period, mfi_period, rsi_lower, rsi_upper, mfi_lower, mfi_upper)
+        if cache is not None:
+            analysis = cache.get_or_compute(symbol, tf, 'rsi_mfi', params, df,
+                                            lambda: analyze_symbol(df, *params))
+        else:
+            analysis = analyze_symbol(df, *params)
         if analysis:
             results[tf] = analysis
             total_signal += analysis['signal']
@@ -302,10 +311,10 @@ def calculate_ohlc4(df):
         Series with OHLC/4 values
     """
     # Ensure numeric types
-    open_price = pd.to_numeric(df['open'], errors='coerce')
-    high = pd.to_numeric(df['high'], errors='coerce')
-    low = pd.to_numeric(df['low'], errors='coerce')
-    close = pd.to_numeric(df['close'], errors='coerce')
+    open_price = _numeric(df['open'])
+    high = _numeric(df['high'])
+    low = _numeric(df['low'])
+    close = _numeric(df['close'])
     
     return (open_price + high + low + close) / 4
 
@@ -387,6 +396,198 @@ def calculate_rsi_rma(src, length=14):
     return rsi
 
 
+def calculate_ema(src, period=20):
+    """
+    Calculate EMA seeded with the SMA of the first `period` values (Pine ta.ema)
+    
+    Args:
+        src: Source data series
+        period: EMA period
+        
+    Returns:
+        EMA values (NaN for the first period - 1 bars)
+    """
+    src = _numeric(src)
+    ema = pd.Series(np.nan, index=src.index)
+    if len(src) < period:
+        return ema
+    
+    # Replace the first full window by its mean, then run the recursion
+    seeded = src.iloc[period - 1:].copy()
+    seeded.iloc[0] = src.iloc[:period].mean()
+    ema.iloc[period - 1:] = seeded.ewm(alpha=2 / (period + 1), adjust=False).mean().to_numpy()
+    return ema
+
+
+def calculate_true_range(df):
+    """
+    Calculate True Range: max(high - low, |high - prev close|, |low - prev close|)
+    
+    Args:
+        df: DataFrame with high, low, close columns
+        
+    Returns:
+        True Range series (high - low on the first bar)
+    """
+    high = _numeric(df['high']).to_numpy(dtype=np.float64)
+    low = _numeric(df['low']).to_numpy(dtype=np.float64)
+    close = _numeric(df['close']).to_numpy(dtype=np.float64)
+    
+    prev_close = np.empty_like(close)
+    prev_close[:1] = np.nan
+    prev_close[1:] = close[:-1]
+    
+    # fmax skips NaN like DataFrame.max(axis=1)
+    tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    return pd.Series(tr, index=df.index)
+
+
+def calculate_atr(df, period=14):
+    """
+    Calculate ATR as the simple mean of True Range over `period` bars
+    
+    Args:
+        df: DataFrame with high, low, close columns
+        period: ATR period
+        
+    Returns:
+        ATR values (NaN for the first period - 1 bars)
+    """
+    return calculate_true_range(df).rolling(window=period).mean()
+
+
+def find_pivots(df, length):
+    """
+    Find pivot (swing) highs and lows
+    
+    A bar is a pivot high (low) when its high (low) is the highest (lowest)
+    of the 2 * length + 1 bars centred on it; ties all count. Every centred
+    window is evaluated in one vectorized pass.
+    
+    Args:
+        df: DataFrame with high, low columns
+        length: Bars on each side of the pivot
+        
+    Returns:
+        Tuple of (pivot_highs, pivot_lows) Series - the pivot price at pivot
+        bars, NaN elsewhere (including the first and last `length` bars)
+    """
+    high = _numeric(df['high']).to_numpy(dtype=np.float64)
+    low = _numeric(df['low']).to_numpy(dtype=np.float64)
+    pivot_highs = np.full(len(high), np.nan)
+    pivot_lows = np.full(len(low), np.nan)
+    
+    window = 2 * length + 1
+    if len(high) >= window:
+        # NaN never wins a window (like Series.max / min skipping NaN)
+        highest = sliding_window_view(np.where(np.isnan(high), -np.inf, high), window).max(axis=1)
+        lowest = sliding_window_view(np.where(np.isnan(low), np.inf, low), window).min(axis=1)
+        
+        centre = slice(length, len(high) - length)
+        is_high = high[centre] == highest
+        is_low = low[centre] == lowest
+        pivot_highs[centre] = np.where(is_high, high[centre], np.nan)
+        pivot_lows[centre] = np.where(is_low, low[centre], np.nan)
+    
+    return pd.Series(pivot_highs, index=df.index), pd.Series(pivot_lows, index=df.index)
+
+
+def find_first_touch(values, starts, levels, direction='below', inclusive=True):
+    """
+    For each query, the first index j >= start where values[j] reaches level
+    
+    Replaces per-query forward scans ("when did price come back to this
+    gap / block / level?") with a sparse table of range minima and a binary
+    search over all queries at once - O((n + q) log n) instead of O(n * q).
+    
+    Args:
+        values: 1-D array (e.g. lows or highs)
+        starts: Start index per query (an index >= len(values) never touches)
+        levels: Price level per query
+        direction: 'below' for values[j] <= level, 'above' for values[j] >= level
+        inclusive: False for a strict crossing (values[j] < level / > level)
+        
+    Returns:
+        int array of first touch indexes, -1 where the level is never reached
+        (NaN values never touch)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    starts = np.asarray(starts, dtype=np.int64)
+    levels = np.asarray(levels, dtype=np.float64)
+    if direction == 'above':
+        values, levels = -values, -levels
+    
+    n = len(values)
+    result = np.full(len(starts), -1, dtype=np.int64)
+    if n == 0 or len(starts) == 0:
+        return result
+    
+    # table[k][i] = min(values[i:i + 2**k]) (fmin skips NaN)
+    table = [values]
+    while 2 ** len(table) <= n:
+        prev, half = table[-1], 2 ** (len(table) - 1)
+        table.append(np.fmin(prev[:-half], prev[half:]))
+    
+    def range_min(lo, hi):
+        k = np.log2(hi - lo + 1).astype(np.int64)
+        out = np.empty(len(lo))
+        for power in np.unique(k):
+            sel = k == power
+            row = table[power]
+            out[sel] = np.fmin(row[lo[sel]], row[hi[sel] - 2 ** power + 1])
+        return out
+    
+    reaches = np.less_equal if inclusive else np.less
+    
+    # Queries whose whole suffix reaches the level have a first touch
+    query = np.flatnonzero(starts < n)
+    query = query[reaches(range_min(np.maximum(starts[query], 0), np.full(len(query), n - 1)), levels[query])]
+    lo = np.maximum(starts[query], 0)
+    hi = np.full(len(query), n - 1)
+    first = lo.copy()
+    
+    # Smallest hi with min(values[first:hi + 1]) <= level
+    while np.any(lo < hi):
+        mid = (lo + hi) // 2
+        reached = reaches(range_min(first, mid), levels[query])
+        hi = np.where(reached, mid, hi)
+        lo = np.where(reached, lo, mid + 1)
+    result[query] = lo
+    return result
+
+
+def find_first_in_band(values, starts, lower, upper):
+    """
+    For each query, the first index j >= start with lower <= values[j] <= upper
+    
+    A band can be re-entered from either side, so this is a broadcast
+    (queries x bars) comparison rather than a range-min search; it suits the
+    tens of zones a detector resolves per frame.
+    
+    Args:
+        values: 1-D array (e.g. lows or highs)
+        starts: Start index per query
+        lower, upper: Band per query (inclusive)
+        
+    Returns:
+        int array of first indexes inside the band, -1 where it is never entered
+    """
+    values = np.asarray(values, dtype=np.float64)
+    starts = np.asarray(starts, dtype=np.int64)
+    lower = np.asarray(lower, dtype=np.float64)
+    upper = np.asarray(upper, dtype=np.float64)
+    
+    result = np.full(len(starts), -1, dtype=np.int64)
+    if len(values) == 0 or len(starts) == 0:
+        return result
+    
+    inside = ((values >= lower[:, None]) & (values <= upper[:, None])
+              & (np.arange(len(values)) >= starts[:, None]))
+    entered = inside.any(axis=1)
+    result[entered] = inside.argmax(axis=1)[entered]
+    return result
+
+
 def analyze_stoch_rsi(df, stoch_k_period=14, stoch_smooth=3, stoch_d_period=3,
                       rsi_length=14, stoch_lower=20, stoch_upper=80, 
                       rsi_lower=30, rsi_upper=70):
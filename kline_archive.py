@@ -0,0 +1,254 @@
+"""
+Kline Archive
+Append-only on-disk candle store read back through numpy.memmap
+
+Every process restart used to start with empty kline caches, so the first
+MarketScanner / pump-detector cycles re-downloaded every window. The archive
+keeps closed candles per (symbol, interval) in a flat binary file of
+fixed-size records:
+
+    <root>/<interval>/<symbol>.bin   # RECORD_DTYPE records, ascending open time
+
+Reads memory-map the file and copy out only the requested tail, so a
+168 x 1h or 180 x 4h history is a disk read instead of a REST call.
+Files are kept contiguous: a gap between the archived tail and newly
+fetched candles restarts the file at the new candles, unless the caller
+passes a fetch function to backfill it over REST (paged startTime
+requests). Files are trimmed to their newest max_candles, and files not
+written for max_idle_days (delisted / no longer scanned symbols) are
+removed by prune().
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from candles import Candles, FLOAT_COLUMNS
+from kline_stream_hub import INTERVAL_MS
+
+logger = logging.getLogger(__name__)
+
+RECORD_DTYPE = np.dtype(
+    [('timestamp', '<i8'), ('close_time', '<i8'), ('trades', '<i8')]
+    + [(name, '<f8') for name in FLOAT_COLUMNS]
+)
+
+BACKFILL_PAGE = 1000  # Binance klines max limit
+
+
+class KlineArchive:
+    """
+    Per-(symbol, interval) binary candle files
+
+    Usage:
+        archive = KlineArchive('data/klines')
+        archive.append('BTCUSDT', '1h', Candles.from_frame(df), fetch=client.get_klines)
+        candles = archive.read('BTCUSDT', '1h', limit=168)
+    """
+
+    def __init__(self, root_dir: str, max_backfill_pages: int = 5, max_candles: int = 2000,
+                 max_idle_days: float = 7):
+        """
+        Initialize kline archive
+
+        Args:
+            root_dir: Directory holding <interval>/<symbol>.bin files
+            max_backfill_pages: Largest gap (in 1000-candle pages) filled over
+                REST before a file is restarted instead
+            max_candles: Candles kept per file (reads never need more than
+                one 1000-candle request's worth)
+            max_idle_days: prune() removes files not written for this long
+        """
+        self.root_dir = root_dir
+        self.max_backfill_pages = max_backfill_pages
+        self.max_candles = max_candles
+        self.max_idle_days = max_idle_days
+        self._locks: Dict[tuple, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        os.makedirs(root_dir, exist_ok=True)
+
+    def _path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.root_dir, interval, f"{symbol}.bin")
+
+    def _lock(self, symbol: str, interval: str) -> threading.Lock:
+        key = (symbol, interval)
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _map(self, symbol: str, interval: str) -> Optional[np.memmap]:
+        """Read-only memmap of the file (None if missing or empty)"""
+        path = self._path(symbol, interval)
+        try:
+            count = os.path.getsize(path) // RECORD_DTYPE.itemsize
+        except OSError:
+            return None
+        if count == 0:
+            return None
+        return np.memmap(path, dtype=RECORD_DTYPE, mode='r', shape=(count,))
+
+    def count(self, symbol: str, interval: str) -> int:
+        """Number of archived candles"""
+        try:
+            return os.path.getsize(self._path(symbol, interval)) // RECORD_DTYPE.itemsize
+        except OSError:
+            return 0
+
+    def last_open_time(self, symbol: str, interval: str) -> Optional[int]:
+        """Open time (ms) of the newest archived candle"""
+        records = self._map(symbol, interval)
+        return int(records[-1]['timestamp']) if records is not None else None
+
+    def last_write_time(self, symbol: str, interval: str) -> Optional[float]:
+        """Time (epoch seconds) the file was last appended to, None if missing"""
+        try:
+            return os.path.getmtime(self._path(symbol, interval))
+        except OSError:
+            return None
+
+    def read(self, symbol: str, interval: str, limit: Optional[int] = None) -> Optional[Candles]:
+        """
+        Newest `limit` archived candles
+
+        Returns:
+            Candles (copied out of the memmap) or None if nothing is archived
+        """
+        records = self._map(symbol, interval)
+        if records is None:
+            return None
+        tail = records[-limit:] if limit else records
+        block = np.vstack([tail[name] for name in FLOAT_COLUMNS])
+        candles = Candles(np.array(tail['timestamp']), block,
+                          close_time=np.array(tail['close_time']), trades=np.array(tail['trades']))
+        del records
+        return candles
+
+    def read_frame(self, symbol: str, interval: str, limit: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """read() as a get_klines()-layout DataFrame"""
+        candles = self.read(symbol, interval, limit)
+        return candles.to_frame() if candles is not None else None
+
+    @staticmethod
+    def _to_records(candles: Candles) -> np.ndarray:
+        records = np.empty(len(candles), dtype=RECORD_DTYPE)
+        records['timestamp'] = candles.timestamp
+        records['close_time'] = candles.close_time
+        records['trades'] = candles.trades
+        for name in FLOAT_COLUMNS:
+            records[name] = getattr(candles, name)
+        return records
+
+    def _backfill(self, symbol: str, interval: str, start_ms: int, end_ms: int,
+                  fetch: Callable) -> Optional[Candles]:
+        """
+        Fetch candles with open time in [start_ms, end_ms) over REST, paged
+
+        Returns:
+            Candles (possibly partial if the gap exceeds max_backfill_pages) or None
+        """
+        rows = []
+        cursor = start_ms
+        for _ in range(self.max_backfill_pages):
+            page = fetch(symbol=symbol, interval=interval, limit=BACKFILL_PAGE,
+                         startTime=cursor, endTime=end_ms - 1)
+            rows.extend(page)
+            if len(page) < BACKFILL_PAGE:
+                break
+            cursor = int(page[-1][0]) + 1
+        return Candles.from_klines(rows) if rows else None
+
+    def append(self, symbol: str, interval: str, candles: Candles,
+               fetch: Optional[Callable] = None, now_ms: Optional[int] = None) -> int:
+        """
+        Archive the closed candles newer than the archived tail
+
+        Args:
+            candles: Contiguous candles (e.g. Candles.from_frame(get_klines df))
+            fetch: python-binance style get_klines(symbol=, interval=, limit=,
+                startTime=, endTime=) used to backfill gaps; without it (the
+                default, so archiving never costs extra requests) a gap
+                restarts the file
+            now_ms: Current time in ms (candles closing later are skipped)
+
+        Returns:
+            Number of candles appended
+        """
+        step = INTERVAL_MS.get(interval)
+        if candles is None or len(candles) == 0 or step is None:
+            return 0  # Nothing to write / calendar intervals (1w, 1M) aren't archived
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+
+        with self._lock(symbol, interval):
+            last = self.last_open_time(symbol, interval)
+
+            closed = candles.close_time < now_ms
+            if last is not None:
+                closed &= candles.timestamp > last
+            if not closed.any():
+                return 0
+            new = self._to_records(candles)[closed]
+
+            mode = 'ab'
+            if last is not None and new['timestamp'][0] != last + step:
+                gap_start, gap_end = last + step, int(new['timestamp'][0])
+                filled = (self._backfill(symbol, interval, gap_start, gap_end, fetch)
+                          if fetch is not None and gap_end > gap_start else None)
+                if filled is not None and len(filled) == (gap_end - gap_start) // step:
+                    new = np.concatenate([self._to_records(filled), new])
+                    logger.debug(f"Archive backfilled {len(filled)} {symbol} {interval} candles")
+                else:
+                    logger.info(f"Archive gap for {symbol} {interval} too large to backfill - restarting file")
+                    mode = 'wb'
+
+            path = self._path(symbol, interval)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, mode) as f:
+                f.write(new.tobytes())
+
+            # Trim in batches so appends don't rewrite the file every time
+            if self.count(symbol, interval) > self.max_candles * 5 // 4:
+                self._trim(symbol, interval)
+            return len(new)
+
+    def _trim(self, symbol: str, interval: str):
+        """Rewrite a file with only its newest max_candles (caller holds its lock)"""
+        path = self._path(symbol, interval)
+        records = self._map(symbol, interval)
+        tail = np.array(records[-self.max_candles:])
+        del records
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(tail.tobytes())
+        os.replace(tmp_path, path)
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """
+        Remove files not written for max_idle_days
+
+        Args:
+            now: Current time in epoch seconds (default: time.time())
+
+        Returns:
+            Number of files removed
+        """
+        cutoff = (now if now is not None else time.time()) - self.max_idle_days * 86400
+        removed = 0
+        for interval_dir in os.scandir(self.root_dir):
+            if not interval_dir.is_dir():
+                continue
+            for entry in os.scandir(interval_dir.path):
+                if entry.name.endswith('.bin') and entry.stat().st_mtime < cutoff:
+                    symbol = entry.name[:-len('.bin')]
+                    with self._lock(symbol, interval_dir.name):
+                        try:
+                            os.remove(entry.path)
+                        except OSError:
+                            continue
+                    removed += 1
+        if removed:
+            logger.info(f"Kline archive pruned {removed} idle files")
+        return removed
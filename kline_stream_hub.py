@@ -0,0 +1,523 @@
+"""
+Kline Stream Hub
+Shared WebSocket market-data hub for Binance kline streams
+
+Subscribes to combined `<symbol>@kline_<interval>` streams and keeps a rolling
+candle buffer per (symbol, interval). BinanceClient serves get_klines() from
+these buffers when they are warm, so scanners that sweep hundreds of USDT
+pairs every cycle stop polling REST for candles that are already streaming in.
+
+A buffer is "warm" when it has been seeded with REST history, its stream
+connection is up, and no candle has been missed since seeding. Any
+disconnect or sequence gap marks the affected buffers cold until the next
+REST fetch re-seeds them.
+
+Also provides FakeKlineStreamServer, a local combined-stream server used to
+test the hub offline.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import websockets
+
+logger = logging.getLogger(__name__)
+
+BINANCE_STREAM_URL = "wss://stream.binance.com:9443"
+
+# Interval length in milliseconds (used for gap detection).
+# '1M' is omitted on purpose - month lengths vary, so gaps are not checked.
+INTERVAL_MS = {
+    '1m': 60_000,
+    '3m': 180_000,
+    '5m': 300_000,
+    '15m': 900_000,
+    '30m': 1_800_000,
+    '1h': 3_600_000,
+    '2h': 7_200_000,
+    '4h': 14_400_000,
+    '6h': 21_600_000,
+    '8h': 28_800_000,
+    '12h': 43_200_000,
+    '1d': 86_400_000,
+    '3d': 259_200_000,
+    '1w': 604_800_000,
+}
+
+
+def stream_name(symbol: str, interval: str) -> str:
+    """Binance stream name for a kline subscription (e.g. 'btcusdt@kline_5m')"""
+    return f"{symbol.lower()}@kline_{interval}"
+
+
+def kline_event_to_row(k: Dict) -> list:
+    """
+    Convert a kline stream payload ('k' object) to the REST kline row layout
+
+    Returns:
+        [open_time, open, high, low, close, volume, close_time,
+         quote_volume, trades, taker_buy_base, taker_buy_quote, ignore]
+    """
+    return [
+        int(k['t']), k['o'], k['h'], k['l'], k['c'], k['v'],
+        int(k['T']), k['q'], int(k['n']), k['V'], k['Q'], '0'
+    ]
+
+
+async def _cancel_tasks_and_stop(loop):
+    """Cancel every other task on the loop, let them unwind, then stop the loop"""
+    current = asyncio.current_task()
+    tasks = [t for t in asyncio.all_tasks(loop) if t is not current]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    loop.stop()
+
+
+class _CandleBuffer:
+    """Rolling candle buffer for one (symbol, interval) - rows in REST kline layout"""
+
+    __slots__ = ('rows', 'warm', 'updated_at')
+
+    def __init__(self):
+        self.rows = []
+        self.warm = False
+        self.updated_at = 0.0
+
+
+class KlineStreamHub:
+    """
+    Shared Binance kline WebSocket hub with an in-memory candle store
+
+    Usage:
+        hub = KlineStreamHub()
+        hub.subscribe(['BTCUSDT', 'ETHUSDT'], ['5m', '1h'])
+        hub.seed('BTCUSDT', '5m', rest_klines)   # done by BinanceClient
+        rows = hub.get_klines('BTCUSDT', '5m', limit=100)
+    """
+
+    def __init__(self, stream_url: str = BINANCE_STREAM_URL, max_candles: int = 1000,
+                 max_streams_per_connection: int = 200, reconnect_delay: float = 5.0):
+        """
+        Initialize kline stream hub
+
+        Args:
+            stream_url: Base WebSocket URL (point at FakeKlineStreamServer for offline tests)
+            max_candles: Maximum candles kept per (symbol, interval)
+            max_streams_per_connection: Streams per combined connection (Binance allows 1024)
+            reconnect_delay: Seconds to wait before reconnecting a dropped connection
+        """
+        self.stream_url = stream_url.rstrip('/')
+        self.max_candles = max_candles
+        self.max_streams_per_connection = max_streams_per_connection
+        self.reconnect_delay = reconnect_delay
+
+        self._buffers: Dict[Tuple[str, str], _CandleBuffer] = {}
+        self._lock = threading.Lock()
+
+        # Each connection group is a list of stream names served by one WebSocket
+        self._subscribed = set()  # {(symbol, interval)}
+        self._groups: List[List[str]] = []
+        self._connected_groups = set()  # indexes of groups with a live connection
+
+        self._loop = None
+        self._thread = None
+        self._ready = threading.Event()
+        self.running = False
+
+        logger.info(f"Kline stream hub initialized ({self.stream_url}, max {max_candles} candles)")
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the hub event loop in a background thread"""
+        if self.running:
+            return False
+
+        self.running = True
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=5)
+
+        # Connect any groups subscribed before start()
+        for index in range(len(self._groups)):
+            self._launch_group(index)
+
+        logger.info("✅ Kline stream hub started")
+        return True
+
+    def stop(self):
+        """Stop all stream connections and the hub event loop"""
+        if not self.running:
+            return False
+
+        self.running = False
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._cancel_all)
+        if self._thread:
+            self._thread.join(timeout=5)
+
+        with self._lock:
+            self._connected_groups.clear()
+            for buf in self._buffers.values():
+                buf.warm = False
+
+        logger.info("⛔ Kline stream hub stopped")
+        return True
+
+    def _run_loop(self):
+        """Run the hub's own event loop (same pattern as PriceTracker)"""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+            self._loop = None
+
+    def _cancel_all(self):
+        asyncio.ensure_future(_cancel_tasks_and_stop(self._loop), loop=self._loop)
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+
+    def subscribe(self, symbols, intervals):
+        """
+        Subscribe to kline streams for symbols x intervals
+
+        New streams are packed into fresh combined connections; streams that
+        are already subscribed are ignored.
+
+        Args:
+            symbols: Iterable of symbols (e.g. ['BTCUSDT', 'ETHUSDT'])
+            intervals: Interval string or iterable of intervals
+        """
+        if isinstance(intervals, str):
+            intervals = [intervals]
+
+        with self._lock:
+            new_pairs = []
+            for symbol in symbols:
+                for interval in intervals:
+                    key = (symbol.upper(), interval)
+                    if key not in self._subscribed:
+                        self._subscribed.add(key)
+                        self._buffers.setdefault(key, _CandleBuffer())
+                        new_pairs.append(key)
+
+            if not new_pairs:
+                return 0
+
+            first_new_group = len(self._groups)
+            for i in range(0, len(new_pairs), self.max_streams_per_connection):
+                chunk = new_pairs[i:i + self.max_streams_per_connection]
+                self._groups.append([stream_name(s, tf) for s, tf in chunk])
+            group_indexes = range(first_new_group, len(self._groups))
+
+        if self.running:
+            for index in group_indexes:
+                self._launch_group(index)
+
+        logger.info(f"Kline hub subscribed to {len(new_pairs)} new streams "
+                    f"({len(self._subscribed)} total, {len(self._groups)} connections)")
+        return len(new_pairs)
+
+    def is_subscribed(self, symbol: str, interval: str) -> bool:
+        return (symbol.upper(), interval) in self._subscribed
+
+    def _launch_group(self, index: int):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._run_group(index), self._loop)
+
+    async def _run_group(self, index: int):
+        """Keep one combined-stream connection alive, reconnecting on failure"""
+        streams = self._groups[index]
+        url = f"{self.stream_url}/stream?streams={'/'.join(streams)}"
+        group_keys = [self._key_from_stream(s) for s in streams]
+
+        while self.running:
+            try:
+                async with websockets.connect(url, max_size=None) as websocket:
+                    with self._lock:
+                        self._connected_groups.add(index)
+                    logger.info(f"🔌 Kline hub connection {index} up ({len(streams)} streams)")
+
+                    async for message in websocket:
+                        self._handle_message(message)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Kline hub connection {index} error: {e}")
+            finally:
+                # Missed updates are possible from here on - force a REST re-seed
+                with self._lock:
+                    self._connected_groups.discard(index)
+                    for key in group_keys:
+                        buf = self._buffers.get(key)
+                        if buf:
+                            buf.warm = False
+
+            if self.running:
+                await asyncio.sleep(self.reconnect_delay)
+
+    @staticmethod
+    def _key_from_stream(name: str) -> Tuple[str, str]:
+        symbol, _, interval = name.partition('@kline_')
+        return symbol.upper(), interval
+
+    # ------------------------------------------------------------------
+    # Buffer maintenance
+    # ------------------------------------------------------------------
+
+    def _handle_message(self, message):
+        """Apply one combined-stream message to the matching buffer"""
+        try:
+            payload = json.loads(message)
+            data = payload.get('data', payload)
+            if data.get('e') != 'kline':
+                return
+            k = data['k']
+            self.apply_kline(k['s'], k['i'], kline_event_to_row(k))
+        except Exception as e:
+            logger.debug(f"Kline hub could not parse message: {e}")
+
+    def apply_kline(self, symbol: str, interval: str, row: list):
+        """
+        Merge one streamed candle into the buffer
+
+        Updates the forming candle in place, appends a new candle, and marks
+        the buffer cold if a candle was skipped.
+        """
+        key = (symbol.upper(), interval)
+        with self._lock:
+            buf = self._buffers.get(key)
+            if buf is None or not buf.rows:
+                return  # Not seeded yet - nothing to extend
+
+            last_open = buf.rows[-1][0]
+            open_time = row[0]
+
+            if open_time == last_open:
+                buf.rows[-1] = row
+            elif open_time > last_open:
+                step = INTERVAL_MS.get(interval)
+                if step and open_time - last_open > step:
+                    buf.warm = False  # Gap - a candle was missed
+                    logger.debug(f"Kline hub gap on {symbol} {interval}, waiting for re-seed")
+                buf.rows.append(row)
+                if len(buf.rows) > self.max_candles:
+                    del buf.rows[:len(buf.rows) - self.max_candles]
+            else:
+                return  # Stale update
+
+            buf.updated_at = time.time()
+
+    def seed(self, symbol: str, interval: str, klines: list):
+        """
+        Seed a buffer with REST klines (oldest first)
+
+        Snapshot and buffered candles are merged by open time (the snapshot
+        wins where they overlap), and the buffer keeps the newest contiguous
+        run. Candles streamed in after the snapshot therefore survive a
+        snapshot/stream race, and a snapshot that only covers older or newer
+        candles (a deeper history or delta fetch) extends existing history
+        when the two join up.
+        """
+        if not klines:
+            return
+
+        key = (symbol.upper(), interval)
+        with self._lock:
+            buf = self._buffers.get(key)
+            if buf is None:
+                return
+
+            merged = {r[0]: r for r in buf.rows}
+            for r in klines:
+                merged[r[0]] = list(r)
+            rows = [merged[t] for t in sorted(merged)]
+
+            # Keep only the newest gap-free run
+            step = INTERVAL_MS.get(interval)
+            if step:
+                start = len(rows) - 1
+                while start > 0 and rows[start][0] - rows[start - 1][0] == step:
+                    start -= 1
+                rows = rows[start:]
+            if len(rows) > self.max_candles:
+                rows = rows[-self.max_candles:]
+
+            buf.rows = rows
+            buf.updated_at = time.time()
+            buf.warm = self._is_connected(key)
+
+    def _is_connected(self, key) -> bool:
+        name = stream_name(*key)
+        for index in self._connected_groups:
+            if name in self._groups[index]:
+                return True
+        return False
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def is_warm(self, symbol: str, interval: str, limit: int = 1) -> bool:
+        """True if the buffer can serve `limit` current candles without REST"""
+        buf = self._buffers.get((symbol.upper(), interval))
+        return bool(buf and buf.warm and len(buf.rows) >= limit)
+
+    def get_klines(self, symbol: str, interval: str, limit: int = 500) -> Optional[list]:
+        """
+        Return the last `limit` candles in REST kline layout, or None if cold
+
+        Returns a copy, so callers may hold on to it while the stream updates.
+        """
+        key = (symbol.upper(), interval)
+        with self._lock:
+            buf = self._buffers.get(key)
+            if not buf or not buf.warm or len(buf.rows) < limit:
+                return None
+            return [list(r) for r in buf.rows[-limit:]]
+
+    def get_stats(self) -> Dict:
+        """Hub statistics for logging / status commands"""
+        with self._lock:
+            warm = sum(1 for b in self._buffers.values() if b.warm)
+            return {
+                'running': self.running,
+                'streams': len(self._subscribed),
+                'connections': len(self._groups),
+                'connected': len(self._connected_groups),
+                'warm_buffers': warm,
+            }
+
+
+class FakeKlineStreamServer:
+    """
+    Local stand-in for Binance's combined kline stream endpoint (offline tests)
+
+    Serves `/stream?streams=a@kline_5m/b@kline_1h` and broadcasts whatever
+    klines are pushed with push_kline() to connections subscribed to them.
+
+    Usage:
+        server = FakeKlineStreamServer()
+        server.start()
+        hub = KlineStreamHub(stream_url=server.url)
+        ...
+        server.push_kline('BTCUSDT', '5m', row)
+        server.stop()
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self.host = host
+        self.port = port
+        self._clients = {}  # {websocket: set(stream names)}
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    def start(self):
+        """Start serving in a background thread"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout=5):
+            raise RuntimeError("Fake kline stream server failed to start")
+
+    def stop(self):
+        """Close all connections and stop the server"""
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._shutdown)
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._server = loop.run_until_complete(self._serve())
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    async def _serve(self):
+        # Newer websockets versions require a running loop when creating the server
+        return await websockets.serve(self._handler, self.host, self.port)
+
+    def _shutdown(self):
+        self._server.close()
+        asyncio.ensure_future(_cancel_tasks_and_stop(self._loop), loop=self._loop)
+
+    async def _handler(self, websocket, path=None):
+        # websockets<13 passes the path; newer versions expose it on the request
+        if path is None:
+            path = websocket.request.path
+        query = path.split('streams=', 1)[-1] if 'streams=' in path else ''
+        self._clients[websocket] = set(s for s in query.split('/') if s)
+        try:
+            await websocket.wait_closed()
+        finally:
+            self._clients.pop(websocket, None)
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    def push_kline(self, symbol: str, interval: str, row: list, closed: bool = False):
+        """
+        Broadcast one kline (REST row layout) to subscribed connections
+
+        Blocks until the message has been handed to every client.
+        """
+        name = stream_name(symbol, interval)
+        message = json.dumps({
+            'stream': name,
+            'data': {
+                'e': 'kline',
+                'E': int(time.time() * 1000),
+                's': symbol.upper(),
+                'k': {
+                    't': row[0], 'T': row[6], 's': symbol.upper(), 'i': interval,
+                    'o': str(row[1]), 'h': str(row[2]), 'l': str(row[3]), 'c': str(row[4]),
+                    'v': str(row[5]), 'q': str(row[7]), 'n': int(row[8]),
+                    'V': str(row[9]), 'Q': str(row[10]), 'x': closed,
+                },
+            },
+        })
+        future = asyncio.run_coroutine_threadsafe(self._broadcast(name, message), self._loop)
+        future.result(timeout=5)
+
+    async def _broadcast(self, name, message):
+        for websocket, streams in list(self._clients.items()):
+            if name in streams:
+                try:
+                    await websocket.send(message)
+                except Exception:
+                    pass
+
+    def drop_connections(self):
+        """Close every client connection (simulates a Binance disconnect)"""
+        async def _close_all():
+            for websocket in list(self._clients):
+                await websocket.close()
+        asyncio.run_coroutine_threadsafe(_close_all(), self._loop).result(timeout=5)
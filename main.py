@@ -9,7 +9,6 @@ import logging
 from datetime import datetime
 import sys
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Import modules
 import config
@@ -17,6 +16,7 @@ from binance_client import BinanceClient
 from telegram_bot import TelegramBot
 from chart_generator import ChartGenerator
 from indicators import analyze_multi_timeframe
+from batch_indicators import analyze_multi_timeframe_batch
 from telegram_commands import TelegramCommandHandler
 
 # Setup logging
@@ -37,7 +37,19 @@ class TradingBot:
         logger.info("Initializing Trading Bot...")
         
         # Initialize clients
-        self.binance = BinanceClient(config.BINANCE_API_KEY, config.BINANCE_API_SECRET)
+        self.binance = BinanceClient(
+            config.BINANCE_API_KEY,
+            config.BINANCE_API_SECRET,
+            use_kline_streams=config.USE_KLINE_STREAMS,
+            archive_dir=config.KLINE_ARCHIVE_DIR,
+            api_url=config.BINANCE_API_URL,
+            stream_url=config.BINANCE_STREAM_URL,
+            use_depth_streams=config.USE_DEPTH_STREAMS,
+            max_order_books=config.MAX_ORDER_BOOKS,
+            use_trade_streams=config.USE_TRADE_STREAMS,
+            max_trade_symbols=config.MAX_TRADE_SYMBOLS,
+            resample_timeframes=config.RESAMPLE_TIMEFRAMES
+        )
         self.telegram = TelegramBot(config.TELEGRAM_BOT_TOKEN, config.TELEGRAM_CHAT_ID)
         self.chart_gen = ChartGenerator(
             style=config.CHART_STYLE,
@@ -126,44 +138,55 @@ class TradingBot:
                 config.RSI_LOWER,
                 config.RSI_UPPER,
                 config.MFI_LOWER,
-                config.MFI_UPPER
+                config.MFI_UPPER,
+                symbol=symbol
             )
             
-            # Check if signal meets minimum consensus strength
-            if analysis['consensus'] != 'NEUTRAL' and \
-               analysis['consensus_strength'] >= config.MIN_CONSENSUS_STRENGTH:
-                
-                # Get current price and 24h data
-                price = self.binance.get_current_price(symbol)
-                market_data = self.binance.get_24h_data(symbol)
-                
-                signal_data = {
-                    'symbol': symbol,
-                    'timeframe_data': analysis['timeframes'],
-                    'consensus': analysis['consensus'],
-                    'consensus_strength': analysis['consensus_strength'],
-                    'price': price,
-                    'market_data': market_data,
-                    'klines_dict': klines_dict
-                }
-                
-                logger.info(f"✓ Signal found for {symbol}: {analysis['consensus']}" 
-                          f"(Strength: {analysis['consensus_strength']})")
-                return signal_data
-            
-            return None
+            return self._build_signal(symbol, klines_dict, analysis)
             
         except Exception as e:
             logger.error(f"Error analyzing {symbol}: {e}")
             return None
     
+    def _build_signal(self, symbol, klines_dict, analysis):
+        """
+        Signal data for an analyze_multi_timeframe() result
+        
+        Returns:
+            Signal data dict, or None if the consensus is below MIN_CONSENSUS_STRENGTH
+        """
+        # Check if signal meets minimum consensus strength
+        if analysis['consensus'] != 'NEUTRAL' and \
+           analysis['consensus_strength'] >= config.MIN_CONSENSUS_STRENGTH:
+            
+            # Get current price and 24h data
+            price = self.binance.get_current_price(symbol)
+            market_data = self.binance.get_24h_data(symbol)
+            
+            signal_data = {
+                'symbol': symbol,
+                'timeframe_data': analysis['timeframes'],
+                'consensus': analysis['consensus'],
+                'consensus_strength': analysis['consensus_strength'],
+                'price': price,
+                'market_data': market_data,
+                'klines_dict': klines_dict
+            }
+            
+            logger.info(f"✓ Signal found for {symbol}: {analysis['consensus']}" 
+                      f"(Strength: {analysis['consensus_strength']})")
+            return signal_data
+        
+        return None
+    
     def scan_market(self, use_fast_scan=True, max_workers=0):
         """
         Scan the market for trading signals
         
         Args:
-            use_fast_scan: Use parallel processing (default: True)
-            max_workers: Number of concurrent threads (0 = auto-scale, default: 0)
+            use_fast_scan: Prefetch all klines concurrently on the async client (default: True)
+            max_workers: Unused since the async prefetch (the request governor bounds
+                concurrency); kept for callers passing MAX_SCAN_WORKERS
         """
         logger.info(f"Starting market scan... (Fast: {use_fast_scan})")
         
@@ -187,70 +210,57 @@ class TradingBot:
         signals_found = []
         
         if use_fast_scan:
-            # AUTO-SCALE workers based on number of symbols
-            if max_workers == 0:
-                # Smart scaling: 
-                # 1-10 symbols: 5 workers
-                # 11-50 symbols: 10 workers
-                # 51-100 symbols: 15 workers
-                # 100+ symbols: 20 workers (max)
-                if len(symbols) <= 10:
-                    max_workers = 5
-                elif len(symbols) <= 50:
-                    max_workers = 10
-                elif len(symbols) <= 100:
-                    max_workers = 15
-                else:
-                    max_workers = 20
-                
-                logger.info(f"Auto-scaled workers: {max_workers} (for {len(symbols)} symbols)")
-            else:
-                # Use provided max_workers but cap at 20
-                max_workers = min(max_workers, 20)
-            
-            # FAST SCAN - Parallel processing
+            # FAST SCAN - all klines fetched concurrently on one event loop,
+            # then analyzed from the cache (no thread pool)
             self.telegram.send_message(
                 f"🔍 <b>Fast Market Scan Started</b>\n\n"
                 f"⚡ Analyzing {len(symbols)} symbols\n"
-                f"🚀 Using {max_workers} parallel threads (auto-scaled)\n"
+                f"🚀 Fetching all timeframes concurrently (async)\n"
                 f"⏳ Please wait..."
             )
             
-            completed_count = 0
+            # Only the planned source timeframes are requested (the rest are resampled)
+            plan = self.binance.plan_timeframes(config.TIMEFRAMES, 200)
+            fetched_intervals = [i for i, (source, _) in plan.items() if i == source]
+            prefetched = self.binance.prefetch_multi_timeframe_data(symbols, config.TIMEFRAMES, limit=200)
             
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # Submit all analysis tasks
-                future_to_symbol = {
-                    executor.submit(self.analyze_symbol, symbol): symbol 
-                    for symbol in symbols
-                }
-                
-                # Process results as they complete
-                for future in as_completed(future_to_symbol):
-                    symbol = future_to_symbol[future]
-                    completed_count += 1
-                    
-                    try:
-                        signal_data = future.result()
-                        
-                        if signal_data:
-                            signals_found.append(signal_data)
-                        
-                        # Send progress update every 20%
-                        progress_pct = (completed_count / len(symbols)) * 100
-                        if completed_count % max(1, len(symbols) // 5) == 0:
-                            elapsed = time.time() - start_time
-                            avg_time = elapsed / completed_count
-                            remaining = (len(symbols) - completed_count) * avg_time
-                            
-                            self.telegram.send_message(
-                                f"⏳ Progress: {completed_count}/{len(symbols)} ({progress_pct:.0f}%)\n"
-                                f"📊 Signals: {len(signals_found)}\n"
-                                f"⏱️ Est. remaining: {remaining:.0f}s"
-                            )
+            # The rest is local work - one update once the network part is done
+            self.telegram.send_message(
+                f"⏳ Klines loaded in {time.time() - start_time:.0f}s "
+                f"({prefetched} windows) - analyzing {len(symbols)} symbols..."
+            )
+            
+            # Read every window from the cache, then evaluate RSI/MFI for all
+            # symbols at once (one vectorized pass per timeframe)
+            klines_by_symbol = {}
+            for symbol in symbols:
+                klines_dict = self.binance.get_multi_timeframe_data(symbol, config.TIMEFRAMES, limit=200)
+                if klines_dict:
+                    klines_by_symbol[symbol] = klines_dict
+                else:
+                    logger.warning(f"No data for {symbol}")
+            
+            analyses = analyze_multi_timeframe_batch(
+                klines_by_symbol,
+                config.RSI_PERIOD,
+                config.MFI_PERIOD,
+                config.RSI_LOWER,
+                config.RSI_UPPER,
+                config.MFI_LOWER,
+                config.MFI_UPPER
+            )
+            
+            for symbol in symbols:
+                try:
+                    signal_data = None
+                    if symbol in analyses:
+                        signal_data = self._build_signal(symbol, klines_by_symbol[symbol], analyses[symbol])
                     
-                    except Exception as e:
-                        logger.error(f"Error processing result for {symbol}: {e}")
+                    if signal_data:
+                        signals_found.append(signal_data)
+                
+                except Exception as e:
+                    logger.error(f"Error processing result for {symbol}: {e}")
         
         else:
             # NORMAL SCAN - Sequential processing
@@ -278,7 +288,9 @@ class TradingBot:
         )
         
         if use_fast_scan:
-            summary_msg += f"\n⚡ Threads used: {max_workers}"
+            summary_msg += (f"\n⚡ Async prefetch: {prefetched} windows "
+                            f"({'/'.join(fetched_intervals)} fetched, "
+                            f"{len(plan) - len(fetched_intervals)} timeframes resampled)")
         
         self.telegram.send_message(summary_msg)
         
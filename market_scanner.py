@@ -15,8 +15,8 @@ Enhanced with Advanced Detection System:
 import logging
 import time
 import threading
-from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
@@ -70,6 +70,9 @@ class MarketScanner:
         self.advanced_confidence_threshold = 70  # Minimum confidence for advanced signals
         self.institutional_flow_threshold = 50   # Minimum institutional score
         
+        # Extreme coins run bot / advanced detection (blocking REST) in parallel
+        self.analysis_workers = 10
+        
         detector_status = "with Advanced Detection" if self.advanced_detector else "basic mode"
         logger.info(f"✅ Market scanner v2.0 initialized {detector_status} (interval: {self.scan_interval}s, RSI: {self.rsi_lower}-{self.rsi_upper})")
     
@@ -151,19 +154,22 @@ class MarketScanner:
             
             logger.info(f"Scanning {len(all_symbols)} USDT pairs...")
             
+            # Stream 1D candles so the next cycle reads from memory instead of REST
+            self.binance.subscribe_klines(all_symbols, '1d')
+            
             extreme_coins = []
             
-            # Use thread pool for parallel scanning
-            max_workers = 10  # Limit concurrent requests
+            # Fetch every 1D window concurrently, handing each to the pool as it
+            # arrives - extreme coins still make blocking REST calls for bot /
+            # advanced detection, so those run in parallel with the batch
+            batch = self.binance.get_klines_batch(all_symbols, '1d', limit=100, stream=True)
             
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # Submit all analysis tasks
+            with ThreadPoolExecutor(max_workers=self.analysis_workers) as executor:
                 future_to_symbol = {
-                    executor.submit(self._analyze_coin_1d, symbol): symbol 
-                    for symbol in all_symbols
+                    executor.submit(self._analyze_coin_1d, symbol, df_1d): symbol
+                    for symbol, df_1d in batch
                 }
                 
-                # Collect results
                 for future in as_completed(future_to_symbol):
                     symbol = future_to_symbol[future]
                     try:
@@ -175,13 +181,16 @@ class MarketScanner:
                     except Exception as e:
                         logger.debug(f"Error analyzing {symbol}: {e}")
             
+            # Results arrive in completion order - restore the volume ranking
+            rank = {symbol: i for i, symbol in enumerate(all_symbols)}
+            extreme_coins.sort(key=lambda coin: rank.get(coin['symbol'], len(rank)))
             return extreme_coins
             
         except Exception as e:
             logger.error(f"Error scanning market: {e}")
             return []
     
-    def _analyze_coin_1d(self, symbol):
+    def _analyze_coin_1d(self, symbol, df_1d=None):
         """
         Analyze single coin for extreme RSI on 1D timeframe
         (MFI is calculated for display but only RSI triggers alerts)
@@ -189,13 +198,15 @@ class MarketScanner:
         
         Args:
             symbol: Trading symbol
+            df_1d: 1D klines (limit 100) if already fetched
         
         Returns:
             dict with analysis or None
         """
         try:
             # Get 1D klines
-            df_1d = self.binance.get_klines(symbol, '1d', limit=100)
+            if df_1d is None:
+                df_1d = self.binance.get_klines(symbol, '1d', limit=100)
             
             if df_1d is None or len(df_1d) < 14:
                 return None
@@ -271,7 +282,9 @@ class MarketScanner:
                         for bot_type, data in bot_activity.items():
                             if data.get('detected'):
                                 logger.warning(f"🚨 {symbol}: {bot_type.upper()} BOT detected ({data.get('confidence')}%)")
-            
+                except Exception as e:
+                    logger.warning(f"Advanced detection failed for {symbol}: {e}")
+
             # Determine condition type (RSI only)
             conditions = []
             if current_rsi >= self.rsi_upper:
@@ -0,0 +1,259 @@
+"""
+Market Structure Engine
+BOS / CHoCH state machine for several pivot lengths in one pass
+
+SmartMoneyAnalyzer used to walk the frame once per structure (swing,
+internal), reading every bar through df.iloc. This engine runs the same
+state machine over plain float arrays for all structures together and
+writes events into preallocated buffers:
+
+    engine = MarketStructureEngine({'SWING': 33, 'INTERNAL': 5})
+    structures = engine.run(df)       # full history
+    structures = engine.update(df)    # new candles: resumes from the last settled bar
+
+Pivots look `length` bars ahead, so the last bars of a frame can still
+become pivots when new candles arrive. update() keeps the state at the
+last bar whose pivots are final and replays only the bars after it; its
+result equals run() over the whole tracked history (bar indexes count
+from the first bar run() saw).
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from indicators import find_pivots
+
+logger = logging.getLogger(__name__)
+
+# Event codes in the buffers
+BOS_BULLISH = 0
+BOS_BEARISH = 1
+CHOCH_BULLISH = 2
+CHOCH_BEARISH = 3
+
+EVENT_TYPES = {
+    BOS_BULLISH: ('BOS', 'BULLISH'),
+    BOS_BEARISH: ('BOS', 'BEARISH'),
+    CHOCH_BULLISH: ('CHoCH', 'BULLISH'),
+    CHOCH_BEARISH: ('CHoCH', 'BEARISH'),
+}
+
+
+class StructureState:
+    """Trend and swing levels of one structure after a bar"""
+
+    __slots__ = ('trend', 'last_high', 'last_low', 'prev_high', 'prev_low')
+
+    def __init__(self):
+        self.trend = None  # 'BULLISH' or 'BEARISH'
+        self.last_high = None
+        self.last_low = None
+        self.prev_high = None
+        self.prev_low = None
+
+    def copy(self) -> 'StructureState':
+        state = StructureState()
+        state.trend = self.trend
+        state.last_high, state.last_low = self.last_high, self.last_low
+        state.prev_high, state.prev_low = self.prev_high, self.prev_low
+        return state
+
+
+class EventBuffer:
+    """Preallocated (bar, code, price) event arrays"""
+
+    def __init__(self, capacity: int):
+        self.bars = np.empty(capacity, dtype=np.int64)
+        self.codes = np.empty(capacity, dtype=np.int8)
+        self.prices = np.empty(capacity, dtype=np.float64)
+        self.count = 0
+
+    def append(self, bar: int, code: int, price: float):
+        n = self.count
+        self.bars[n] = bar
+        self.codes[n] = code
+        self.prices[n] = price
+        self.count = n + 1
+
+    def events(self, start: int = 0, stop: Optional[int] = None) -> List[Tuple[int, int, float]]:
+        stop = self.count if stop is None else stop
+        return list(zip(self.bars[start:stop].tolist(), self.codes[start:stop].tolist(),
+                        self.prices[start:stop].tolist()))
+
+
+class MarketStructureEngine:
+    """
+    BOS / CHoCH detection for named pivot lengths (e.g. SWING and INTERNAL)
+
+    Per bar and structure: a pivot updates last / previous swing levels;
+    in an uptrend a close above the previous swing high is a bullish BOS
+    (bearish BOS mirrored); a close through the last swing high outside an
+    uptrend is a bullish CHoCH and flips the trend (bearish CHoCH mirrored).
+    """
+
+    def __init__(self, lengths: Dict[str, int]):
+        """
+        Args:
+            lengths: {structure name: pivot length}, e.g. {'SWING': 33, 'INTERNAL': 5}
+        """
+        self.lengths = dict(lengths)
+        self.max_length = max(self.lengths.values())
+        self.reset()
+
+    def reset(self):
+        """Forget all processed bars"""
+        self._states = {name: StructureState() for name in self.lengths}
+        self._events = {name: [] for name in self.lengths}       # Settled (bar, code, price)
+        self._pivots = {name: ([], []) for name in self.lengths}  # Settled pivot highs / lows
+        self._settled = -1          # Bar index of the last settled bar
+        self._settled_time = None   # Its open time
+
+    def run(self, df: pd.DataFrame) -> Dict[str, Dict]:
+        """
+        Analyze a whole frame from scratch
+
+        Args:
+            df: DataFrame with high, low, close columns
+
+        Returns:
+            {structure name: structure dict} (see _result)
+        """
+        self.reset()
+        return self._process(df, 0, 0)
+
+    def update(self, df: pd.DataFrame) -> Dict[str, Dict]:
+        """
+        Continue with a newer frame of the same symbol / timeframe
+
+        The frame must still contain the last settled bar (and enough
+        candles before it for the pivot windows); otherwise the history is
+        restarted from this frame, as run() would.
+
+        Args:
+            df: DataFrame with high, low, close columns, overlapping the previous one
+
+        Returns:
+            {structure name: structure dict} for the whole tracked history
+        """
+        if self._settled_time is None:
+            return self.run(df)
+
+        matches = np.flatnonzero(df.index == self._settled_time)
+        if len(matches) == 0:
+            logger.debug("Structure history does not overlap the new candles - restarting")
+            return self.run(df)
+
+        pos = int(matches[0])
+        origin = self._settled - pos  # Bar index of df's first row
+        if origin > 0 and pos + 1 < self.max_length:
+            return self.run(df)  # Pivot windows would reach before this frame
+        return self._process(df, pos + 1, origin)
+
+    def _process(self, df: pd.DataFrame, start: int, origin: int) -> Dict[str, Dict]:
+        """Replay rows start.. of df on top of the settled state"""
+        close = pd.to_numeric(df['close'], errors='coerce').to_numpy(dtype=np.float64)
+        n = len(close)
+        settle = n - 1 - self.max_length  # Rows after this can still gain pivots
+
+        # Pivots of the replayed rows (their full left windows included)
+        window_start = max(0, start - self.max_length)
+        names = list(self.lengths)
+        pivot_highs, pivot_lows = [], []
+        for name in names:
+            highs, lows = find_pivots(df.iloc[window_start:], self.lengths[name])
+            pivot_highs.append(highs.to_numpy()[start - window_start:].tolist())
+            pivot_lows.append(lows.to_numpy()[start - window_start:].tolist())
+
+        # A bar emits at most one BOS and two CHoCH per structure
+        states = [self._states[name].copy() for name in names]
+        buffers = [EventBuffer(3 * max(n - start, 0)) for _ in names]
+        settled_states, settled_counts = None, None
+        structures = list(zip(states, pivot_highs, pivot_lows, buffers))
+
+        for offset, close_i in enumerate(close[start:].tolist()):
+            i = origin + start + offset
+            for state, highs, lows, buffer in structures:
+                # Update swing points
+                pivot = highs[offset]
+                if pivot == pivot:
+                    state.prev_high = state.last_high
+                    state.last_high = pivot
+                pivot = lows[offset]
+                if pivot == pivot:
+                    state.prev_low = state.last_low
+                    state.last_low = pivot
+
+                # Need at least one previous swing point
+                if state.last_high is None or state.last_low is None:
+                    continue
+
+                # BOS: trend continuation through the previous swing level
+                trend = state.trend
+                if trend == 'BULLISH' and state.prev_high is not None and close_i > state.prev_high:
+                    buffer.append(i, BOS_BULLISH, state.prev_high)
+                if trend == 'BEARISH' and state.prev_low is not None and close_i < state.prev_low:
+                    buffer.append(i, BOS_BEARISH, state.prev_low)
+
+                # CHoCH: counter-trend break of the last swing level
+                if state.trend != 'BULLISH' and close_i > state.last_high:
+                    buffer.append(i, CHOCH_BULLISH, state.last_high)
+                    state.trend = 'BULLISH'
+                if state.trend != 'BEARISH' and close_i < state.last_low:
+                    buffer.append(i, CHOCH_BEARISH, state.last_low)
+                    state.trend = 'BEARISH'
+
+            if start + offset == settle:
+                settled_states = [state.copy() for state in states]
+                settled_counts = [buffer.count for buffer in buffers]
+
+        results = {}
+        for k, name in enumerate(names):
+            events = self._events[name] + buffers[k].events()
+            highs = self._pivots[name][0] + [p for p in pivot_highs[k] if p == p]
+            lows = self._pivots[name][1] + [p for p in pivot_lows[k] if p == p]
+            results[name] = self._result(name, states[k], events, highs, lows)
+
+        # Keep the state of the last bar whose pivots can no longer change
+        if settled_states is not None:
+            settled_rows = settle - start + 1
+            for k, name in enumerate(names):
+                self._states[name] = settled_states[k]
+                self._events[name].extend(buffers[k].events(0, settled_counts[k]))
+                self._pivots[name][0].extend(p for p in pivot_highs[k][:settled_rows] if p == p)
+                self._pivots[name][1].extend(p for p in pivot_lows[k][:settled_rows] if p == p)
+            self._settled = origin + settle
+            self._settled_time = df.index[settle]
+
+        return results
+
+    @staticmethod
+    def _result(name: str, state: StructureState, events: List[Tuple[int, int, float]],
+                pivot_highs: List[float], pivot_lows: List[float]) -> Dict:
+        """
+        Structure dict: trend, BOS / CHoCH event dicts, last swing levels
+        and every pivot high / low (for equal high / low detection)
+        """
+        bos_levels, choch_levels = [], []
+        for bar, code, price in events:
+            event_type, bias = EVENT_TYPES[code]
+            event = {
+                'type': event_type,
+                'bias': bias,
+                'price': price,
+                'bar_index': bar,
+                'structure_type': name
+            }
+            (bos_levels if event_type == 'BOS' else choch_levels).append(event)
+
+        return {
+            'trend': state.trend,
+            'bos_levels': bos_levels,
+            'choch_levels': choch_levels,
+            'last_swing_high': state.last_high,
+            'last_swing_low': state.last_low,
+            'pivot_highs': pivot_highs,
+            'pivot_lows': pivot_lows
+        }
@@ -14,6 +14,8 @@ import numpy as np
 import logging
 from typing import Dict, List, Optional, Tuple
 
+from indicators import calculate_atr, find_first_touch, find_pivots
+
 logger = logging.getLogger(__name__)
 
 
@@ -58,18 +60,7 @@ class OrderBlockDetector:
     def _calculate_atr(self, df: pd.DataFrame) -> pd.Series:
         """Calculate Average True Range"""
         try:
-            high = df['high']
-            low = df['low']
-            close = df['close']
-            
-            tr1 = high - low
-            tr2 = abs(high - close.shift(1))
-            tr3 = abs(low - close.shift(1))
-            
-            tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-            atr = tr.rolling(window=self.atr_period).mean()
-            
-            return atr
+            return calculate_atr(df, self.atr_period)
         except Exception as e:
             logger.error(f"Error calculating ATR: {e}")
             return pd.Series(dtype=float)
@@ -86,25 +77,7 @@ class OrderBlockDetector:
             Tuple of (swing_highs, swing_lows) as Series
         """
         try:
-            high = df['high']
-            low = df['low']
-            
-            swing_highs = pd.Series(index=df.index, dtype=float)
-            swing_lows = pd.Series(index=df.index, dtype=float)
-            
-            # Find swing highs (highest high in window)
-            for i in range(length, len(df) - length):
-                window = high[i-length:i+length+1]
-                if high.iloc[i] == window.max():
-                    swing_highs.iloc[i] = high.iloc[i]
-            
-            # Find swing lows (lowest low in window)
-            for i in range(length, len(df) - length):
-                window = low[i-length:i+length+1]
-                if low.iloc[i] == window.min():
-                    swing_lows.iloc[i] = low.iloc[i]
-            
-            return swing_highs, swing_lows
+            return find_pivots(df, length)
             
         except Exception as e:
             logger.error(f"Error finding swing highs/lows: {e}")
@@ -123,130 +96,104 @@ class OrderBlockDetector:
             List of Order Block dictionaries
         """
         try:
-            order_blocks = []
+            open_price = df['open'].to_numpy(dtype=np.float64)
+            high = df['high'].to_numpy(dtype=np.float64)
+            low = df['low'].to_numpy(dtype=np.float64)
+            close = df['close'].to_numpy(dtype=np.float64)
             
             # Find swing points
             swing_highs, swing_lows = self._find_swing_highs_lows(df, pivot_length)
             
             # Calculate ATR if filtering enabled
-            atr = self._calculate_atr(df) if self.use_atr_filter else None
-            
-            current_price = float(df['close'].iloc[-1])
-            
-            # Track market structure
-            last_swing_high = None
-            last_swing_low = None
-            
-            for i in range(len(df)):
-                # Update swing points
-                if not pd.isna(swing_highs.iloc[i]):
-                    last_swing_high = float(swing_highs.iloc[i])
-                
-                if not pd.isna(swing_lows.iloc[i]):
-                    last_swing_low = float(swing_lows.iloc[i])
-                
-                # Need both swing points to detect structure break
-                if last_swing_high is None or last_swing_low is None:
-                    continue
-                
-                # Detect Bullish Order Block (break of swing high)
-                if i > 0 and float(df['close'].iloc[i]) > last_swing_high:
-                    # Find last bearish candle before break (opposite candle)
-                    for j in range(i-1, max(0, i-10), -1):
-                        open_j = float(df['open'].iloc[j])
-                        close_j = float(df['close'].iloc[j])
-                        high_j = float(df['high'].iloc[j])
-                        low_j = float(df['low'].iloc[j])
-                        
-                        if close_j < open_j:  # Bearish candle
-                            ob_top = high_j
-                            ob_bottom = low_j
-                            ob_size = ob_top - ob_bottom
-                            
-                            # Apply ATR filter
-                            if self.use_atr_filter and atr is not None:
-                                threshold = float(atr.iloc[j]) * self.atr_multiplier
-                                if ob_size < threshold:
-                                    continue
-                            
-                            # Check if already mitigated (price went back below OB)
-                            mitigated = False
-                            for k in range(j+1, len(df)):
-                                if float(df['low'].iloc[k]) < ob_bottom:
-                                    mitigated = True
-                                    break
-                            
-                            distance_to_top = ((ob_top - current_price) / current_price * 100)
-                            distance_to_bottom = ((ob_bottom - current_price) / current_price * 100)
-                            
-                            order_blocks.append({
-                                'type': ob_type,
-                                'bias': 'BULLISH',
-                                'top': ob_top,
-                                'bottom': ob_bottom,
-                                'midpoint': (ob_top + ob_bottom) / 2.0,
-                                'size': ob_size,
-                                'size_percentage': (ob_size / ob_bottom * 100) if ob_bottom > 0 else 0,
-                                'bar_index': j,
-                                'mitigated': mitigated,
-                                'distance_to_top_percent': distance_to_top,
-                                'distance_to_bottom_percent': distance_to_bottom,
-                                'status': 'MITIGATED' if mitigated else 'ACTIVE'
-                            })
-                            break
-                
-                # Detect Bearish Order Block (break of swing low)
-                if i > 0 and float(df['close'].iloc[i]) < last_swing_low:
-                    # Find last bullish candle before break (opposite candle)
-                    for j in range(i-1, max(0, i-10), -1):
-                        open_j = float(df['open'].iloc[j])
-                        close_j = float(df['close'].iloc[j])
-                        high_j = float(df['high'].iloc[j])
-                        low_j = float(df['low'].iloc[j])
-                        
-                        if close_j > open_j:  # Bullish candle
-                            ob_top = high_j
-                            ob_bottom = low_j
-                            ob_size = ob_top - ob_bottom
-                            
-                            # Apply ATR filter
-                            if self.use_atr_filter and atr is not None:
-                                threshold = float(atr.iloc[j]) * self.atr_multiplier
-                                if ob_size < threshold:
-                                    continue
-                            
-                            # Check if already mitigated (price went back above OB)
-                            mitigated = False
-                            for k in range(j+1, len(df)):
-                                if float(df['high'].iloc[k]) > ob_top:
-                                    mitigated = True
-                                    break
-                            
-                            distance_to_top = ((ob_top - current_price) / current_price * 100)
-                            distance_to_bottom = ((ob_bottom - current_price) / current_price * 100)
-                            
-                            order_blocks.append({
-                                'type': ob_type,
-                                'bias': 'BEARISH',
-                                'top': ob_top,
-                                'bottom': ob_bottom,
-                                'midpoint': (ob_top + ob_bottom) / 2.0,
-                                'size': ob_size,
-                                'size_percentage': (ob_size / ob_top * 100) if ob_top > 0 else 0,
-                                'bar_index': j,
-                                'mitigated': mitigated,
-                                'distance_to_top_percent': distance_to_top,
-                                'distance_to_bottom_percent': distance_to_bottom,
-                                'status': 'MITIGATED' if mitigated else 'ACTIVE'
-                            })
-                            break
-            
-            return order_blocks
+            atr = self._calculate_atr(df).to_numpy(dtype=np.float64) if self.use_atr_filter else None
+            
+            current_price = float(close[-1])
+            
+            # Track market structure: last swing high / low seen at each bar,
+            # breaks only count once both exist (and never on the first bar)
+            last_swing_high = swing_highs.ffill().to_numpy(dtype=np.float64)
+            last_swing_low = swing_lows.ffill().to_numpy(dtype=np.float64)
+            tracking = ~np.isnan(last_swing_high) & ~np.isnan(last_swing_low)
+            tracking[0] = False
+            
+            # Bullish OB: close breaks the swing high, origin is the last bearish candle before it
+            # Bearish OB: close breaks the swing low, origin is the last bullish candle before it
+            bullish_breaks = np.flatnonzero(tracking & (close > last_swing_high))
+            bearish_breaks = np.flatnonzero(tracking & (close < last_swing_low))
+            bullish_origins = self._find_origin_candles(close < open_price, high - low, atr, bullish_breaks)
+            bearish_origins = self._find_origin_candles(close > open_price, high - low, atr, bearish_breaks)
+            
+            # Blocks in the order the bar-by-bar scan finds them (bullish first on a bar)
+            breaks = np.concatenate([bullish_breaks, bearish_breaks])
+            origins = np.concatenate([bullish_origins, bearish_origins])
+            bullish = np.arange(len(breaks)) < len(bullish_breaks)
+            found = origins >= 0
+            order = np.argsort(breaks * 2 + ~bullish, kind='stable')
+            order = order[found[order]]
+            breaks, origins, bullish = breaks[order], origins[order], bullish[order]
+            
+            # Mitigated once price trades back through the block (below a bullish OB, above a bearish one)
+            mitigated_at = np.where(
+                bullish,
+                find_first_touch(low, origins + 1, low[origins], 'below', inclusive=False),
+                find_first_touch(high, origins + 1, high[origins], 'above', inclusive=False)
+            )
+            
+            return [
+                self._make_order_block(ob_type, 'BULLISH' if is_bullish else 'BEARISH',
+                                       float(high[j]), float(low[j]), int(j), bool(m >= 0), current_price)
+                for j, is_bullish, m in zip(origins, bullish, mitigated_at)
+            ]
             
         except Exception as e:
             logger.error(f"Error detecting order blocks: {e}")
             return []
     
+    def _find_origin_candles(self, opposite: np.ndarray, size: np.ndarray, atr: Optional[np.ndarray],
+                             breaks: np.ndarray) -> np.ndarray:
+        """
+        Origin candle of each break: the latest opposite candle among the 9 bars before it
+        
+        Args:
+            opposite: Mask of candles of the opposite direction to the break
+            size: Candle ranges (high - low)
+            atr: ATR array, or None when the ATR filter is off
+            breaks: Indexes of the breaking bars
+            
+        Returns:
+            Origin index per break, -1 where no candle qualifies
+        """
+        candidates = opposite
+        if atr is not None:
+            # Candles smaller than ATR * multiplier are skipped
+            candidates = candidates & ~(size < atr * self.atr_multiplier)
+        
+        latest = np.maximum.accumulate(np.where(candidates, np.arange(len(candidates)), -1))
+        origins = latest[breaks - 1]
+        origins[origins <= np.maximum(breaks - 10, 0)] = -1
+        return origins
+    
+    def _make_order_block(self, ob_type: str, bias: str, ob_top: float, ob_bottom: float,
+                          bar_index: int, mitigated: bool, current_price: float) -> Dict:
+        """Build the Order Block dict for one origin candle"""
+        ob_size = ob_top - ob_bottom
+        reference = ob_bottom if bias == 'BULLISH' else ob_top
+        
+        return {
+            'type': ob_type,
+            'bias': bias,
+            'top': ob_top,
+            'bottom': ob_bottom,
+            'midpoint': (ob_top + ob_bottom) / 2.0,
+            'size': ob_size,
+            'size_percentage': (ob_size / reference * 100) if reference > 0 else 0,
+            'bar_index': bar_index,
+            'mitigated': mitigated,
+            'distance_to_top_percent': ((ob_top - current_price) / current_price * 100),
+            'distance_to_bottom_percent': ((ob_bottom - current_price) / current_price * 100),
+            'status': 'MITIGATED' if mitigated else 'ACTIVE'
+        }
+    
     def detect_order_blocks(self, df: pd.DataFrame, max_blocks: int = 5) -> Optional[Dict]:
         """
         Detect both Swing and Internal Order Blocks
@@ -0,0 +1,426 @@
+"""
+Order Book Manager
+Locally maintained L2 order books from Binance depth diff streams
+
+Bot / pump detectors used to call get_order_book(limit=100) for every
+analysis - 5 request weight each, and already stale by the time the book
+was scored. The manager keeps live books for hot symbols instead, following
+Binance's documented procedure:
+
+    1. Subscribe <symbol>@depth@100ms and buffer the diff events
+    2. Fetch a REST snapshot (lastUpdateId)
+    3. Drop buffered events with u <= lastUpdateId
+    4. Apply events in order; each must satisfy U <= lastUpdateId + 1 <= u
+    5. Quantity "0" removes a price level
+
+A sequence gap (an event starting after lastUpdateId + 1) marks the book
+unsynced and triggers a fresh snapshot; a dropped connection re-snapshots
+every book. Snapshots are taken at the 1000-level maximum (weight 50)
+while reads are served only up to the depth the detectors use (100
+levels): levels beyond a snapshot only enter the book when a diff touches
+them, so the margin keeps the served top of book complete as price moves.
+
+All books share one combined connection; symbols are added and removed
+with live SUBSCRIBE / UNSUBSCRIBE messages, as in TradeStreamHub. Books are
+only kept for symbols tracked explicitly (e.g. a watchlist), at most
+`max_books` of them; the least recently read is dropped when a new symbol
+is tracked.
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional
+
+import websockets
+
+from kline_stream_hub import BINANCE_STREAM_URL, _cancel_tasks_and_stop
+
+logger = logging.getLogger(__name__)
+
+
+def depth_stream_name(symbol: str, speed: str = '100ms') -> str:
+    """Binance diff depth stream name (e.g. 'btcusdt@depth@100ms')"""
+    return f"{symbol.lower()}@depth@{speed}"
+
+
+class LocalOrderBook:
+    """
+    One symbol's L2 book: {price: [price_str, qty_str]} per side
+
+    Prices are keyed as floats so differently formatted strings for the same
+    level collapse; the original strings are kept for REST-layout output.
+    """
+
+    __slots__ = ('symbol', 'bids', 'asks', 'last_update_id', 'synced', 'updated_at', 'max_levels')
+
+    def __init__(self, symbol: str, max_levels: int = 1000):
+        self.symbol = symbol
+        self.max_levels = max_levels
+        self.bids: Dict[float, list] = {}
+        self.asks: Dict[float, list] = {}
+        self.last_update_id = 0
+        self.synced = False
+        self.updated_at = 0.0
+
+    def load_snapshot(self, snapshot: Dict):
+        """Replace the book with a REST depth snapshot"""
+        self.bids = {float(p): [p, q] for p, q in snapshot['bids']}
+        self.asks = {float(p): [p, q] for p, q in snapshot['asks']}
+        self.last_update_id = int(snapshot['lastUpdateId'])
+        self.synced = True
+        self.updated_at = time.time()
+
+    def apply_diff(self, event: Dict) -> bool:
+        """
+        Apply one depthUpdate event
+
+        Returns:
+            False if the event reveals a sequence gap (the book needs a new
+            snapshot), True otherwise (stale events are ignored)
+        """
+        first_id, last_id = int(event['U']), int(event['u'])
+        if last_id <= self.last_update_id:
+            return True  # Already covered by the snapshot
+        if first_id > self.last_update_id + 1:
+            self.synced = False
+            return False
+
+        for side, levels in ((self.bids, event['b']), (self.asks, event['a'])):
+            for price, qty in levels:
+                key = float(price)
+                if float(qty) == 0:
+                    side.pop(key, None)
+                else:
+                    side[key] = [price, qty]
+
+        self.last_update_id = last_id
+        self.updated_at = time.time()
+        self._prune()
+        return True
+
+    def _prune(self):
+        """Drop far-from-mid levels once a side grows well past max_levels"""
+        if len(self.bids) > 2 * self.max_levels:
+            keep = heapq.nlargest(self.max_levels, self.bids)
+            self.bids = {p: self.bids[p] for p in keep}
+        if len(self.asks) > 2 * self.max_levels:
+            keep = heapq.nsmallest(self.max_levels, self.asks)
+            self.asks = {p: self.asks[p] for p in keep}
+
+    def to_depth(self, limit: int = 100) -> Dict:
+        """Top `limit` levels in get_order_book() layout"""
+        return {
+            'lastUpdateId': self.last_update_id,
+            'bids': [list(self.bids[p]) for p in heapq.nlargest(limit, self.bids)],
+            'asks': [list(self.asks[p]) for p in heapq.nsmallest(limit, self.asks)],
+        }
+
+
+class OrderBookManager:
+    """
+    Live local order books for hot symbols
+
+    Usage:
+        manager = OrderBookManager(lambda s, n: client.get_order_book(symbol=s, limit=n))
+        manager.start()
+        manager.track(['BTCUSDT'])
+        depth = manager.get_order_book('BTCUSDT', limit=100)  # None until synced
+    """
+
+    def __init__(self, fetch_snapshot: Callable[[str, int], Dict], stream_url: str = BINANCE_STREAM_URL,
+                 max_books: int = 20, snapshot_limit: int = 1000, max_depth: int = 100,
+                 update_speed: str = '100ms', reconnect_delay: float = 5.0):
+        """
+        Initialize order book manager
+
+        Args:
+            fetch_snapshot: fetch_snapshot(symbol, limit) -> REST depth dict
+            stream_url: Base WebSocket URL (point at BinanceReplayServer offline)
+            max_books: Maximum symbols with a live book (least recently read is dropped)
+            snapshot_limit: Levels requested per REST snapshot (also kept after pruning)
+            max_depth: Deepest read served from a local book - well below
+                snapshot_limit so levels missing past the snapshot's edge are never served
+            update_speed: Diff stream speed ('100ms' or '1000ms')
+            reconnect_delay: Seconds to wait before reconnecting a dropped stream
+        """
+        self.fetch_snapshot = fetch_snapshot
+        self.stream_url = stream_url.rstrip('/')
+        self.max_books = min(max_books, 1024)
+        self.snapshot_limit = snapshot_limit
+        self.max_depth = min(max_depth, snapshot_limit)
+        self.update_speed = update_speed
+        self.reconnect_delay = reconnect_delay
+
+        self._books: 'OrderedDict[str, LocalOrderBook]' = OrderedDict()  # LRU by last read
+        self._lock = threading.Lock()
+
+        # Subscribed streams of the open connection, with each symbol's diff
+        # buffer and snapshot / apply task (loop thread only)
+        self._websocket = None
+        self._live_streams = set()
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._request_id = 0
+        self.connected = False
+
+        self.snapshot_count = 0
+        self.resync_count = 0
+
+        self._loop = None
+        self._thread = None
+        self._ready = threading.Event()
+        self.running = False
+
+        logger.info(f"Order book manager initialized ({self.stream_url}, max {max_books} books)")
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the manager event loop and its stream connection"""
+        if self.running:
+            return False
+
+        self.running = True
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run_loop, name='order-books', daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=5)
+        asyncio.run_coroutine_threadsafe(self._run_connection(), self._loop)
+
+        logger.info("✅ Order book manager started")
+        return True
+
+    def stop(self):
+        """Close the stream connection and stop the event loop"""
+        if not self.running:
+            return False
+
+        self.running = False
+        if self._loop:
+            self._loop.call_soon_threadsafe(
+                lambda: asyncio.ensure_future(_cancel_tasks_and_stop(self._loop), loop=self._loop)
+            )
+        if self._thread:
+            self._thread.join(timeout=5)
+
+        self._tasks.clear()
+        self._queues.clear()
+        with self._lock:
+            self.connected = False
+            for book in self._books.values():
+                book.synced = False
+
+        logger.info("⛔ Order book manager stopped")
+        return True
+
+    def _run_loop(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+            self._loop = None
+
+    # ------------------------------------------------------------------
+    # Tracking
+    # ------------------------------------------------------------------
+
+    def track(self, symbols: Iterable[str]) -> int:
+        """
+        Keep live books for symbols (subscribe their diff depth streams)
+
+        Returns:
+            Number of newly tracked symbols
+        """
+        new = 0
+        with self._lock:
+            for symbol in symbols:
+                symbol = symbol.upper()
+                if symbol in self._books:
+                    self._books.move_to_end(symbol)
+                    continue
+                self._books[symbol] = LocalOrderBook(symbol, max_levels=self.snapshot_limit)
+                new += 1
+            while len(self._books) > self.max_books:
+                self._books.popitem(last=False)
+
+        if new:
+            self._request_sync()
+            logger.info(f"Order books tracking {new} new symbols ({len(self._books)} total)")
+        return new
+
+    def untrack(self, symbol: str):
+        """Stop maintaining a symbol's book"""
+        with self._lock:
+            removed = self._books.pop(symbol.upper(), None)
+        if removed is not None:
+            self._request_sync()
+
+    def is_tracked(self, symbol: str) -> bool:
+        return symbol.upper() in self._books
+
+    def is_synced(self, symbol: str) -> bool:
+        book = self._books.get(symbol.upper())
+        return bool(book and book.synced)
+
+    def _request_sync(self):
+        if self.running and self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._sync_subscriptions(), self._loop)
+
+    async def _sync_subscriptions(self):
+        """Bring the open connection's subscriptions in line with the tracked symbols"""
+        websocket = self._websocket
+        if websocket is None:
+            return  # Picked up on (re)connect
+
+        with self._lock:
+            wanted = {depth_stream_name(s, self.update_speed): s for s in self._books}
+        removed = self._live_streams - set(wanted)
+        added = set(wanted) - self._live_streams
+        self._live_streams = set(wanted)
+
+        for stream in removed:
+            symbol = stream.split('@', 1)[0].upper()
+            self._queues.pop(symbol, None)
+            task = self._tasks.pop(symbol, None)
+            if task is not None:
+                task.cancel()
+        for stream in added:
+            # Buffer diffs from the moment the subscription is sent
+            self._queues[wanted[stream]] = asyncio.Queue()
+
+        for method, streams in (('UNSUBSCRIBE', removed), ('SUBSCRIBE', added)):
+            if not streams:
+                continue
+            self._request_id += 1
+            await websocket.send(json.dumps({'method': method, 'params': sorted(streams),
+                                             'id': self._request_id}))
+
+        for stream in added:
+            symbol = wanted[stream]
+            queue = self._queues.get(symbol)
+            if queue is not None and symbol not in self._tasks:
+                self._tasks[symbol] = asyncio.ensure_future(self._sync_book(symbol, queue))
+
+    # ------------------------------------------------------------------
+    # Stream maintenance
+    # ------------------------------------------------------------------
+
+    async def _run_connection(self):
+        """Keep the combined depth connection alive, reconnecting on failure"""
+        while self.running:
+            try:
+                async with websockets.connect(f"{self.stream_url}/stream", max_size=None) as websocket:
+                    self._websocket = websocket
+                    self._live_streams = set()
+                    await self._sync_subscriptions()
+                    with self._lock:
+                        self.connected = True
+                    logger.info(f"🔌 Order book connection up ({len(self._live_streams)} streams)")
+
+                    async for message in websocket:
+                        self._handle_message(message)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Order book connection error: {e}")
+            finally:
+                # Diffs may be missed from here on - every book needs a new snapshot
+                self._websocket = None
+                for task in self._tasks.values():
+                    task.cancel()
+                self._tasks.clear()
+                self._queues.clear()
+                with self._lock:
+                    self.connected = False
+                    for book in self._books.values():
+                        book.synced = False
+
+            if self.running:
+                await asyncio.sleep(self.reconnect_delay)
+
+    def _handle_message(self, message):
+        """Route one depthUpdate event to its symbol's diff buffer"""
+        try:
+            payload = json.loads(message)
+            data = payload.get('data', payload)
+            if data.get('e') != 'depthUpdate':
+                return
+            queue = self._queues.get(data['s'])
+            if queue is not None:
+                queue.put_nowait(data)
+        except Exception as e:
+            logger.debug(f"Order book manager could not parse message: {e}")
+
+    async def _sync_book(self, symbol: str, queue: asyncio.Queue):
+        """Snapshot one book and apply its buffered / streamed diffs, resyncing on gaps"""
+        loop = asyncio.get_running_loop()
+
+        while self.running:
+            book = self._books.get(symbol)
+            if book is None:
+                return
+            try:
+                snapshot = await loop.run_in_executor(None, self.fetch_snapshot, symbol, self.snapshot_limit)
+            except Exception as e:
+                logger.warning(f"Order book {symbol} snapshot error: {e}")
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+
+            with self._lock:
+                book.load_snapshot(snapshot)
+            self.snapshot_count += 1
+            logger.debug(f"Order book {symbol} synced at {book.last_update_id}")
+
+            in_sync = True
+            while in_sync:
+                event = await queue.get()
+                with self._lock:
+                    in_sync = book.apply_diff(event)
+
+            self.resync_count += 1
+            logger.info(f"Order book {symbol} sequence gap - resyncing")
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get_order_book(self, symbol: str, limit: int = 100) -> Optional[Dict]:
+        """
+        Current book in get_order_book() layout, or None if not synced or
+        `limit` is deeper than max_depth
+
+        Reading a book marks it recently used.
+        """
+        if limit > self.max_depth:
+            return None
+        symbol = symbol.upper()
+        with self._lock:
+            book = self._books.get(symbol)
+            if book is None or not book.synced:
+                return None
+            self._books.move_to_end(symbol)
+            return book.to_depth(limit)
+
+    def get_stats(self) -> Dict:
+        """Manager statistics for logging / status commands"""
+        with self._lock:
+            return {
+                'running': self.running,
+                'connected': self.connected,
+                'books': len(self._books),
+                'synced': sum(1 for b in self._books.values() if b.synced),
+                'snapshots': self.snapshot_count,
+                'resyncs': self.resync_count,
+            }
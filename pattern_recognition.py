@@ -8,6 +8,10 @@ from typing import Dict, List, Tuple, Optional
 from datetime import datetime, timedelta
 from collections import defaultdict
 
+import pandas as pd
+
+from indicators import calculate_atr, calculate_ema
+
 logger = logging.getLogger(__name__)
 
 
@@ -199,41 +203,12 @@ class MarketRegimeDetector:
             if klines is None or (hasattr(klines, '__len__') and len(klines) == 0):
                 return self._default_regime()
             
-            # Store original klines for ATR calculation
-            original_klines = klines
-            
             # Handle different klines formats (list, DataFrame, etc)
             try:
-                # Try to extract close and volume prices
-                if hasattr(klines, 'iloc'):  # DataFrame
-                    # Get column names (may vary: 'close' or 4, 'volume' or 5)
-                    if 'close' in klines.columns:
-                        closes = [float(klines.iloc[i]['close']) for i in range(len(klines))]
-                        volumes = [float(klines.iloc[i]['volume']) for i in range(len(klines))]
-                    else:
-                        # Use numeric indices
-                        closes = [float(klines.iloc[i][4]) for i in range(len(klines))]
-                        volumes = [float(klines.iloc[i][5]) for i in range(len(klines))]
-                    
-                    # Convert DataFrame to list of lists for ATR calculation
-                    original_klines = []
-                    for i in range(len(klines)):
-                        row = klines.iloc[i]
-                        # Handle different column formats
-                        if 'close' in klines.columns:
-                            original_klines.append([
-                                row.get('timestamp', i), row['open'], row['high'], 
-                                row['low'], row['close'], row['volume']
-                            ])
-                        else:
-                            # Numeric indices: [timestamp, open, high, low, close, volume]
-                            original_klines.append([
-                                row[0], row[1], row[2], row[3], row[4], row[5]
-                            ])
-                else:  # List of lists/tuples
-                    closes = [float(k[4]) for k in klines]
-                    volumes = [float(k[5]) for k in klines]
-            except (IndexError, KeyError, TypeError) as e:
+                candles = self._to_frame(klines)
+                closes = candles['close']
+                volumes = candles['volume']
+            except (IndexError, KeyError, TypeError, ValueError) as e:
                 logger.error(f"Error parsing klines data: {e}")
                 return self._default_regime()
             
@@ -242,7 +217,7 @@ class MarketRegimeDetector:
             ema_50 = self._calculate_ema(closes, 50)
             ema_200 = self._calculate_ema(closes, 200) if len(closes) >= 200 else None
             
-            current_price = closes[-1]
+            current_price = closes.iloc[-1]
             
             # Determine EMA trend
             if ema_200:
@@ -266,9 +241,9 @@ class MarketRegimeDetector:
                     ema_trend = 'FLAT'
                     trend_score = 0.5
             
-            # 2. Volatility (ATR-based) - use original klines
-            atr = self._calculate_atr(original_klines, 14)
-            avg_price = sum(closes[-20:]) / 20
+            # 2. Volatility (ATR-based)
+            atr = self._calculate_atr(candles, 14)
+            avg_price = closes.iloc[-20:].sum() / 20
             volatility_pct = (atr / avg_price) * 100
             
             if volatility_pct > 3:
@@ -279,8 +254,8 @@ class MarketRegimeDetector:
                 volatility = 'LOW'
             
             # 3. Volume Trend
-            recent_vol = sum(volumes[-10:]) / 10
-            older_vol = sum(volumes[-30:-10]) / 20
+            recent_vol = volumes.iloc[-10:].sum() / 10
+            older_vol = volumes.iloc[-30:-10].sum() / 20
             
             vol_change = ((recent_vol - older_vol) / older_vol) * 100
             
@@ -316,39 +291,29 @@ class MarketRegimeDetector:
             logger.error(f"Error detecting market regime: {e}")
             return self._default_regime()
     
-    def _calculate_ema(self, prices: List[float], period: int) -> float:
+    @staticmethod
+    def _to_frame(klines) -> pd.DataFrame:
+        """OHLCV DataFrame (float columns) from a klines DataFrame or list of klines"""
+        if not hasattr(klines, 'iloc'):  # List of lists/tuples
+            klines = pd.DataFrame(list(klines))
+        if 'close' not in klines.columns:
+            # Numeric columns: [timestamp, open, high, low, close, volume, ...]
+            klines = klines.rename(columns={1: 'open', 2: 'high', 3: 'low', 4: 'close', 5: 'volume'})
+        return klines[['high', 'low', 'close', 'volume']].astype(float)
+    
+    def _calculate_ema(self, prices: pd.Series, period: int) -> float:
         """Calculate Exponential Moving Average"""
         if len(prices) < period:
-            return sum(prices) / len(prices)
+            return prices.mean()
         
-        multiplier = 2 / (period + 1)
-        ema = sum(prices[:period]) / period
-        
-        for price in prices[period:]:
-            ema = (price - ema) * multiplier + ema
-        
-        return ema
+        return calculate_ema(prices, period).iloc[-1]
     
-    def _calculate_atr(self, klines: List, period: int = 14) -> float:
+    def _calculate_atr(self, candles: pd.DataFrame, period: int = 14) -> float:
         """Calculate Average True Range"""
-        if len(klines) < period + 1:
+        if len(candles) < period + 1:
             return 0
         
-        true_ranges = []
-        
-        for i in range(1, len(klines)):
-            high = float(klines[i][2])
-            low = float(klines[i][3])
-            prev_close = float(klines[i-1][4])
-            
-            tr = max(
-                high - low,
-                abs(high - prev_close),
-                abs(low - prev_close)
-            )
-            true_ranges.append(tr)
-        
-        return sum(true_ranges[-period:]) / period
+        return calculate_atr(candles, period).iloc[-1]
     
     def _default_regime(self) -> Dict:
         """Return default regime when detection fails"""
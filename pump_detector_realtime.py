@@ -21,7 +21,9 @@ import time
 import threading
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import pandas as pd
+from candles import Candles
+from streaming_indicators import StreamingRSI
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +71,18 @@ class RealtimePumpDetector:
         self.price_momentum_threshold = 2.0  # 2% price increase in 5m
         self.rsi_momentum_threshold = 10   # RSI increase > 10 in 15m
         
+        # Streaming 5m RSI per symbol - seeded once from history, then only
+        # newly closed candles are committed on each Layer 1 pass
+        self.rsi_seed_candles = 100
+        self._rsi_5m = {}  # {symbol: StreamingRSI}
+        # The monitor thread and Telegram commands both scan Layer 1 - one
+        # lock per symbol keeps a candle from being committed twice
+        self._rsi_locks = {}  # {symbol: threading.Lock}
+        self._rsi_locks_lock = threading.Lock()
+        # 5m candles per Layer 1 read - deep enough to seed the RSI from the
+        # same (batched) frame instead of a per-symbol REST call
+        self.layer1_candles = max(10, self.rsi_seed_candles)
+        
         # Quick scan settings
         self.quick_scan_enabled = True  # Enable ultra-fast detection
         self.quick_scan_top_n = 50  # Scan top 50 volume coins every 30s
@@ -194,21 +208,20 @@ class RealtimePumpDetector:
                 # Already sorted by volume descending, just take top N symbols
                 self.top_volume_cache = [s['symbol'] for s in symbols_data[:self.quick_scan_top_n]]
                 self.top_volume_cache_time = current_time
+                self.binance.subscribe_klines(self.top_volume_cache, '5m')
                 logger.info(f"Updated top volume cache: {len(self.top_volume_cache)} coins (min volume: 100k USDT)")
             
-            # Quick scan cached top volume coins
+            # Quick scan cached top volume coins (analyzed as their klines arrive)
             detected = []
-            with ThreadPoolExecutor(max_workers=30) as executor:
-                futures = {executor.submit(self._analyze_layer1, symbol): symbol 
-                          for symbol in self.top_volume_cache}
-                
-                for future in as_completed(futures):
-                    try:
-                        result = future.result()
-                        if result and result.get('pump_score', 0) >= self.layer1_threshold:
-                            detected.append(result)
-                    except Exception as e:
-                        logger.debug(f"Quick scan error: {e}")
+            batch = self.binance.get_klines_batch(self.top_volume_cache, '5m', limit=self.layer1_candles,
+                                                  stream=True)
+            for symbol, df_5m in batch:
+                try:
+                    result = self._analyze_layer1(symbol, df_5m)
+                    if result and result.get('pump_score', 0) >= self.layer1_threshold:
+                        detected.append(result)
+                except Exception as e:
+                    logger.debug(f"Quick scan error: {e}")
             
             # Store detections
             for detection in detected:
@@ -244,18 +257,19 @@ class RealtimePumpDetector:
             
             logger.info(f"Layer 1: Scanning {len(symbols)} coins...")
             
-            # Parallel scanning with MORE workers for faster detection
+            # Stream 5m candles so later sweeps read from memory instead of REST
+            self.binance.subscribe_klines(symbols, '5m')
+            
+            # 5m windows fetched concurrently, each analyzed as it arrives
             detected = []
-            with ThreadPoolExecutor(max_workers=30) as executor:  # Increased from 10 to 30
-                futures = {executor.submit(self._analyze_layer1, symbol): symbol for symbol in symbols}
-                
-                for future in as_completed(futures):
-                    try:
-                        result = future.result()
-                        if result and result.get('pump_score', 0) >= self.layer1_threshold:
-                            detected.append(result)
-                    except Exception as e:
-                        logger.error(f"Error in Layer 1 analysis: {e}")
+            for symbol, df_5m in self.binance.get_klines_batch(symbols, '5m', limit=self.layer1_candles,
+                                                               stream=True):
+                try:
+                    result = self._analyze_layer1(symbol, df_5m)
+                    if result and result.get('pump_score', 0) >= self.layer1_threshold:
+                        detected.append(result)
+                except Exception as e:
+                    logger.error(f"Error in Layer 1 analysis: {e}")
             
             # Store detections for Layer 2 confirmation
             for detection in detected:
@@ -275,16 +289,21 @@ class RealtimePumpDetector:
         except Exception as e:
             logger.error(f"Error in Layer 1 scan: {e}", exc_info=True)
     
-    def _analyze_layer1(self, symbol: str) -> Optional[Dict]:
+    def _analyze_layer1(self, symbol: str, df_5m: Optional[pd.DataFrame] = None) -> Optional[Dict]:
         """
         Analyze single coin for Layer 1 (5m fast detection)
         
+        Args:
+            symbol: Trading symbol
+            df_5m: Last layer1_candles 5m candles if already fetched (e.g. by get_klines_batch)
+        
         Returns:
             Dict with pump_score and indicators, or None
         """
         try:
-            # Get 5m klines (last 10 candles = 50 minutes)
-            df_5m = self.binance.get_klines(symbol, '5m', limit=10)
+            # Get 5m klines (scores use the last 10 candles = 50 minutes)
+            if df_5m is None:
+                df_5m = self.binance.get_klines(symbol, '5m', limit=self.layer1_candles)
             if df_5m is None or len(df_5m) < 5:
                 return None
             
@@ -316,15 +335,9 @@ class RealtimePumpDetector:
             green_score = (green_candles / 5) * 20
             
             # 4. RSI MOMENTUM (5m)
-            from indicators import calculate_rsi, calculate_hlcc4
-            hlcc4 = calculate_hlcc4(df_5m)
-            rsi_5m = calculate_rsi(hlcc4, period=14)
-            
-            if rsi_5m is None or len(rsi_5m) < 4:
+            current_rsi, rsi_3_ago = self._rsi_momentum(symbol, df_5m)  # 15 minutes apart
+            if current_rsi is None:
                 return None
-            
-            current_rsi = rsi_5m.iloc[-1]
-            rsi_3_ago = rsi_5m.iloc[-4]  # 15 minutes ago
             rsi_change = current_rsi - rsi_3_ago
             
             rsi_score = 0
@@ -367,6 +380,48 @@ class RealtimePumpDetector:
             logger.debug(f"Error analyzing {symbol} Layer 1: {e}")
             return None
     
+    def _rsi_momentum(self, symbol: str, df_5m: pd.DataFrame) -> Tuple[Optional[float], Optional[float]]:
+        """
+        RSI(14) on 5m HLCC4 for the last candle and 3 candles earlier
+        
+        Uses the symbol's StreamingRSI: closed candles newer than its state are
+        committed and a forming candle is peeked, so each pass costs the same
+        however much history the RSI needs. The state is (re)seeded on first
+        use or after missed candles - from df_5m itself when it holds
+        rsi_seed_candles candles (Layer 1 batches fetch that many). Seed, feed
+        and read run under the symbol's lock.
+        
+        Returns:
+            (current_rsi, rsi_3_ago), or (None, None) without enough history
+        """
+        now_ms = int(time.time() * 1000)
+        window = Candles.from_frame(df_5m)
+        with self._rsi_locks_lock:
+            lock = self._rsi_locks.setdefault(symbol, threading.Lock())
+        
+        with lock:
+            rsi = self._rsi_5m.get(symbol)
+            current = rsi.feed(window, now_ms) if rsi is not None else None
+            
+            if current is None:
+                history = df_5m
+                if len(history) < self.rsi_seed_candles:
+                    history = self.binance.get_klines(symbol, '5m', limit=self.rsi_seed_candles)
+                if history is None or len(history) < 4:
+                    return None, None
+                rsi = StreamingRSI(period=14, history=4)
+                rsi.seed(Candles.from_frame(history), now_ms)
+                self._rsi_5m[symbol] = rsi
+                current = rsi.feed(window, now_ms)
+                if current is None:
+                    return None, None
+            
+            # A forming last candle is not in the committed history
+            back = 3 if window.close_time[-1] >= now_ms else 4
+            if len(rsi.history) < back:
+                return None, None
+            return current, rsi.history[-back]
+    
     def _scan_layer2(self):
         """
         Layer 2: Confirmation on 1h/4h timeframe
@@ -0,0 +1,416 @@
+"""
+Binance Request Governor
+Shared, thread-safe request-weight budget for every Binance REST call
+
+Every python-binance request made through a governed client is charged its
+documented endpoint weight before it is sent. Two limits are enforced:
+
+- A global token bucket refilled at the per-minute weight limit, so 30 scan
+  workers cannot burst through the whole minute's budget in a few seconds.
+- A fixed 1-minute window synchronised with Binance's X-MBX-USED-WEIGHT-1M
+  response header, so requests wait for the window to roll over *before*
+  the server would answer 429. A 429/418 that does slip through blocks all
+  requests until its Retry-After has passed.
+
+One governor is shared per process (get_shared_governor) because Binance
+counts weight per IP, not per client instance.
+
+Requests run in one of two priority lanes, set per thread / asyncio task
+with request_priority():
+
+- INTERACTIVE - user-triggered work (/BTC, /analyzer, the WebApp AI
+  analysis). May spend the whole budget and waits in short polls.
+- BACKGROUND (default) - scanners and monitors. Cannot touch the
+  interactive reserve (a share of the bucket and of the minute window) and
+  yields while any interactive request is waiting, so a user command is
+  not stuck behind a full-market sweep.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Binance spot request weight per minute (per IP)
+DEFAULT_WEIGHT_LIMIT = 6000
+
+# Documented weights for /api/v3/<endpoint> (https://binance-docs.github.io/apidocs/spot/en/)
+ENDPOINT_WEIGHTS = {
+    'ping': 1,
+    'time': 1,
+    'exchangeInfo': 20,
+    'trades': 25,
+    'historicalTrades': 25,
+    'aggTrades': 4,
+    'klines': 2,
+    'uiKlines': 2,
+    'avgPrice': 2,
+}
+
+# Weight of /api/v3/depth by limit upper bound
+DEPTH_WEIGHTS = ((100, 5), (500, 25), (1000, 50), (5000, 250))
+
+# Ticker endpoints: (single symbol weight, all symbols weight)
+TICKER_WEIGHTS = {
+    'ticker/24hr': (2, 80),
+    'ticker/price': (2, 4),
+    'ticker/bookTicker': (2, 4),
+}
+
+
+# Priority lanes
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+LANES = (INTERACTIVE, BACKGROUND)
+
+_current_lane = contextvars.ContextVar('binance_request_lane', default=BACKGROUND)
+
+
+def current_priority() -> str:
+    """Lane of the current thread / asyncio task"""
+    return _current_lane.get()
+
+
+@contextmanager
+def request_priority(lane: str):
+    """
+    Run Binance requests made inside the block in `lane`
+
+    Usage:
+        with request_priority(INTERACTIVE):
+            analyze(symbol)
+    """
+    if lane not in LANES:
+        raise ValueError(f"Unknown request lane: {lane}")
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+def interactive(func):
+    """Decorator: run a user-facing handler's Binance requests in the INTERACTIVE lane"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with request_priority(INTERACTIVE):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+async def run_in_lane(coro, lane: str):
+    """Await a coroutine in `lane` (for coroutines handed to another thread's loop)"""
+    with request_priority(lane):
+        return await coro
+
+
+def endpoint_weight(endpoint: str, params: Optional[Dict] = None) -> int:
+    """
+    Documented request weight for a Binance spot endpoint
+
+    Args:
+        endpoint: Path after /api/v3/ (e.g. 'klines', 'depth', 'ticker/24hr')
+        params: Request parameters (limit / symbol affect some weights)
+
+    Returns:
+        Weight charged by Binance for the request
+    """
+    params = params or {}
+
+    if endpoint == 'depth':
+        limit = int(params.get('limit', 100))
+        for upper, weight in DEPTH_WEIGHTS:
+            if limit <= upper:
+                return weight
+        return DEPTH_WEIGHTS[-1][1]
+
+    if endpoint in TICKER_WEIGHTS:
+        single, all_symbols = TICKER_WEIGHTS[endpoint]
+        return single if params.get('symbol') else all_symbols
+
+    return ENDPOINT_WEIGHTS.get(endpoint, 1)
+
+
+def weight_for_uri(uri: str, params: Optional[Dict] = None) -> int:
+    """Request weight for a full python-binance request URI"""
+    path = urlparse(uri).path
+    # '/api/v3/ticker/24hr' -> 'ticker/24hr'
+    parts = path.strip('/').split('/')
+    endpoint = '/'.join(parts[2:]) if len(parts) > 2 and parts[0] == 'api' else parts[-1]
+    return endpoint_weight(endpoint, params)
+
+
+class RequestGovernor:
+    """
+    Thread-safe token bucket + server-synchronised weight window
+
+    Usage:
+        governor = get_shared_governor()
+        governor.acquire(5)            # blocks until 5 weight is available
+        governor.observe_response(r)   # feed back X-MBX-USED-WEIGHT-1M / 429s
+        governor.get_budget()          # current budget for schedulers
+    """
+
+    def __init__(self, weight_limit: int = DEFAULT_WEIGHT_LIMIT, headroom: float = 0.9,
+                 burst_seconds: float = 15.0, interactive_reserve: float = 0.2):
+        """
+        Initialize request governor
+
+        Args:
+            weight_limit: Binance weight limit per minute
+            headroom: Fraction of the limit we allow ourselves to use (safety margin)
+            burst_seconds: Bucket capacity expressed in seconds of refill
+            interactive_reserve: Fraction of the bucket and minute budget only
+                INTERACTIVE requests may spend
+        """
+        self.weight_limit = weight_limit
+        self.budget = int(weight_limit * headroom)
+        self.refill_rate = self.budget / 60.0  # weight per second
+        self.capacity = max(1.0, self.refill_rate * burst_seconds)
+        self.interactive_reserve = interactive_reserve
+
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+
+        # Fixed 1-minute window mirrored from the server
+        self._window_minute = self._current_minute()
+        self._window_used = 0
+        self._server_used = 0
+
+        self._blocked_until = 0.0  # wall clock, set by 429/418 Retry-After
+        self._throttled_count = 0
+        self._rejected_count = 0
+
+        # Lanes: interactive requests currently waiting, and per-lane counters
+        self._interactive_waiting = 0
+        self._lane_stats = {lane: {'requests': 0, 'weight': 0, 'waited': 0.0} for lane in LANES}
+
+        logger.info(f"Request governor initialized (budget {self.budget}/{weight_limit} weight/min)")
+
+    @staticmethod
+    def _current_minute() -> int:
+        return int(time.time() // 60)
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_rate)
+            self._last_refill = now
+
+    def _roll_window(self):
+        minute = self._current_minute()
+        if minute != self._window_minute:
+            self._window_minute = minute
+            self._window_used = 0
+            self._server_used = 0
+
+    def _wait_time(self, weight: int, lane: str = INTERACTIVE) -> float:
+        """Seconds to wait before `weight` may be spent (0 = go). Caller holds the lock."""
+        now_wall = time.time()
+        if now_wall < self._blocked_until:
+            return self._blocked_until - now_wall
+
+        # Background requests leave the interactive reserve untouched
+        reserve = self.interactive_reserve if lane == BACKGROUND else 0.0
+
+        self._roll_window()
+        used = max(self._window_used, self._server_used)
+        if used + weight > self.budget * (1 - reserve):
+            # Wait for Binance's window to roll over (small margin for clock skew)
+            return (self._window_minute + 1) * 60 - now_wall + 0.25
+
+        # A single request heavier than the bucket only needs a full bucket
+        floor = self.capacity * reserve
+        needed = min(weight, self.capacity - floor)
+        if self._tokens - floor < needed:
+            return (needed + floor - self._tokens) / self.refill_rate
+
+        return 0.0
+
+    def try_acquire(self, weight: int = 1, first_attempt: bool = True,
+                    lane: Optional[str] = None) -> float:
+        """
+        Charge `weight` if it can be spent now
+
+        Args:
+            lane: INTERACTIVE or BACKGROUND (default: the current request_priority)
+
+        Returns:
+            0 if charged, otherwise seconds to wait before trying again
+        """
+        lane = lane or current_priority()
+        with self._lock:
+            self._refill(time.monotonic())
+            if lane == BACKGROUND and self._interactive_waiting:
+                wait = 0.05  # Yield to the waiting user request
+            else:
+                wait = self._wait_time(weight, lane)
+            if wait <= 0:
+                self._tokens -= weight
+                self._window_used += weight
+                stats = self._lane_stats[lane]
+                stats['requests'] += 1
+                stats['weight'] += weight
+                return 0.0
+            if first_attempt:
+                self._throttled_count += 1
+
+        if wait > 1:
+            logger.info(f"⏳ Request governor: waiting {wait:.1f}s for {weight} weight ({lane})")
+        return wait
+
+    def _poll_interval(self, lane: str, wait: float) -> float:
+        # Interactive requests re-check often so they go first once tokens refill
+        return min(wait, 0.05 if lane == INTERACTIVE else 1.0)
+
+    def _begin_wait(self, lane: str):
+        if lane == INTERACTIVE:
+            with self._lock:
+                self._interactive_waiting += 1
+
+    def _end_wait(self, lane: str, started: float):
+        with self._lock:
+            if lane == INTERACTIVE:
+                self._interactive_waiting -= 1
+            self._lane_stats[lane]['waited'] += time.monotonic() - started
+
+    def acquire(self, weight: int = 1):
+        """Block until `weight` can be spent in the current lane, then charge it"""
+        lane = current_priority()
+        wait = self.try_acquire(weight, lane=lane)
+        if wait <= 0:
+            return
+
+        started = time.monotonic()
+        self._begin_wait(lane)
+        try:
+            while wait > 0:
+                time.sleep(self._poll_interval(lane, wait))
+                wait = self.try_acquire(weight, first_attempt=False, lane=lane)
+        finally:
+            self._end_wait(lane, started)
+
+    async def acquire_async(self, weight: int = 1):
+        """acquire() for asyncio callers - waits without blocking the event loop"""
+        lane = current_priority()
+        wait = self.try_acquire(weight, lane=lane)
+        if wait <= 0:
+            return
+
+        started = time.monotonic()
+        self._begin_wait(lane)
+        try:
+            while wait > 0:
+                await asyncio.sleep(self._poll_interval(lane, wait))
+                wait = self.try_acquire(weight, first_attempt=False, lane=lane)
+        finally:
+            self._end_wait(lane, started)
+
+    def observe_response(self, response):
+        """
+        Update the budget from a Binance HTTP response
+
+        Reads X-MBX-USED-WEIGHT-1M and blocks all requests on 429/418.
+        Accepts requests (status_code) and aiohttp (status) responses.
+        """
+        try:
+            headers = response.headers
+            used = headers.get('X-MBX-USED-WEIGHT-1M') or headers.get('x-mbx-used-weight-1m')
+            status = getattr(response, 'status_code', None) or getattr(response, 'status', None)
+
+            with self._lock:
+                self._roll_window()
+                if used is not None:
+                    self._server_used = max(self._server_used, int(used))
+
+                if status in (429, 418):
+                    self._rejected_count += 1
+                    retry_after = float(headers.get('Retry-After', 60))
+                    self._blocked_until = max(self._blocked_until, time.time() + retry_after)
+                    logger.warning(f"🚫 Binance returned {status} - pausing requests for {retry_after:.0f}s")
+        except Exception as e:
+            logger.debug(f"Request governor could not read response: {e}")
+
+    def get_budget(self) -> Dict:
+        """
+        Current request budget (for schedulers deciding how hard to scan)
+
+        Returns:
+            Dict with limit, used and available weight for this minute, bucket
+            tokens, seconds until unblocked, and throttle/reject counters
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._roll_window()
+            used = max(self._window_used, self._server_used)
+            return {
+                'weight_limit': self.weight_limit,
+                'budget': self.budget,
+                'used_1m': used,
+                'server_used_1m': self._server_used,
+                'available_1m': max(0, self.budget - used),
+                'tokens': round(self._tokens, 1),
+                'blocked_for': max(0.0, self._blocked_until - time.time()),
+                'throttled': self._throttled_count,
+                'rejected': self._rejected_count,
+                'interactive_waiting': self._interactive_waiting,
+                'lanes': {lane: dict(stats, waited=round(stats['waited'], 2))
+                          for lane, stats in self._lane_stats.items()},
+            }
+
+    def available(self) -> int:
+        """Weight that can be spent right now without waiting"""
+        budget = self.get_budget()
+        if budget['blocked_for'] > 0:
+            return 0
+        return int(min(budget['available_1m'], budget['tokens']))
+
+    def install(self, client):
+        """
+        Govern every request a python-binance Client makes
+
+        Wraps Client._request to charge endpoint weight before sending, and
+        registers a session response hook to read weight headers back.
+        Objects without these internals (test doubles) are left untouched.
+        """
+        request = getattr(client, '_request', None)
+        session = getattr(client, 'session', None)
+        if request is None or getattr(request, '_governed', False):
+            return False
+
+        governor = self
+
+        def governed_request(method, uri, signed, force_params=False, **kwargs):
+            params = kwargs.get('data') or kwargs.get('params') or {}
+            governor.acquire(weight_for_uri(uri, params))
+            return request(method, uri, signed, force_params, **kwargs)
+
+        governed_request._governed = True
+        client._request = governed_request
+
+        if session is not None and hasattr(session, 'hooks'):
+            session.hooks.setdefault('response', []).append(
+                lambda response, *args, **kwargs: governor.observe_response(response)
+            )
+        return True
+
+
+_shared_governor = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_governor() -> RequestGovernor:
+    """Process-wide governor (Binance weight limits are per IP)"""
+    global _shared_governor
+    with _shared_lock:
+        if _shared_governor is None:
+            _shared_governor = RequestGovernor()
+        return _shared_governor
@@ -99,15 +99,17 @@ def trigger_ai_analysis():
             except Exception as e:
                 logger.warning(f"⚠️ Could not send processing message: {e}")
             
-            # Perform AI analysis
+            # Perform AI analysis (user-triggered - ahead of background scanners)
             try:
-                result = bot.command_handler.gemini_analyzer.analyze(
-                    symbol=symbol,
-                    pump_data=None,
-                    trading_style='swing',
-                    use_cache=True,
-                    user_id=user_id  # Pass user_id for history
-                )
+                from request_governor import request_priority, INTERACTIVE
+                with request_priority(INTERACTIVE):
+                    result = bot.command_handler.gemini_analyzer.analyze(
+                        symbol=symbol,
+                        pump_data=None,
+                        trading_style='swing',
+                        use_cache=True,
+                        user_id=user_id  # Pass user_id for history
+                    )
                 
                 if result:
                     # Format response using gemini_analyzer's format_response method
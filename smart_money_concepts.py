@@ -17,6 +17,9 @@ import numpy as np
 import logging
 from typing import Dict, List, Optional, Tuple
 
+from indicators import find_pivots
+from market_structure import MarketStructureEngine
+
 logger = logging.getLogger(__name__)
 
 
@@ -68,25 +71,7 @@ class SmartMoneyAnalyzer:
             Tuple of (swing_highs, swing_lows)
         """
         try:
-            high = df['high']
-            low = df['low']
-            
-            swing_highs = pd.Series(index=df.index, dtype=float)
-            swing_lows = pd.Series(index=df.index, dtype=float)
-            
-            # Find swing highs
-            for i in range(length, len(df) - length):
-                window = high[i-length:i+length+1]
-                if high.iloc[i] == window.max():
-                    swing_highs.iloc[i] = high.iloc[i]
-            
-            # Find swing lows
-            for i in range(length, len(df) - length):
-                window = low[i-length:i+length+1]
-                if low.iloc[i] == window.min():
-                    swing_lows.iloc[i] = low.iloc[i]
-            
-            return swing_highs, swing_lows
+            return find_pivots(df, length)
             
         except Exception as e:
             logger.error(f"Error finding swing points: {e}")
@@ -153,107 +138,26 @@ class SmartMoneyAnalyzer:
         Returns:
             Dict with structure analysis
         """
-        try:
-            swing_highs, swing_lows = self._find_swing_points(df, length)
-            
-            bos_levels = []
-            choch_levels = []
-            current_trend = None  # 'BULLISH' or 'BEARISH'
-            
-            last_swing_high = None
-            last_swing_low = None
-            prev_swing_high = None
-            prev_swing_low = None
-            
-            for i in range(len(df)):
-                high_i = float(df['high'].iloc[i])
-                low_i = float(df['low'].iloc[i])
-                close_i = float(df['close'].iloc[i])
-                
-                # Update swing points
-                if not pd.isna(swing_highs.iloc[i]):
-                    prev_swing_high = last_swing_high
-                    last_swing_high = float(swing_highs.iloc[i])
-                
-                if not pd.isna(swing_lows.iloc[i]):
-                    prev_swing_low = last_swing_low
-                    last_swing_low = float(swing_lows.iloc[i])
-                
-                # Need at least one previous swing point
-                if last_swing_high is None or last_swing_low is None:
-                    continue
-                
-                # Detect structure breaks
-                
-                # Bullish BOS: Price breaks previous swing high in uptrend
-                if current_trend == 'BULLISH' and prev_swing_high is not None:
-                    if close_i > prev_swing_high:
-                        bos_levels.append({
-                            'type': 'BOS',
-                            'bias': 'BULLISH',
-                            'price': prev_swing_high,
-                            'bar_index': i,
-                            'structure_type': structure_type
-                        })
-                
-                # Bearish BOS: Price breaks previous swing low in downtrend
-                if current_trend == 'BEARISH' and prev_swing_low is not None:
-                    if close_i < prev_swing_low:
-                        bos_levels.append({
-                            'type': 'BOS',
-                            'bias': 'BEARISH',
-                            'price': prev_swing_low,
-                            'bar_index': i,
-                            'structure_type': structure_type
-                        })
-                
-                # CHoCH: Change of Character (counter-trend break)
-                
-                # Bullish CHoCH: Price breaks swing high while in downtrend
-                if current_trend == 'BEARISH' or current_trend is None:
-                    if last_swing_high is not None and close_i > last_swing_high:
-                        choch_levels.append({
-                            'type': 'CHoCH',
-                            'bias': 'BULLISH',
-                            'price': last_swing_high,
-                            'bar_index': i,
-                            'structure_type': structure_type
-                        })
-                        current_trend = 'BULLISH'
-                
-                # Bearish CHoCH: Price breaks swing low while in uptrend
-                if current_trend == 'BULLISH' or current_trend is None:
-                    if last_swing_low is not None and close_i < last_swing_low:
-                        choch_levels.append({
-                            'type': 'CHoCH',
-                            'bias': 'BEARISH',
-                            'price': last_swing_low,
-                            'bar_index': i,
-                            'structure_type': structure_type
-                        })
-                        current_trend = 'BEARISH'
-            
-            # Detect Equal Highs (EQH)
-            all_swing_highs = [float(h) for h in swing_highs.dropna()]
-            eqh_groups = self._detect_equal_levels(all_swing_highs, self.eqh_eql_threshold)
-            
-            # Detect Equal Lows (EQL)
-            all_swing_lows = [float(l) for l in swing_lows.dropna()]
-            eql_groups = self._detect_equal_levels(all_swing_lows, self.eqh_eql_threshold)
+        return self._analyze_market_structures(df, {structure_type: length})[structure_type]
+    
+    def _analyze_market_structures(self, df: pd.DataFrame, lengths: Dict[str, int]) -> Dict[str, Dict]:
+        """
+        Analyze several structures (e.g. SWING and INTERNAL) in one pass
+        
+        Args:
+            df: DataFrame with OHLCV data
+            lengths: {structure_type: swing detection period}
             
-            return {
-                'trend': current_trend,
-                'bos_levels': bos_levels,
-                'choch_levels': choch_levels,
-                'eqh_groups': eqh_groups,
-                'eql_groups': eql_groups,
-                'last_swing_high': last_swing_high,
-                'last_swing_low': last_swing_low
-            }
+        Returns:
+            {structure_type: structure analysis dict}
+        """
+        try:
+            structures = MarketStructureEngine(lengths).run(df)
+            return {name: self._structure_result(structure) for name, structure in structures.items()}
             
         except Exception as e:
             logger.error(f"Error analyzing market structure: {e}")
-            return {
+            return {name: {
                 'trend': None,
                 'bos_levels': [],
                 'choch_levels': [],
@@ -261,7 +165,27 @@ class SmartMoneyAnalyzer:
                 'eql_groups': [],
                 'last_swing_high': None,
                 'last_swing_low': None
-            }
+            } for name in lengths}
+    
+    def _structure_result(self, structure: Dict) -> Dict:
+        """
+        Structure analysis dict from a MarketStructureEngine structure
+        
+        Args:
+            structure: MarketStructureEngine.run() / update() entry
+            
+        Returns:
+            Dict with trend, BOS/CHoCH levels, EQH/EQL groups and last swing levels
+        """
+        return {
+            'trend': structure['trend'],
+            'bos_levels': structure['bos_levels'],
+            'choch_levels': structure['choch_levels'],
+            'eqh_groups': self._detect_equal_levels(structure['pivot_highs'], self.eqh_eql_threshold),
+            'eql_groups': self._detect_equal_levels(structure['pivot_lows'], self.eqh_eql_threshold),
+            'last_swing_high': structure['last_swing_high'],
+            'last_swing_low': structure['last_swing_low']
+        }
     
     def analyze_smart_money_concepts(self, df: pd.DataFrame, max_levels: int = 5) -> Optional[Dict]:
         """
@@ -287,11 +211,13 @@ class SmartMoneyAnalyzer:
             
             current_price = float(df['close'].iloc[-1])
             
-            # Analyze Swing structure (higher timeframe perspective)
-            swing_structure = self._analyze_market_structure(df, self.swing_length, 'SWING')
-            
-            # Analyze Internal structure (lower timeframe perspective)
-            internal_structure = self._analyze_market_structure(df, self.internal_length, 'INTERNAL')
+            # Swing structure (higher timeframe perspective) and Internal
+            # structure (lower timeframe perspective) in one pass
+            structures = self._analyze_market_structures(
+                df, {'SWING': self.swing_length, 'INTERNAL': self.internal_length}
+            )
+            swing_structure = structures['SWING']
+            internal_structure = structures['INTERNAL']
             
             # Get recent BOS/CHoCH levels
             recent_bos_swing = swing_structure['bos_levels'][-max_levels:] if swing_structure['bos_levels'] else []
@@ -17,6 +17,9 @@ import logging
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+import indicators
+from indicator_cache import get_indicator_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -55,6 +58,7 @@ class StochRSIAnalyzer:
         
         # Default timeframes
         self.timeframes = ['1m', '5m', '4h', '1d']
+        self.kline_limit = 100  # Candles read per timeframe
         
         logger.info("Stoch+RSI Multi-timeframe analyzer initialized")
     
@@ -68,7 +72,7 @@ class StochRSIAnalyzer:
         Returns:
             Series with OHLC/4 values
         """
-        return (df['open'] + df['high'] + df['low'] + df['close']) / 4
+        return indicators.calculate_ohlc4(df)
     
     def calculate_custom_rsi(self, src: pd.Series, length: int = 6) -> pd.Series:
         """
@@ -81,26 +85,7 @@ class StochRSIAnalyzer:
         Returns:
             RSI values
         """
-        # Calculate price changes
-        delta = src.diff()
-        
-        # Separate gains and losses
-        gain = delta.where(delta > 0, 0.0)
-        loss = -delta.where(delta < 0, 0.0)
-        
-        # Calculate RMA (exponential moving average with alpha=1/length)
-        alpha = 1.0 / length
-        avg_gain = gain.ewm(alpha=alpha, adjust=False).mean()
-        avg_loss = loss.ewm(alpha=alpha, adjust=False).mean()
-        
-        # Calculate RS and RSI
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        # Handle division by zero
-        rsi = rsi.fillna(100)
-        
-        return rsi
+        return indicators.calculate_rsi_rma(src, length)
     
     def calculate_stochastic(self, src: pd.Series, k_period: int = 6, smooth: int = 6) -> pd.Series:
         """
@@ -114,17 +99,7 @@ class StochRSIAnalyzer:
         Returns:
             Smoothed Stochastic %K values
         """
-        # Calculate raw stochastic
-        lowest_low = src.rolling(window=k_period).min()
-        highest_high = src.rolling(window=k_period).max()
-        
-        stoch = 100 * (src - lowest_low) / (highest_high - lowest_low)
-        stoch = stoch.fillna(50)  # Handle division by zero
-        
-        # Smooth the stochastic
-        smooth_stoch = stoch.rolling(window=smooth).mean()
-        
-        return smooth_stoch
+        return indicators.calculate_stochastic(src, k_period, smooth)
     
     def calculate_stochastic_d(self, stoch_k: pd.Series, d_period: int = 6) -> pd.Series:
         """
@@ -137,7 +112,7 @@ class StochRSIAnalyzer:
         Returns:
             Stochastic %D values
         """
-        return stoch_k.rolling(window=d_period).mean()
+        return indicators.calculate_stochastic_d(stoch_k, d_period)
     
     def get_signal(self, rsi_val: float, stoch_val: float) -> int:
         """
@@ -187,41 +162,60 @@ class StochRSIAnalyzer:
         """
         try:
             # Get kline data
-            df = self.binance.get_klines(symbol, interval, limit=100)
+            df = self.binance.get_klines(symbol, interval, limit=self.kline_limit)
             
             if df is None or len(df) < 20:
                 logger.warning(f"Insufficient data for {symbol} on {interval}")
                 return None
             
-            # Calculate OHLC/4
-            ohlc4 = self.calculate_ohlc4(df)
-            
-            # Calculate indicators
-            rsi = self.calculate_custom_rsi(ohlc4, self.rsi_length)
-            stoch_k = self.calculate_stochastic(ohlc4, self.stoch_k_period, self.stoch_smooth)
-            stoch_d = self.calculate_stochastic_d(stoch_k, self.stoch_d_period)
-            
-            # Get latest values
-            current_rsi = float(rsi.iloc[-1])
-            current_stoch_k = float(stoch_k.iloc[-1])
-            current_stoch_d = float(stoch_d.iloc[-1])
-            
-            # Generate signal
-            signal = self.get_signal(current_rsi, current_stoch_k)
-            
-            return {
-                'timeframe': interval,
-                'rsi': current_rsi,
-                'stoch_k': current_stoch_k,
-                'stoch_d': current_stoch_d,
-                'signal': signal,
-                'signal_text': 'BUY' if signal == 1 else 'SELL' if signal == -1 else 'NEUTRAL'
-            }
+            # Same candles and settings as a recent call -> cached result
+            params = (self.rsi_length, self.stoch_k_period, self.stoch_smooth, self.stoch_d_period,
+                      self.rsi_lower, self.rsi_upper, self.stoch_lower, self.stoch_upper)
+            return get_indicator_cache().get_or_compute(
+                symbol, interval, 'stoch_rsi', params, df,
+                lambda: self._analyze_frame(df, interval)
+            )
             
         except Exception as e:
             logger.error(f"Error analyzing {symbol} on {interval}: {e}")
             return None
     
+    def _analyze_frame(self, df: pd.DataFrame, interval: str) -> Dict:
+        """
+        RSI, Stochastic and signal for one timeframe's candles
+        
+        Args:
+            df: Kline DataFrame
+            interval: Timeframe of df
+            
+        Returns:
+            analyze_timeframe() result dict
+        """
+        # Calculate OHLC/4
+        ohlc4 = self.calculate_ohlc4(df)
+        
+        # Calculate indicators
+        rsi = self.calculate_custom_rsi(ohlc4, self.rsi_length)
+        stoch_k = self.calculate_stochastic(ohlc4, self.stoch_k_period, self.stoch_smooth)
+        stoch_d = self.calculate_stochastic_d(stoch_k, self.stoch_d_period)
+        
+        # Get latest values
+        current_rsi = float(rsi.iloc[-1])
+        current_stoch_k = float(stoch_k.iloc[-1])
+        current_stoch_d = float(stoch_d.iloc[-1])
+        
+        # Generate signal
+        signal = self.get_signal(current_rsi, current_stoch_k)
+        
+        return {
+            'timeframe': interval,
+            'rsi': current_rsi,
+            'stoch_k': current_stoch_k,
+            'stoch_d': current_stoch_d,
+            'signal': signal,
+            'signal_text': 'BUY' if signal == 1 else 'SELL' if signal == -1 else 'NEUTRAL'
+        }
+    
     def analyze_multi_timeframe(self, symbol: str, timeframes: List[str] = None) -> Dict:
         """
         Analyze multiple timeframes and generate consensus
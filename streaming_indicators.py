@@ -0,0 +1,293 @@
+"""
+Streaming Indicators
+O(1)-per-candle RSI, MFI, Stochastic and ATR state
+
+The batch functions in indicators.py / StochRSIAnalyzer recompute the whole
+series on every call. Real-time detectors call them every minute on the
+same candles plus one new one, so their cost grows with the history they
+need. These classes keep the recurrence state instead:
+
+    rsi = StreamingRSI(period=14, history=3)
+    rsi.seed(Candles.from_frame(df))       # once, from history
+    rsi.update(src)                        # each closed candle
+    rsi.peek(src)                          # forming candle, state unchanged
+    rsi.feed(Candles.from_frame(df_5m))    # overlapping kline windows
+
+Values follow the batch definitions:
+    - StreamingRSI: RMA RSI (indicators.calculate_rsi) on HLCC4
+    - StreamingMFI: windowed MFI (indicators.calculate_mfi)
+    - StreamingStoch: %K / %D on OHLC4 (StochRSIAnalyzer.calculate_stochastic)
+    - StreamingATR: SMA of true range (the detectors' _calculate_atr)
+"""
+
+import math
+import time
+from collections import deque
+from typing import Optional, Tuple
+
+import numpy as np
+
+from candles import Candles
+
+NAN = float('nan')
+
+
+class StreamingIndicator:
+    """
+    Base class: committed state plus a short history of committed values
+
+    Subclasses name their Candles inputs in `inputs` and implement
+    _step(*values, commit) returning the indicator value.
+    """
+
+    inputs: Tuple[str, ...] = ()
+
+    def __init__(self, history: int = 1):
+        """
+        Args:
+            history: Number of committed values kept in self.history
+        """
+        self.history = deque(maxlen=max(1, history))
+        self.last_open_time = None
+
+    def reset(self):
+        self.history.clear()
+        self.last_open_time = None
+
+    @property
+    def value(self):
+        """Last committed value (NaN before any update)"""
+        return self.history[-1] if self.history else self._empty()
+
+    def _empty(self):
+        return NAN
+
+    def _step(self, *values, commit: bool):
+        raise NotImplementedError
+
+    def update(self, *values):
+        """Commit one closed candle and return the new value"""
+        value = self._step(*values, commit=True)
+        self.history.append(value)
+        return value
+
+    def peek(self, *values):
+        """Value if the forming candle closed now - state is not changed"""
+        return self._step(*values, commit=False)
+
+    def seed(self, candles: Candles, now_ms: Optional[int] = None):
+        """Reset and replay the closed candles of a history window"""
+        self.reset()
+        return self.feed(candles, now_ms)
+
+    def feed(self, candles: Candles, now_ms: Optional[int] = None):
+        """
+        Follow an overlapping kline window (e.g. the last 10 candles)
+
+        Closed candles newer than the last committed one are committed; a
+        still-forming last candle is peeked.
+
+        Args:
+            candles: Window of candles, oldest first
+            now_ms: Current time in ms (candles closing later are forming)
+
+        Returns:
+            Value for the window's last candle, or None if the window does
+            not reach back to the last committed candle (reseed needed)
+        """
+        if len(candles) == 0:
+            return self.value
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        columns = [getattr(candles, name) for name in self.inputs]
+        timestamp = candles.timestamp
+        closed = int(np.searchsorted(candles.close_time, now_ms, side='left'))
+
+        start = 0
+        if self.last_open_time is not None:
+            start = int(np.searchsorted(timestamp, self.last_open_time, side='right'))
+            step = timestamp[1] - timestamp[0] if len(timestamp) > 1 else None
+            if start == 0 and timestamp[0] - self.last_open_time != step:
+                return None  # Candles between the state and this window are missing
+
+        for i in range(start, closed):
+            self.update(*(float(column[i]) for column in columns))
+            self.last_open_time = int(timestamp[i])
+
+        if closed < len(candles):
+            return self.peek(*(float(column[-1]) for column in columns))
+        return self.value
+
+
+class StreamingRSI(StreamingIndicator):
+    """
+    RMA RSI updated one candle at a time (indicators.calculate_rsi)
+
+    NaN until period + 1 values have been seen, as calculate_rsi returns
+    NaN for shorter series.
+    """
+
+    def __init__(self, period: int = 14, source: str = 'hlcc4', history: int = 1):
+        super().__init__(history)
+        self.period = period
+        self.alpha = 1.0 / period
+        self.inputs = (source,)
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self._prev = None
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+        self._count = 0
+
+    def _step(self, price: float, commit: bool):
+        gain = loss = 0.0
+        if self._prev is not None:
+            delta = price - self._prev
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+
+        avg_gain = (1 - self.alpha) * self._avg_gain + self.alpha * gain
+        avg_loss = (1 - self.alpha) * self._avg_loss + self.alpha * loss
+        count = self._count + 1
+        if commit:
+            self._prev, self._avg_gain, self._avg_loss, self._count = price, avg_gain, avg_loss, count
+
+        if count < self.period + 1:
+            return NAN
+        if avg_loss == 0:
+            return 100.0
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+class StreamingMFI(StreamingIndicator):
+    """
+    Windowed MFI updated one candle at a time (indicators.calculate_mfi)
+
+    100 until a full window has been seen, like calculate_mfi's fillna.
+    """
+
+    inputs = ('high', 'low', 'close', 'volume')
+
+    def __init__(self, period: int = 14, history: int = 1):
+        super().__init__(history)
+        self.period = period
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self._prev_tp = None
+        self._positive = deque(maxlen=self.period - 1)
+        self._negative = deque(maxlen=self.period - 1)
+        self._count = 0
+
+    def _step(self, high: float, low: float, close: float, volume: float, commit: bool):
+        tp = (high + low + close) / 3
+        flow = tp * volume
+        positive = negative = 0.0
+        if self._prev_tp is not None:
+            positive = flow if tp > self._prev_tp else 0.0
+            negative = flow if tp < self._prev_tp else 0.0
+
+        count = self._count + 1
+        positive_sum = math.fsum(self._positive) + positive
+        negative_sum = math.fsum(self._negative) + negative
+        if commit:
+            self._prev_tp = tp
+            self._count = count
+            self._positive.append(positive)
+            self._negative.append(negative)
+
+        if count < self.period or negative_sum == 0:
+            return 100.0
+        return 100 - 100 / (1 + positive_sum / negative_sum)
+
+
+class StreamingStoch(StreamingIndicator):
+    """
+    Smoothed Stochastic %K and %D updated one candle at a time
+
+    Same definition as StochRSIAnalyzer.calculate_stochastic /
+    calculate_stochastic_d: raw stoch is 50 until k_period values (or on a
+    flat window), %K its `smooth` mean, %D the `d_period` mean of %K.
+    Values are (k, d) tuples with NaN while a window is incomplete.
+    """
+
+    def __init__(self, k_period: int = 6, smooth: int = 6, d_period: int = 6,
+                 source: str = 'hlcc4', history: int = 1):
+        super().__init__(history)
+        self.k_period = k_period
+        self.smooth = smooth
+        self.d_period = d_period
+        self.inputs = (source,)
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self._prices = deque(maxlen=self.k_period - 1)
+        self._raw = deque(maxlen=self.smooth - 1)
+        self._k = deque(maxlen=self.d_period - 1)
+        self._count = 0
+
+    def _empty(self):
+        return (NAN, NAN)
+
+    def _step(self, price: float, commit: bool):
+        count = self._count + 1
+        raw = 50.0
+        if count >= self.k_period:
+            lowest = min(min(self._prices, default=price), price)
+            highest = max(max(self._prices, default=price), price)
+            if highest != lowest:
+                raw = 100 * (price - lowest) / (highest - lowest)
+
+        k = NAN
+        if count >= self.smooth:
+            k = (math.fsum(self._raw) + raw) / self.smooth
+
+        d = NAN
+        if count >= self.smooth + self.d_period - 1:
+            d = (math.fsum(self._k) + k) / self.d_period
+
+        if commit:
+            self._count = count
+            self._prices.append(price)
+            self._raw.append(raw)
+            self._k.append(k)
+        return (k, d)
+
+
+class StreamingATR(StreamingIndicator):
+    """
+    ATR (simple mean of true range) updated one candle at a time
+
+    NaN until `period` candles have been seen, like rolling(period).mean().
+    """
+
+    inputs = ('high', 'low', 'close')
+
+    def __init__(self, period: int = 14, history: int = 1):
+        super().__init__(history)
+        self.period = period
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self._prev_close = None
+        self._ranges = deque(maxlen=self.period - 1)
+        self._count = 0
+
+    def _step(self, high: float, low: float, close: float, commit: bool):
+        true_range = high - low
+        if self._prev_close is not None:
+            true_range = max(true_range, abs(high - self._prev_close), abs(low - self._prev_close))
+
+        count = self._count + 1
+        atr = NAN
+        if count >= self.period:
+            atr = (math.fsum(self._ranges) + true_range) / self.period
+        if commit:
+            self._prev_close = close
+            self._count = count
+            self._ranges.append(true_range)
+        return atr
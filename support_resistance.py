@@ -14,6 +14,8 @@ import numpy as np
 import logging
 from typing import Dict, List, Optional, Tuple
 
+from indicators import calculate_atr, find_first_in_band, find_first_touch, find_pivots
+
 logger = logging.getLogger(__name__)
 
 
@@ -60,18 +62,7 @@ class SupportResistanceDetector:
     def _calculate_atr(self, df: pd.DataFrame) -> pd.Series:
         """Calculate Average True Range"""
         try:
-            high = df['high']
-            low = df['low']
-            close = df['close']
-            
-            tr1 = high - low
-            tr2 = abs(high - close.shift(1))
-            tr3 = abs(low - close.shift(1))
-            
-            tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-            atr = tr.rolling(window=self.atr_period).mean()
-            
-            return atr
+            return calculate_atr(df, self.atr_period)
         except Exception as e:
             logger.error(f"Error calculating ATR: {e}")
             return pd.Series(dtype=float)
@@ -118,30 +109,64 @@ class SupportResistanceDetector:
             Tuple of (pivot_highs, pivot_lows)
         """
         try:
-            high = df['high']
-            low = df['low']
-            
-            pivot_highs = pd.Series(index=df.index, dtype=float)
-            pivot_lows = pd.Series(index=df.index, dtype=float)
-            
-            # Find pivot highs
-            for i in range(self.pivot_length, len(df) - self.pivot_length):
-                window = high[i-self.pivot_length:i+self.pivot_length+1]
-                if high.iloc[i] == window.max():
-                    pivot_highs.iloc[i] = high.iloc[i]
-            
-            # Find pivot lows
-            for i in range(self.pivot_length, len(df) - self.pivot_length):
-                window = low[i-self.pivot_length:i+self.pivot_length+1]
-                if low.iloc[i] == window.min():
-                    pivot_lows.iloc[i] = low.iloc[i]
-            
-            return pivot_highs, pivot_lows
+            return find_pivots(df, self.pivot_length)
             
         except Exception as e:
             logger.error(f"Error finding pivots: {e}")
             return pd.Series(dtype=float), pd.Series(dtype=float)
     
+    def _zone_boxes(self, pivots: np.ndarray, atr: np.ndarray,
+                    idx: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Box around each zone's pivot: ATR * box width multiplier wide (1% of price without ATR)
+        
+        Returns:
+            Tuple of (price, top, bottom, width) arrays, one entry per zone
+        """
+        price = pivots[idx]
+        width = np.where(np.isnan(atr[idx]), price * 0.01, atr[idx] * self.atr_box_width)
+        return price, price + width / 2.0, price - width / 2.0, width
+    
+    def _find_retests(self, values: np.ndarray, breaks: np.ndarray,
+                      bottom: np.ndarray, top: np.ndarray) -> np.ndarray:
+        """
+        First bar after each zone's break whose value is back inside the box
+        
+        Returns:
+            Retest indexes, -1 for unbroken or never retested zones
+        """
+        retests = np.full(len(breaks), -1, dtype=np.int64)
+        broken = breaks >= 0
+        retests[broken] = find_first_in_band(values, breaks[broken] + 1, bottom[broken], top[broken])
+        return retests
+    
+    def _make_zone(self, zone_type: str, pivot_price: float, box_top: float, box_bottom: float,
+                   box_width: float, bar_volume: float, avg_volume: float, bar_delta: float,
+                   bar_index: int, broken: bool, retest_occurred: bool, distance: float) -> Dict:
+        """Build the zone dict for one support / resistance zone"""
+        # Determine status
+        if broken:
+            status = 'BROKEN_RETESTED' if retest_occurred else 'BROKEN'
+        else:
+            status = 'ACTIVE'
+        
+        return {
+            'type': zone_type,
+            'price': pivot_price,
+            'top': box_top,
+            'bottom': box_bottom,
+            'width': box_width,
+            'width_percentage': (box_width / pivot_price * 100) if pivot_price > 0 else 0,
+            'volume': bar_volume,
+            'volume_ratio': bar_volume / avg_volume if avg_volume > 0 else 0,
+            'delta_volume': bar_delta,
+            'bar_index': bar_index,
+            'broken': bool(broken),
+            'retest_occurred': bool(retest_occurred),
+            'status': status,
+            'distance_percent': distance
+        }
+    
     def detect_support_resistance_zones(self, df: pd.DataFrame) -> Optional[Dict]:
         """
         Detect support and resistance zones based on volume
@@ -174,137 +199,47 @@ class SupportResistanceDetector:
             avg_volume = df['volume'].mean()
             high_volume_threshold = avg_volume * self.volume_threshold
             
-            support_zones = []
-            resistance_zones = []
             current_price = float(df['close'].iloc[-1])
             
-            # Detect resistance zones at pivot highs with high volume
-            for i in range(len(df)):
-                if pd.isna(pivot_highs.iloc[i]):
-                    continue
-                
-                pivot_price = float(pivot_highs.iloc[i])
-                bar_volume = float(df['volume'].iloc[i])
-                bar_delta = float(delta_volume.iloc[i])
-                
-                # Check if volume is high
-                if bar_volume < high_volume_threshold:
-                    continue
-                
-                # Calculate box dimensions
-                box_width = float(atr.iloc[i]) * self.atr_box_width if not pd.isna(atr.iloc[i]) else pivot_price * 0.01
-                box_top = pivot_price + box_width / 2.0
-                box_bottom = pivot_price - box_width / 2.0
-                
-                # Check if zone was broken (price went above it)
-                broken = False
-                retest_occurred = False
-                
-                for j in range(i+1, len(df)):
-                    future_close = float(df['close'].iloc[j])
-                    future_high = float(df['high'].iloc[j])
-                    
-                    # Check for break
-                    if future_close > box_top:
-                        broken = True
-                        
-                        # After break, check for retest (price came back to zone)
-                        for k in range(j+1, len(df)):
-                            retest_low = float(df['low'].iloc[k])
-                            if retest_low <= box_top and retest_low >= box_bottom:
-                                retest_occurred = True
-                                break
-                        break
-                
-                # Calculate distance from current price
-                distance = ((box_bottom - current_price) / current_price * 100)
-                
-                # Determine status
-                if broken:
-                    status = 'BROKEN_RETESTED' if retest_occurred else 'BROKEN'
-                else:
-                    status = 'ACTIVE'
-                
-                resistance_zones.append({
-                    'type': 'RESISTANCE',
-                    'price': pivot_price,
-                    'top': box_top,
-                    'bottom': box_bottom,
-                    'width': box_width,
-                    'width_percentage': (box_width / pivot_price * 100) if pivot_price > 0 else 0,
-                    'volume': bar_volume,
-                    'volume_ratio': bar_volume / avg_volume if avg_volume > 0 else 0,
-                    'delta_volume': bar_delta,
-                    'bar_index': i,
-                    'broken': broken,
-                    'retest_occurred': retest_occurred,
-                    'status': status,
-                    'distance_percent': distance
-                })
-            
-            # Detect support zones at pivot lows with high volume
-            for i in range(len(df)):
-                if pd.isna(pivot_lows.iloc[i]):
-                    continue
-                
-                pivot_price = float(pivot_lows.iloc[i])
-                bar_volume = float(df['volume'].iloc[i])
-                bar_delta = float(delta_volume.iloc[i])
-                
-                # Check if volume is high
-                if bar_volume < high_volume_threshold:
-                    continue
-                
-                # Calculate box dimensions
-                box_width = float(atr.iloc[i]) * self.atr_box_width if not pd.isna(atr.iloc[i]) else pivot_price * 0.01
-                box_top = pivot_price + box_width / 2.0
-                box_bottom = pivot_price - box_width / 2.0
-                
-                # Check if zone was broken (price went below it)
-                broken = False
-                retest_occurred = False
-                
-                for j in range(i+1, len(df)):
-                    future_close = float(df['close'].iloc[j])
-                    future_low = float(df['low'].iloc[j])
-                    
-                    # Check for break
-                    if future_close < box_bottom:
-                        broken = True
-                        
-                        # After break, check for retest (price came back to zone)
-                        for k in range(j+1, len(df)):
-                            retest_high = float(df['high'].iloc[k])
-                            if retest_high >= box_bottom and retest_high <= box_top:
-                                retest_occurred = True
-                                break
-                        break
-                
-                # Calculate distance from current price
-                distance = ((box_top - current_price) / current_price * 100)
-                
-                # Determine status
-                if broken:
-                    status = 'BROKEN_RETESTED' if retest_occurred else 'BROKEN'
-                else:
-                    status = 'ACTIVE'
-                
-                support_zones.append({
-                    'type': 'SUPPORT',
-                    'price': pivot_price,
-                    'top': box_top,
-                    'bottom': box_bottom,
-                    'width': box_width,
-                    'width_percentage': (box_width / pivot_price * 100) if pivot_price > 0 else 0,
-                    'volume': bar_volume,
-                    'volume_ratio': bar_volume / avg_volume if avg_volume > 0 else 0,
-                    'delta_volume': bar_delta,
-                    'bar_index': i,
-                    'broken': broken,
-                    'retest_occurred': retest_occurred,
-                    'status': status,
-                    'distance_percent': distance
-                })
+            high = df['high'].to_numpy(dtype=np.float64)
+            low = df['low'].to_numpy(dtype=np.float64)
+            close = df['close'].to_numpy(dtype=np.float64)
+            volume = df['volume'].to_numpy(dtype=np.float64)
+            atr = atr.to_numpy(dtype=np.float64)
+            delta_volume = delta_volume.to_numpy(dtype=np.float64)
+            
+            # Pivots with high volume become zones (NaN volume is not "low")
+            pivot_highs = pivot_highs.to_numpy(dtype=np.float64)
+            pivot_lows = pivot_lows.to_numpy(dtype=np.float64)
+            resistance_idx = np.flatnonzero(~np.isnan(pivot_highs) & ~(volume < high_volume_threshold))
+            support_idx = np.flatnonzero(~np.isnan(pivot_lows) & ~(volume < high_volume_threshold))
+            
+            # Resistance: broken by the first close above the box, retested
+            # when a later low comes back into it
+            res_price, res_top, res_bottom, res_width = self._zone_boxes(pivot_highs, atr, resistance_idx)
+            res_break = find_first_touch(close, resistance_idx + 1, res_top, 'above', inclusive=False)
+            res_retest = self._find_retests(low, res_break, res_bottom, res_top)
+            
+            # Support: broken by the first close below the box, retested
+            # when a later high comes back into it
+            sup_price, sup_top, sup_bottom, sup_width = self._zone_boxes(pivot_lows, atr, support_idx)
+            sup_break = find_first_touch(close, support_idx + 1, sup_bottom, 'below', inclusive=False)
+            sup_retest = self._find_retests(high, sup_break, sup_bottom, sup_top)
+            
+            resistance_zones = [
+                self._make_zone('RESISTANCE', float(res_price[z]), float(res_top[z]), float(res_bottom[z]),
+                                float(res_width[z]), float(volume[i]), avg_volume, float(delta_volume[i]), int(i),
+                                res_break[z] >= 0, res_retest[z] >= 0,
+                                ((float(res_bottom[z]) - current_price) / current_price * 100))
+                for z, i in enumerate(resistance_idx)
+            ]
+            support_zones = [
+                self._make_zone('SUPPORT', float(sup_price[z]), float(sup_top[z]), float(sup_bottom[z]),
+                                float(sup_width[z]), float(volume[i]), avg_volume, float(delta_volume[i]), int(i),
+                                sup_break[z] >= 0, sup_retest[z] >= 0,
+                                ((float(sup_top[z]) - current_price) / current_price * 100))
+                for z, i in enumerate(support_idx)
+            ]
             
             # Filter only active zones
             active_support = [z for z in support_zones if z['status'] == 'ACTIVE']
@@ -12,7 +12,7 @@ from telebot import types
 from watchlist import WatchlistManager
 from watchlist_monitor import WatchlistMonitor
 from volume_detector import VolumeDetector
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from request_governor import interactive
 
 logger = logging.getLogger(__name__)
 
@@ -86,6 +86,7 @@ class TelegramCommandHandler:
         # Initialize Stoch+RSI multi-timeframe analyzer
         from stoch_rsi_analyzer import StochRSIAnalyzer
         self.stoch_rsi_analyzer = StochRSIAnalyzer(binance_client)
+        self.full_analysis_stoch_timeframes = ['1m', '5m', '1h', '4h', '1d']  # _analyze_symbol_full
         
         # Initialize Gemini AI Analyzer
         from gemini_analyzer import GeminiAnalyzer
@@ -133,7 +134,8 @@ class TelegramCommandHandler:
                 self._config.RSI_LOWER,
                 self._config.RSI_UPPER,
                 self._config.MFI_LOWER,
-                self._config.MFI_UPPER
+                self._config.MFI_UPPER,
+                symbol=symbol
             )
             
             # Check if signal meets minimum consensus strength
@@ -194,7 +196,8 @@ class TelegramCommandHandler:
                 self._config.RSI_LOWER,
                 self._config.RSI_UPPER,
                 self._config.MFI_LOWER,
-                self._config.MFI_UPPER
+                self._config.MFI_UPPER,
+                symbol=symbol
             )
             
             # Get current price and 24h data
@@ -225,7 +228,7 @@ class TelegramCommandHandler:
                 try:
                     stoch_rsi_result = self.stoch_rsi_analyzer.analyze_multi_timeframe(
                         symbol,
-                        timeframes=['1m', '5m', '1h', '4h', '1d']
+                        timeframes=self.full_analysis_stoch_timeframes
                     )
                     if stoch_rsi_result:
                         stoch_rsi_data = stoch_rsi_result
@@ -666,23 +669,20 @@ class TelegramCommandHandler:
                         
                         logger.info(f"Pump scan all: scanning {len(symbols)} coins...")
                         
-                        # Scan Layer 1 for all coins (parallel)
-                        from concurrent.futures import ThreadPoolExecutor, as_completed
+                        # Scan Layer 1 for all coins (klines batched, analyzed as they arrive)
                         detections = []
+                        batch = self.binance.get_klines_batch(
+                            symbols[:200], '5m', limit=self.pump_detector.layer1_candles,
+                            stream=True  # Limit to top 200 by volume
+                        )
                         
-                        with ThreadPoolExecutor(max_workers=10) as executor:
-                            futures = {
-                                executor.submit(self.pump_detector._analyze_layer1, symbol): symbol 
-                                for symbol in symbols[:200]  # Limit to top 200 by volume
-                            }
-                            
-                            for future in as_completed(futures):
-                                try:
-                                    result = future.result()
-                                    if result and result.get('pump_score', 0) >= 60:
-                                        detections.append(result)
-                                except Exception as e:
-                                    logger.debug(f"Error in Layer 1 scan: {e}")
+                        for symbol, df_5m in batch:
+                            try:
+                                result = self.pump_detector._analyze_layer1(symbol, df_5m)
+                                if result and result.get('pump_score', 0) >= 60:
+                                    detections.append(result)
+                            except Exception as e:
+                                logger.debug(f"Error in Layer 1 scan: {e}")
                         
                         # Sort by score
                         detections.sort(key=lambda x: x.get('pump_score', 0), reverse=True)
@@ -1655,18 +1655,8 @@ class TelegramCommandHandler:
                                         "Use /watch SYMBOL to add coins.")
                     return
                 
-                # AUTO-SCALE workers based on watchlist size
-                if len(symbols) <= 5:
-                    max_workers = 3
-                elif len(symbols) <= 10:
-                    max_workers = 5
-                elif len(symbols) <= 20:
-                    max_workers = 10
-                else:
-                    max_workers = 15  # Max for watchlist
-                
                 self.bot.send_message(f"🔍 <b>Scanning ALL {len(symbols)} watchlist symbols...</b>\n\n"
-                                    f"⚡ Using {max_workers} parallel threads (auto-scaled)\n"
+                                    f"⚡ Fetching {len(self._config.TIMEFRAMES)} timeframes in concurrent batches\n"
                                     "� Will analyze and send ALL coins (not just signals).")
                 
                 analysis_results = []  # Store ALL analysis results
@@ -1678,40 +1668,44 @@ class TelegramCommandHandler:
                 
                 start_time = time.time()
                 
-                with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                    # Submit all analysis tasks
-                    future_to_symbol = {
-                        executor.submit(self._analyze_symbol_full, symbol): symbol 
-                        for symbol in symbols
-                    }
+                # One batch per fetched timeframe for the whole watchlist, plus
+                # the Stoch+RSI timeframes the main set doesn't cover (1m).
+                # The main timeframes' windows (4h is resampled and cached by
+                # get_multi_timeframe_data) are deep enough for the Stoch+RSI
+                # reads, so the analysis below makes no kline requests; price
+                # and 24h data come from the bulk ticker snapshot
+                self.binance.prefetch_multi_timeframe_data(symbols, self._config.TIMEFRAMES, limit=200)
+                stoch_only = [tf for tf in self.full_analysis_stoch_timeframes
+                              if tf not in self._config.TIMEFRAMES]
+                if stoch_only and self.stoch_rsi_analyzer:
+                    self.binance.prefetch_klines(symbols, stoch_only, limit=self.stoch_rsi_analyzer.kline_limit)
+                fetch_time = time.time() - start_time
+                
+                for symbol in symbols:
+                    completed_count += 1
                     
-                    # Process results as they complete
-                    for future in as_completed(future_to_symbol):
-                        symbol = future_to_symbol[future]
-                        completed_count += 1
-                        
-                        try:
-                            result = future.result()
-                            
-                            if result:
-                                analysis_results.append(result)
-                            else:
-                                errors_count += 1
-                            
-                            # Send progress update
-                            if completed_count % progress_interval == 0 and completed_count < len(symbols):
-                                elapsed = time.time() - start_time
-                                avg_time = elapsed / completed_count
-                                remaining = (len(symbols) - completed_count) * avg_time
-                                
-                                self.bot.send_message(
-                                    f"⏳ Progress: {completed_count}/{len(symbols)} analyzed\n"
-                                    f"⏱️ Est. time remaining: {remaining:.1f}s"
-                                )
+                    try:
+                        result = self._analyze_symbol_full(symbol)
                         
-                        except Exception as e:
-                            logger.error(f"Error processing result for {symbol}: {e}")
+                        if result:
+                            analysis_results.append(result)
+                        else:
                             errors_count += 1
+                        
+                        # Send progress update
+                        if completed_count % progress_interval == 0 and completed_count < len(symbols):
+                            elapsed = time.time() - start_time
+                            avg_time = elapsed / completed_count
+                            remaining = (len(symbols) - completed_count) * avg_time
+                            
+                            self.bot.send_message(
+                                f"⏳ Progress: {completed_count}/{len(symbols)} analyzed\n"
+                                f"⏱️ Est. time remaining: {remaining:.1f}s"
+                            )
+                    
+                    except Exception as e:
+                        logger.error(f"Error processing result for {symbol}: {e}")
+                        errors_count += 1
                 
                 # Calculate total time
                 total_time = time.time() - start_time
@@ -1730,7 +1724,7 @@ class TelegramCommandHandler:
                         f"⏱️ Time: {total_time:.1f}s ({avg_per_symbol:.2f}s per symbol)\n"
                         f"📊 Analyzed: {len(analysis_results)}/{len(symbols)} symbols\n"
                         f"🎯 Signals found: {signals_count}\n"
-                        f"⚡ {max_workers} parallel threads used (auto-scaled)\n\n"
+                        f"⚡ Klines fetched in {fetch_time:.1f}s (concurrent batches)\n\n"
                         f"📤 Sending analysis for ALL {len(analysis_results)} coins..."
                     )
                     
@@ -2736,6 +2730,7 @@ class TelegramCommandHandler:
                 self.bot.send_message(ERROR_OCCURRED.format(error=str(e)))
         
         @self.telegram_bot.message_handler(commands=['analyzer'])
+        @interactive
         def handle_comprehensive_analyzer(message):
             """Comprehensive analysis: PUMP/DUMP + RSI/MFI + Stoch+RSI + AI Button"""
             if not check_authorized(message):
@@ -2795,7 +2790,8 @@ class TelegramCommandHandler:
                     self._config.RSI_LOWER,
                     self._config.RSI_UPPER,
                     self._config.MFI_LOWER,
-                    self._config.MFI_UPPER
+                    self._config.MFI_UPPER,
+                    symbol=symbol
                 )
                 
                 # === 3. STOCH+RSI ANALYSIS ===
@@ -3011,6 +3007,7 @@ class TelegramCommandHandler:
                                           len(m.text) > 1 and m.text[1:].split()[0].upper() not in 
                                           [cmd.upper() for cmd in self.registered_commands] and
                                           m.text[1:].replace('USDT', '').replace('usdt', '').isalnum())
+        @interactive
         def handle_symbol_analysis(message):
             """Comprehensive analysis for symbol commands like /BTC, /ETH - includes PUMP + RSI/MFI + Stoch+RSI + AI Button"""
             if not check_authorized(message):
@@ -3092,7 +3089,8 @@ class TelegramCommandHandler:
                     self._config.RSI_LOWER,
                     self._config.RSI_UPPER,
                     self._config.MFI_LOWER,
-                    self._config.MFI_UPPER
+                    self._config.MFI_UPPER,
+                    symbol=symbol
                 )
                 
                 # === 3. STOCH+RSI ANALYSIS ===
@@ -0,0 +1,244 @@
+"""
+Test script for AsyncBinanceClient
+Runs offline - klines are served by a local aiohttp server
+"""
+
+import asyncio
+import threading
+import time
+
+from aiohttp import web
+
+import binance_client
+from binance_client import BinanceClient
+from request_governor import RequestGovernor
+from test_binance_client_cache import FakeMarketClient, expire_cache, HOUR
+
+
+class FakeKlineServer:
+    """Local /api/v3/klines endpoint backed by FakeMarketClient's series"""
+
+    def __init__(self, delay=0.05):
+        self.market = FakeMarketClient()
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._loop = None
+        self._runner = None
+        self.url = None
+
+    async def _klines(self, request):
+        params = request.query
+        self.requests.append(dict(params))
+        if params['symbol'] == 'BADUSDT':
+            return web.json_response({'code': -1121, 'msg': 'Invalid symbol.'}, status=400)
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+
+        rows = self.market.get_klines(
+            params['symbol'], params['interval'], limit=int(params.get('limit', 500)),
+            startTime=int(params['startTime']) if 'startTime' in params else None,
+            endTime=int(params['endTime']) if 'endTime' in params else None,
+        )
+        return web.json_response(rows, headers={'X-MBX-USED-WEIGHT-1M': '2'})
+
+    def start(self):
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            app = web.Application()
+            app.router.add_get('/api/v3/klines', self._klines)
+            self._runner = web.AppRunner(app)
+            self._loop.run_until_complete(self._runner.setup())
+            site = web.TCPSite(self._runner, '127.0.0.1', 0)
+            self._loop.run_until_complete(site.start())
+            port = site._server.sockets[0].getsockname()[1]
+            self.url = f'http://127.0.0.1:{port}/api'
+            started.set()
+            self._loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        started.wait(timeout=5)
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+def make_client(server):
+    """BinanceClient whose async client talks to the local server"""
+    original = binance_client.Client
+    binance_client.Client = FakeMarketClient
+    try:
+        client = BinanceClient('key', 'secret', use_kline_streams=False, governor=RequestGovernor())
+    finally:
+        binance_client.Client = original
+    client.client.API_URL = server.url
+    return client
+
+
+def test_batch_runs_concurrently_and_fills_cache():
+    """200 symbols are fetched concurrently and later sync reads are cache hits"""
+    print("\n🧪 Testing concurrent batch fetch...")
+    server = FakeKlineServer(delay=0.05)
+    server.start()
+    try:
+        client = make_client(server)
+        symbols = [f'C{i}USDT' for i in range(200)]
+
+        start = time.time()
+        loaded = client.prefetch_klines(symbols, ['1h', '4h'], limit=100)
+        elapsed = time.time() - start
+
+        assert loaded == 400
+        assert len(server.requests) == 400
+        assert server.max_in_flight > 10
+        assert elapsed < 400 * 0.05 / 5, elapsed  # Far faster than sequential
+        assert client.get_request_budget()['used_1m'] == 800
+
+        df = client.get_klines('C7USDT', '1h', limit=50)
+        assert len(df) == 50
+        assert len(server.requests) == 400
+        assert len(client.client.calls) == 0  # Sync client never touched
+        client.close_async_client()
+        print(f"✅ Concurrent batch fetch passed! ({elapsed:.2f}s, "
+              f"max {server.max_in_flight} in flight)")
+    finally:
+        server.stop()
+
+
+def test_async_delta_refresh_and_error_isolation():
+    """Expired entries use startTime deltas; one bad symbol doesn't fail the batch"""
+    print("\n🧪 Testing async delta refresh...")
+    server = FakeKlineServer(delay=0)
+    server.start()
+    try:
+        client = make_client(server)
+        async_client, runner = client.get_async_client()
+        server.market.n_candles = 500
+
+        frames = runner.run(async_client.get_klines_many(['BTCUSDT', 'BADUSDT'], '1h', limit=100))
+        assert frames['BADUSDT'] is None
+        assert len(frames['BTCUSDT']) == 100
+
+        server.market.n_candles = 503
+        expire_cache(client, 'BTCUSDT', '1h')
+        df = runner.run(async_client.get_klines('BTCUSDT', '1h', limit=100))
+        assert server.requests[-1]['startTime'] == str(499 * HOUR)
+        assert len(df) == 100
+        assert df.index[-1].value // 1_000_000 == 502 * HOUR
+
+        data = runner.run(async_client.get_multi_timeframe_data('ETHUSDT', ['1h', '4h'], limit=20))
+        assert set(data) == {'1h', '4h'}
+
+        # Many symbols follow the same plan - 4h is resampled, not fetched
+        before = len(server.requests)
+        many = runner.run(async_client.get_multi_timeframe_many(['ADAUSDT', 'XRPUSDT'], ['1h', '4h'], limit=20))
+        assert all(set(data) == {'1h', '4h'} for data in many.values())
+        assert [r['interval'] for r in server.requests[before:]] == ['1h', '1h']
+
+        # Concurrent tasks for the same window share one request
+        before = len(server.requests)
+
+        async def same_window():
+            return await asyncio.gather(*(async_client.get_klines('SOLUSDT', '1d', 50) for _ in range(5)))
+
+        frames = runner.run(same_window())
+        assert all(len(df) == 50 for df in frames)
+        assert len(server.requests) == before + 1
+        client.close_async_client()
+        print("✅ Async delta refresh passed!")
+    finally:
+        server.stop()
+
+
+def test_sync_and_async_share_fetches():
+    """A sync get_klines during an async fetch of the same window (and the reverse) shares one request"""
+    print("\n🧪 Testing sync / async single flight...")
+    server = FakeKlineServer(delay=0.3)
+    server.start()
+    try:
+        client = make_client(server)
+        async_client, runner = client.get_async_client()
+
+        # Async prefetch in flight, then a /BTC-style sync read
+        pending = runner.submit(async_client.get_klines('BTCUSDT', '1h', 100))
+        deadline = time.time() + 5
+        while server.in_flight == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        df = client.get_klines('BTCUSDT', '1h', limit=50)
+        assert len(df) == 50 and len(pending.result(timeout=5)) == 100
+        assert len(server.requests) == 1
+        assert len(client.client.calls) == 0
+
+        # Sync fetch in flight, then an async read
+        client.client.delay = 0.3
+        thread = threading.Thread(target=client.get_klines, args=('ETHUSDT', '4h', 100))
+        thread.start()
+        deadline = time.time() + 5
+        while not client.client.calls and time.time() < deadline:
+            time.sleep(0.01)
+        df = runner.run(async_client.get_klines('ETHUSDT', '4h', 100))
+        thread.join()
+        assert len(df) == 100
+        assert len(client.client.calls) == 1
+        assert len(server.requests) == 1
+        assert client._coalesced_count == 2
+        client.close_async_client()
+        print("✅ Sync / async single flight passed!")
+    finally:
+        server.stop()
+
+
+def test_klines_batch_api():
+    """get_klines_batch keeps input order, isolates errors, bounds concurrency and streams"""
+    print("\n🧪 Testing get_klines_batch...")
+    server = FakeKlineServer(delay=0.02)
+    server.start()
+    try:
+        client = make_client(server)
+        symbols = [f'C{i}USDT' for i in range(40)] + ['BADUSDT', 'C0USDT']
+
+        frames = client.get_klines_batch(symbols, '1h', limit=50, max_concurrency=4)
+        assert list(frames) == symbols[:-1]  # Deduplicated, input order
+        assert frames['BADUSDT'] is None
+        assert all(len(frames[s]) == 50 for s in symbols[:40])
+        assert server.max_in_flight <= 4
+        assert len(server.requests) == 41
+
+        # Second pass is served from the cache (only the failed symbol is retried)
+        streamed = dict(client.get_klines_batch(symbols, '1h', limit=50, stream=True))
+        assert set(streamed) == set(frames)
+        assert len(server.requests) == 42
+
+        # Leaving a streamed batch early is fine
+        batch = client.get_klines_batch([f'D{i}USDT' for i in range(20)], '4h', limit=20, stream=True)
+        symbol, df = next(batch)
+        assert len(df) == 20
+        batch.close()
+        assert client.get_klines_batch([], '1h') == {}
+        client.close_async_client()
+        print("✅ get_klines_batch passed!")
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("🚀 Async Binance Client Test Suite")
+    print("=" * 50)
+
+    test_batch_runs_concurrently_and_fills_cache()
+    test_async_delta_refresh_and_error_isolation()
+    test_sync_and_async_share_fetches()
+    test_klines_batch_api()
+
+    print("=" * 50)
+    print("✅ Tests completed!")
+    print("=" * 50)
@@ -0,0 +1,108 @@
+"""
+Test script for the batch RSI/MFI engine
+Runs offline - compares against the per-symbol indicators on synthetic frames
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from batch_indicators import analyze_multi_timeframe_batch, mfi_2d, rsi_2d
+from indicators import analyze_multi_timeframe, calculate_mfi, calculate_rsi
+
+PARAMS = (6, 6, 20, 80, 20, 80)  # rsi/mfi periods, rsi/mfi thresholds
+TIMEFRAMES = ['5m', '1h', '4h', '1d']
+
+
+def make_frame(rng, n):
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = close + rng.normal(0, 0.5, n)
+    high = np.maximum(open_, close) + abs(rng.normal(0, 0.5, n))
+    low = np.minimum(open_, close) - abs(rng.normal(0, 0.5, n))
+    volume = abs(rng.normal(1000, 300, n))
+    volume[rng.random(n) < 0.05] = 0
+    index = pd.date_range('2024-01-01', periods=n, freq='h', name='timestamp')
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume},
+                        index=index)
+
+
+def make_market(n_symbols=50, seed=3):
+    rng = np.random.default_rng(seed)
+    market = {f'C{i}USDT': {tf: make_frame(rng, int(rng.integers(5, 210))) for tf in TIMEFRAMES}
+              for i in range(n_symbols)}
+
+    flat = make_frame(rng, 60)
+    flat[['open', 'high', 'low', 'close']] = 1.0
+    gappy = make_frame(rng, 120)
+    gappy.iloc[[3, 40, 41], gappy.columns.get_loc('close')] = np.nan
+    market['FLATUSDT'] = {'1h': flat}
+    market['GAPUSDT'] = {'4h': gappy, '1h': make_frame(rng, 200)}
+    return market
+
+
+def test_2d_kernels_match_series():
+    """rsi_2d / mfi_2d rows equal calculate_rsi / calculate_mfi, padding included"""
+    print("\n🧪 Testing 2-D kernels...")
+    rng = np.random.default_rng(1)
+    frames = [make_frame(rng, n) for n in (200, 150, 7, 30)]
+    n_bars = 200
+
+    def stack(col):
+        out = np.full((len(frames), n_bars), np.nan)
+        for row, df in enumerate(frames):
+            out[row, n_bars - len(df):] = df[col].to_numpy()
+        return out
+
+    rsi = rsi_2d(stack('close'), 6)
+    mfi = mfi_2d(stack('high'), stack('low'), stack('close'), stack('volume'), 6)
+    for row, df in enumerate(frames):
+        n = len(df)
+        assert np.isnan(rsi[row, :n_bars - n]).all() and np.isnan(mfi[row, :n_bars - n]).all()
+        assert np.allclose(rsi[row, -n:], calculate_rsi(df['close'], 6).to_numpy(), equal_nan=True)
+        assert np.allclose(mfi[row, -n:], calculate_mfi(df, 6).to_numpy(), equal_nan=True)
+    print("✅ 2-D kernels passed!")
+
+
+def test_batch_matches_per_symbol_analysis():
+    """analyze_multi_timeframe_batch returns what analyze_multi_timeframe returns per symbol"""
+    print("\n🧪 Testing batch analysis...")
+    market = make_market()
+
+    start = time.time()
+    expected = {symbol: analyze_multi_timeframe(klines, *PARAMS) for symbol, klines in market.items()}
+    per_symbol = time.time() - start
+    start = time.time()
+    batch = analyze_multi_timeframe_batch(market, *PARAMS)
+    batched = time.time() - start
+
+    assert set(batch) == set(expected)
+    for symbol, result in expected.items():
+        got = batch[symbol]
+        assert list(got['timeframes']) == list(result['timeframes']), symbol
+        for key in ('consensus', 'consensus_strength', 'total_signal'):
+            assert got[key] == result[key], (symbol, key)
+        for tf, analysis in result['timeframes'].items():
+            for key in ('rsi', 'mfi', 'last_rsi', 'last_mfi', 'rsi_change', 'mfi_change', 'signal'):
+                assert abs(got['timeframes'][tf][key] - analysis[key]) < 1e-9, (symbol, tf, key)
+            for key in ('rsi_series', 'mfi_series'):
+                series = got['timeframes'][tf][key]
+                assert series.index.equals(analysis[key].index)
+                assert np.allclose(series.to_numpy(), analysis[key].to_numpy(), equal_nan=True)
+
+    assert 'GAPUSDT' in batch and len(batch['GAPUSDT']['timeframes']['4h']['rsi_series']) == 117
+    assert analyze_multi_timeframe_batch({}, *PARAMS) == {}
+    print(f"✅ Batch analysis passed! (per-symbol {per_symbol:.2f}s, batched {batched:.2f}s)")
+
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("🚀 Batch Indicator Test Suite")
+    print("=" * 50)
+
+    test_2d_kernels_match_series()
+    test_batch_matches_per_symbol_analysis()
+
+    print("=" * 50)
+    print("✅ Tests completed!")
+    print("=" * 50)
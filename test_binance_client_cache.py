@@ -0,0 +1,290 @@
+"""
+Test script for BinanceClient kline caching
+Runs offline - the python-binance Client is replaced with a synthetic market
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+import binance_client
+from binance_client import BinanceClient
+from kline_stream_hub import KlineStreamHub
+
+HOUR = 3_600_000
+
+
+class FakeMarketClient:
+    """Minimal stand-in for binance.client.Client serving a synthetic 1h series"""
+
+    def __init__(self, *args, **kwargs):
+        self.n_candles = 1000
+        self.calls = []
+        self.delay = 0
+        self.session = None
+
+    def _row(self, i):
+        price = 100 + i
+        return [i * HOUR, str(price), str(price + 2), str(price - 2), str(price + 1), '10',
+                (i + 1) * HOUR - 1, '1000', 7, '6', '600', '0']
+
+    def get_klines(self, symbol, interval, limit=500, startTime=None, endTime=None):
+        self.calls.append({'symbol': symbol, 'interval': interval, 'limit': limit,
+                           'startTime': startTime, 'endTime': endTime})
+        time.sleep(self.delay)
+        if startTime is not None:
+            first = startTime // HOUR
+            last = min(self.n_candles, first + limit)
+            if endTime is not None:
+                last = min(last, endTime // HOUR + 1)
+        else:
+            last = self.n_candles if endTime is None else endTime // HOUR + 1
+            first = max(0, last - limit)
+        return [self._row(i) for i in range(first, last)]
+
+
+def make_client():
+    """BinanceClient wired to FakeMarketClient (no network)"""
+    original = binance_client.Client
+    binance_client.Client = FakeMarketClient
+    try:
+        client = BinanceClient('key', 'secret', use_kline_streams=False)
+    finally:
+        binance_client.Client = original
+    return client
+
+
+def expire_cache(client, symbol, interval):
+    client._klines_cache[(symbol, interval)]['timestamp'] = datetime.now() - timedelta(seconds=120)
+
+
+def test_fresh_cache_hit():
+    """Fresh entries are served without a request"""
+    print("\n🧪 Testing fresh cache hit...")
+    client = make_client()
+    client.get_klines('BTCUSDT', '1h', limit=100)
+    client.get_klines('BTCUSDT', '1h', limit=100)
+    assert len(client.client.calls) == 1
+    print("✅ Fresh cache hit passed!")
+
+
+def test_delta_refresh_fetches_only_new_candles():
+    """Expired entries are refreshed from the last cached open time"""
+    print("\n🧪 Testing delta refresh...")
+    client = make_client()
+    market = client.client
+    market.n_candles = 500
+
+    df = client.get_klines('BTCUSDT', '1h', limit=100)
+    assert len(df) == 100
+
+    # Three candles close, a fourth starts forming
+    market.n_candles = 504
+    expire_cache(client, 'BTCUSDT', '1h')
+    refreshed = client.get_klines('BTCUSDT', '1h', limit=100)
+
+    delta_call = market.calls[-1]
+    assert delta_call['startTime'] == 499 * HOUR
+    assert len(refreshed) == 100
+    assert int(refreshed.index[-1].value // 1_000_000) == 503 * HOUR
+    assert refreshed.index.is_monotonic_increasing
+    assert not refreshed.index.has_duplicates
+
+    # Identical to a full download of the same window
+    full = client._klines_to_dataframe(market.get_klines('BTCUSDT', '1h', limit=100))
+    assert (refreshed[['open', 'high', 'low', 'close', 'volume']].values ==
+            full[['open', 'high', 'low', 'close', 'volume']].values).all()
+    print("✅ Delta refresh passed!")
+
+
+def test_delta_refresh_falls_back_when_too_far_behind():
+    """A cache older than a whole window triggers a full refetch"""
+    print("\n🧪 Testing delta fallback...")
+    client = make_client()
+    market = client.client
+    market.n_candles = 300
+    client.get_klines('BTCUSDT', '1h', limit=50)
+
+    market.n_candles = 600
+    expire_cache(client, 'BTCUSDT', '1h')
+    df = client.get_klines('BTCUSDT', '1h', limit=50)
+
+    assert market.calls[-1]['startTime'] is None
+    assert int(df.index[-1].value // 1_000_000) == 599 * HOUR
+    assert len(df) == 50
+    print("✅ Delta fallback passed!")
+
+
+def test_smaller_limit_served_as_slice():
+    """A shallower request is a tail slice of the cached window"""
+    print("\n🧪 Testing limit-aware slice serving...")
+    client = make_client()
+    deep = client.get_klines('BTCUSDT', '1h', limit=200)
+    shallow = client.get_klines('BTCUSDT', '1h', limit=100)
+
+    assert len(client.client.calls) == 1
+    assert len(shallow) == 100
+    assert shallow.index[0] == deep.index[100]
+    assert shallow.index[-1] == deep.index[-1]
+    print("✅ Slice serving passed!")
+
+
+def test_deeper_limit_extends_entry():
+    """A deeper request fetches only the older candles and keeps one entry"""
+    print("\n🧪 Testing history extension...")
+    client = make_client()
+    market = client.client
+    client.get_klines('BTCUSDT', '1h', limit=100)   # FairValueGapDetector
+    df_150 = client.get_klines('BTCUSDT', '1h', limit=150)   # SupportResistanceDetector
+    df_200 = client.get_klines('BTCUSDT', '1h', limit=200)   # VolumeProfileAnalyzer
+
+    assert len(df_150) == 150
+    assert len(df_200) == 200
+    assert [c['limit'] for c in market.calls] == [100, 50, 50]
+    assert market.calls[1]['endTime'] == 900 * HOUR - 1
+    assert df_200.index.is_monotonic_increasing
+    assert not df_200.index.has_duplicates
+    assert list(client._klines_cache) == [('BTCUSDT', '1h')]
+
+    # Every depth is now a cache hit
+    for limit in (10, 100, 150, 200):
+        assert len(client.get_klines('BTCUSDT', '1h', limit=limit)) == limit
+    assert len(market.calls) == 3
+    print("✅ History extension passed!")
+
+
+def test_new_listing_history_exhausted():
+    """Symbols with less history than requested are not refetched every call"""
+    print("\n🧪 Testing short-history symbols...")
+    client = make_client()
+    market = client.client
+    market.n_candles = 60
+
+    assert len(client.get_klines('NEWUSDT', '1h', limit=100)) == 60
+    assert len(client.get_klines('NEWUSDT', '1h', limit=200)) == 60
+    assert len(market.calls) == 1
+    print("✅ Short-history symbols passed!")
+
+
+def test_concurrent_requests_coalesced():
+    """Threads asking for the same window at once share one request"""
+    print("\n🧪 Testing single-flight coalescing...")
+    client = make_client()
+    market = client.client
+    market.delay = 0.2
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.get_klines('BTCUSDT', '1d', limit=100)))
+               for _ in range(10)]
+    threads.append(threading.Thread(target=lambda: results.append(client.get_klines('ETHUSDT', '1d', limit=100))))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(results) == 11 and all(len(df) == 100 for df in results)
+    assert sorted(c['symbol'] for c in market.calls) == ['BTCUSDT', 'ETHUSDT']
+    assert client._coalesced_count == 9
+
+    # Finding a fresh entry with no fetch in flight is not a coalesced request
+    client._claim_fetch('BTCUSDT', '1d', 100)
+    assert client._coalesced_count == 9
+    print("✅ Single-flight coalescing passed!")
+
+
+def test_delta_refresh_seeds_full_window():
+    """A symbol cached before it was subscribed gets a full stream buffer from a delta refresh"""
+    print("\n🧪 Testing stream seeding after delta refresh...")
+    client = make_client()
+    market = client.client
+    market.n_candles = 500
+    client.get_klines('BTCUSDT', '1h', limit=100)
+
+    client.stream_hub = KlineStreamHub(max_candles=1000)
+    client.stream_hub.subscribe(['BTCUSDT'], '1h')
+    market.n_candles = 502
+    expire_cache(client, 'BTCUSDT', '1h')
+    df = client.get_klines('BTCUSDT', '1h', limit=100)
+
+    assert market.calls[-1]['startTime'] == 499 * HOUR  # Delta of 3 rows
+    rows = client.stream_hub._buffers[('BTCUSDT', '1h')].rows
+    assert len(rows) == 100
+    assert client._klines_to_dataframe(rows)[['open', 'close', 'volume']].equals(df[['open', 'close', 'volume']])
+    print("✅ Stream seeding passed!")
+
+
+def test_multi_timeframe_resampled_locally():
+    """Coarser timeframes are built from one deeper fetch of the finer one"""
+    print("\n🧪 Testing multi-timeframe resampling...")
+    client = make_client()
+    market = client.client
+    market.n_candles = 1000
+
+    assert client.plan_timeframes(['5m', '1h', '4h', '1d'], 200) == {
+        '5m': ('5m', 200), '1h': ('1h', 804), '4h': ('1h', 200), '1d': ('1d', 200)}
+
+    data = client.get_multi_timeframe_data('BTCUSDT', ['1h', '4h', '1d'], limit=30)
+    assert [c['interval'] for c in market.calls] == ['1h']
+    assert market.calls[0]['limit'] == 744
+    assert all(len(data[i]) == 30 for i in ('1h', '4h', '1d'))
+
+    # Candles 996-999 make up the last 4h bucket (996 = 4 * 249)
+    last = data['4h'].iloc[-1]
+    assert data['4h'].index[-1].value // 1_000_000 == 996 * HOUR
+    assert last['open'] == 100 + 996 and last['close'] == 100 + 999 + 1
+    assert last['high'] == 100 + 999 + 2 and last['volume'] == 40
+    assert data['1d'].index[-1].value // 1_000_000 == 984 * HOUR
+
+    # Not enough history in one request for 100 daily candles - 1d is fetched
+    client.get_multi_timeframe_data('ETHUSDT', ['1h', '4h', '1d'], limit=100)
+    assert [c['interval'] for c in market.calls[1:]] == ['1h', '1d']
+
+    client.resample_timeframes = False
+    assert client.plan_timeframes(['1h', '4h'], 30) == {'1h': ('1h', 30), '4h': ('4h', 30)}
+    print("✅ Multi-timeframe resampling passed!")
+
+
+def test_resampled_timeframes_cached():
+    """Derived windows are cached for later get_klines() calls"""
+    print("\n🧪 Testing resampled timeframe caching...")
+    client = make_client()
+    market = client.client
+
+    data = client.get_multi_timeframe_data('BTCUSDT', ['1h', '4h', '1d'], limit=30)
+    assert len(market.calls) == 1
+
+    # 744 hourly candles hold 186 complete 4h buckets
+    df = client.get_klines('BTCUSDT', '4h', limit=100)
+    assert len(market.calls) == 1
+    assert len(df) == 100 and df.index[-1] == data['4h'].index[-1]
+
+    # Expires with the source window it was built from
+    entry = client._klines_cache[('BTCUSDT', '4h')]
+    assert entry['timestamp'] == client._klines_cache[('BTCUSDT', '1h')]['timestamp']
+    assert not entry['exhausted']
+
+    # Deeper than the derived window - fetched
+    client.get_klines('BTCUSDT', '4h', limit=300)
+    assert len(market.calls) == 2
+    print("✅ Resampled timeframe caching passed!")
+
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("🚀 BinanceClient Cache Test Suite")
+    print("=" * 50)
+
+    test_fresh_cache_hit()
+    test_delta_refresh_fetches_only_new_candles()
+    test_delta_refresh_falls_back_when_too_far_behind()
+    test_smaller_limit_served_as_slice()
+    test_deeper_limit_extends_entry()
+    test_new_listing_history_exhausted()
+    test_concurrent_requests_coalesced()
+    test_delta_refresh_seeds_full_window()
+    test_multi_timeframe_resampled_locally()
+    test_resampled_timeframes_cached()
+
+    print("=" * 50)
+    print("✅ Tests completed!")
+    print("=" * 50)
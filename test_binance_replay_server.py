@@ -0,0 +1,155 @@
+"""
+Test script for the Binance record/replay stand-in
+Runs offline - a real BinanceClient talks to a local BinanceReplayServer
+"""
+
+import os
+import tempfile
+import time
+
+import requests
+
+from binance_client import BinanceClient
+from binance_replay_server import BinanceReplayServer, MarketRecording
+from kline_stream_hub import INTERVAL_MS
+from request_governor import RequestGovernor
+
+FIVE_MIN = INTERVAL_MS['5m']
+END_MS = 1_700_000_000_000 - 1_700_000_000_000 % FIVE_MIN
+SYMBOLS = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def make_server(**kwargs):
+    recording = MarketRecording.synthetic(SYMBOLS, intervals=('5m', '1h'), n_candles=300, end_ms=END_MS)
+    server = BinanceReplayServer(recording, **kwargs)
+    server.start()
+    return server
+
+
+def make_client(server, **kwargs):
+    return BinanceClient('key', 'secret', governor=RequestGovernor(),
+                         api_url=server.api_url, stream_url=server.stream_url, **kwargs)
+
+
+def test_client_endpoints():
+    """BinanceClient and its python-binance client are served by the stand-in"""
+    print("\n🧪 Testing replayed endpoints...")
+    server = make_server()
+    try:
+        client = make_client(server, use_kline_streams=False)
+        assert client.test_connection()
+
+        df = client.get_klines('BTCUSDT', '1h', limit=100)
+        assert len(df) == 100
+        assert df.index[-1].value // 1_000_000 == server.recording.klines[('BTCUSDT', '1h')][-1][0]
+
+        assert set(client.get_all_usdt_symbols()) == set(SYMBOLS)
+        assert client.get_price_precision('ETHUSDT') is not None
+        assert client.get_current_price('SOLUSDT') == float(server.recording.tickers[2]['lastPrice'])
+
+        book = client.client.get_order_book(symbol='BTCUSDT', limit=20)
+        assert len(book['bids']) == 20 and len(book['asks']) == 20
+        assert len(client.client.get_recent_trades(symbol='BTCUSDT', limit=50)) == 50  # /api/v1
+        assert len(client.client.get_aggregate_trades(symbol='ETHUSDT', limit=100)) == 100
+
+        # Async client picks the override up from the python-binance client
+        assert client.prefetch_klines(SYMBOLS, ['5m'], limit=50) == 3
+        client.close_async_client()
+
+        stats = server.stats()
+        assert stats['requests']['trades'] == 1 and stats['requests']['klines'] == 4
+        assert stats['rejected'] == 0
+        print(f"✅ Replayed endpoints passed! ({stats['total_requests']} requests)")
+    finally:
+        server.stop()
+
+
+def test_latency_and_rate_limits():
+    """Latency is injected; going over the weight limit gives 429 then 418"""
+    print("\n🧪 Testing latency and rate limits...")
+    server = make_server(latency=0.05, weight_limit=20, ban_after=2)
+    try:
+        url = f"{server.api_url}/v3/klines"
+        params = {'symbol': 'BTCUSDT', 'interval': '5m', 'limit': 10}
+
+        start = time.time()
+        response = requests.get(url, params=params)
+        assert time.time() - start >= 0.05
+        assert response.status_code == 200 and len(response.json()) == 10
+        assert response.headers['X-MBX-USED-WEIGHT-1M'] == '2'
+
+        statuses = [requests.get(url, params=params).status_code for _ in range(13)]
+        assert statuses[:9] == [200] * 9
+        assert statuses[9:11] == [429, 429]
+        assert statuses[11:] == [418, 418]
+        assert server.stats()['rejected'] == 4
+
+        response = requests.get(url, params=params)
+        assert response.status_code == 418 and int(response.headers['Retry-After']) > 0
+        print("✅ Latency and rate limits passed!")
+    finally:
+        server.stop()
+
+
+def test_replay_clock_and_streams():
+    """advance() reveals new candles over REST and pushes them to the kline hub"""
+    print("\n🧪 Testing replay clock + streams...")
+    server = make_server(clock_ms=END_MS - 20 * FIVE_MIN)
+    client = make_client(server)
+    try:
+        assert client.subscribe_klines(['BTCUSDT'], '5m') == 1
+        assert wait_for(lambda: client.stream_hub.get_stats()['connected'] == 1)
+        assert wait_for(lambda: server.ws_client_count == 1)
+
+        df = client.get_klines('BTCUSDT', '5m', limit=50)
+        assert df.index[-1].value // 1_000_000 == END_MS - 20 * FIVE_MIN
+        assert client.stream_hub.is_warm('BTCUSDT', '5m', 50)
+
+        server.advance(FIVE_MIN)
+        assert wait_for(lambda: client.stream_hub.get_klines('BTCUSDT', '5m', 1)[0][0]
+                        == END_MS - 19 * FIVE_MIN)
+        df = client.get_klines('BTCUSDT', '5m', limit=50)
+        assert df.index[-1].value // 1_000_000 == END_MS - 19 * FIVE_MIN
+        print("✅ Replay clock + streams passed!")
+    finally:
+        if client.stream_hub is not None:
+            client.stream_hub.stop()
+        server.stop()
+
+
+def test_recording_round_trip():
+    """Recordings save/load losslessly"""
+    print("\n🧪 Testing recording round trip...")
+    recording = MarketRecording.synthetic(['BTCUSDT'], intervals=('1h',), n_candles=10, end_ms=END_MS)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'market.json')
+        recording.save(path)
+        loaded = MarketRecording.load(path)
+    assert loaded.klines == recording.klines
+    assert loaded.symbols == ['BTCUSDT']
+    assert loaded.agg_trades == recording.agg_trades
+    print("✅ Recording round trip passed!")
+
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("🚀 Binance Replay Server Test Suite")
+    print("=" * 50)
+
+    test_client_endpoints()
+    test_latency_and_rate_limits()
+    test_replay_clock_and_streams()
+    test_recording_round_trip()
+
+    print("=" * 50)
+    print("✅ Tests completed!")
+    print("=" * 50)
@@ -0,0 +1,155 @@
+"""
+Test script for the columnar Candles container
+Runs offline - uses synthetic kline rows
+"""
+
+import numpy as np
+import pandas as pd
+
+from candles import Candles, FLOAT_COLUMNS
+from indicators import validate_dataframe, calculate_hlcc4, calculate_rsi, calculate_mfi
+from volume_profile import VolumeProfileAnalyzer
+
+MINUTE = 60_000
+
+
+def make_klines(n=120):
+    rng = np.random.default_rng(7)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    rows = []
+    for i, c in enumerate(close):
+        o = c + rng.normal(0, 0.5)
+        h = max(o, c) + abs(rng.normal(0, 0.5))
+        l = min(o, c) - abs(rng.normal(0, 0.5))
+        v = abs(rng.normal(1000, 200))
+        rows.append([i * MINUTE, f'{o:.4f}', f'{h:.4f}', f'{l:.4f}', f'{c:.4f}', f'{v:.3f}',
+                     (i + 1) * MINUTE - 1, f'{v * c:.2f}', int(50 + i), f'{v / 2:.3f}',
+                     f'{v * c / 2:.2f}', '0'])
+    return rows
+
+
+def legacy_frame(klines):
+    """The pre-Candles get_klines() conversion"""
+    df = pd.DataFrame(klines, columns=[
+        'timestamp', 'open', 'high', 'low', 'close', 'volume',
+        'close_time', 'quote_volume', 'trades', 'taker_buy_base',
+        'taker_buy_quote', 'ignore'
+    ])
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    for col in FLOAT_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df.set_index('timestamp')
+
+
+def test_from_klines_matches_legacy_frame():
+    """Parsed arrays and to_frame() match the old DataFrame conversion"""
+    print("\n🧪 Testing kline parsing...")
+    klines = make_klines()
+    candles = Candles.from_klines(klines)
+    df = candles.to_frame()
+    legacy = legacy_frame(klines)
+
+    assert len(candles) == 120
+    assert candles.timestamp.dtype == np.int64
+    assert candles.trades[5] == 55
+    assert df.index.equals(legacy.index)
+    assert df.index.name == 'timestamp'
+    for col in FLOAT_COLUMNS + ('close_time', 'trades'):
+        assert df[col].dtype == legacy[col].dtype, col
+        assert np.array_equal(df[col].to_numpy(), legacy[col].to_numpy()), col
+    assert len(Candles.from_klines([])) == 0
+
+    # to_klines() round-trips through the REST layout
+    rows = candles.to_klines()
+    assert rows[5][0] == klines[5][0] and rows[5][8] == 55 and len(rows[5]) == 12
+    assert Candles.from_klines(rows).to_frame().equals(df)
+    print("✅ Kline parsing passed!")
+
+
+def test_zero_copy_views():
+    """Columns are contiguous views of one block, shared with to_frame()"""
+    print("\n🧪 Testing zero-copy views...")
+    candles = Candles.from_klines(make_klines())
+    assert candles.close.flags['C_CONTIGUOUS']
+    assert all(np.shares_memory(getattr(candles, c), candles._block) for c in FLOAT_COLUMNS)
+
+    df = candles.to_frame()
+    assert np.shares_memory(df['close'].to_numpy(), candles.close)
+
+    tail = df.iloc[-50:]
+    again = Candles.from_frame(tail)
+    assert np.shares_memory(again.close, candles.close)
+    assert again.timestamp[0] == candles.timestamp[-50]
+
+    sliced = candles[-10:]
+    assert len(sliced) == 10 and np.shares_memory(sliced.high, candles.high)
+    assert np.allclose(candles.hlcc4, calculate_hlcc4(df).to_numpy())
+    print("✅ Zero-copy views passed!")
+
+
+def test_typed_frames_skip_conversions():
+    """Typed frames pass through validation uncopied with identical indicators"""
+    print("\n🧪 Testing indicator inputs...")
+    klines = make_klines()
+    df = Candles.from_klines(klines).to_frame()
+    assert validate_dataframe(df) is df
+
+    # String-typed frames are still converted
+    raw = legacy_frame(klines).astype({'close': str, 'volume': str})
+    cleaned = validate_dataframe(raw)
+    assert cleaned is not raw and cleaned['close'].dtype == np.float64
+
+    assert np.allclose(calculate_rsi(calculate_hlcc4(df), 14), calculate_rsi(calculate_hlcc4(cleaned), 14))
+    assert np.allclose(calculate_mfi(df, 14), calculate_mfi(cleaned, 14))
+    print("✅ Indicator inputs passed!")
+
+
+def test_volume_profile_unchanged():
+    """Volume profile over Candles arrays equals the old row-by-row result"""
+    print("\n🧪 Testing volume profile...")
+    klines = make_klines()
+    analyzer = VolumeProfileAnalyzer(binance_client=None)
+    typed = analyzer.calculate_volume_profile(Candles.from_klines(klines).to_frame())
+    legacy = analyzer.calculate_volume_profile(legacy_frame(klines).astype({'high': str}))
+
+    assert typed['poc'] == legacy['poc']
+    assert typed['vah'] == legacy['vah'] and typed['val'] == legacy['val']
+    assert typed['volume_stats'] == legacy['volume_stats']
+    print("✅ Volume profile passed!")
+
+
+def test_resample_matches_pandas():
+    """UTC-aligned resampling equals pandas OHLCV aggregation, partial leading bucket dropped"""
+    print("\n🧪 Testing resampling...")
+    klines = make_klines(300)[7:]  # Starts mid-bucket
+    candles = Candles.from_klines(klines)
+    hourly = candles.resample(60 * MINUTE)
+
+    df = legacy_frame(klines).iloc[53:]  # First full hour
+    expected = df.resample('1h').agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last',
+                                      'volume': 'sum', 'quote_volume': 'sum', 'trades': 'sum'})
+    result = hourly.to_frame()
+    assert len(result) == 4 and (result.index == expected.index).all()
+    for col in expected.columns:
+        assert np.allclose(result[col], expected[col]), col
+    assert (result['close_time'] == result.index.asi8 // 1_000_000 + 60 * MINUTE - 1).all()
+
+    assert len(Candles.from_klines(klines[:10]).resample(60 * MINUTE)) == 0
+    assert np.array_equal(Candles.from_frame(df).resample(60 * MINUTE).close, hourly.close)
+    print("✅ Resampling passed!")
+
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("🚀 Candles Test Suite")
+    print("=" * 50)
+
+    test_from_klines_matches_legacy_frame()
+    test_zero_copy_views()
+    test_typed_frames_skip_conversions()
+    test_volume_profile_unchanged()
+    test_resample_matches_pandas()
+
+    print("=" * 50)
+    print("✅ Tests completed!")
+    print("=" * 50)
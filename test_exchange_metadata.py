@@ -0,0 +1,124 @@
+"""
+Test script for ExchangeMetadata
+Runs offline - uses a fake exchangeInfo endpoint
+"""
+
+import time
+
+import binance_client
+from binance_client import BinanceClient
+from exchange_metadata import ExchangeMetadata, tick_size_precision
+
+
+def make_symbol(symbol, base, quote, tick='0.01000000', status='TRADING'):
+    return {
+        'symbol': symbol, 'baseAsset': base, 'quoteAsset': quote, 'status': status,
+        'filters': [{'filterType': 'LOT_SIZE', 'stepSize': '0.00001000'},
+                    {'filterType': 'PRICE_FILTER', 'tickSize': tick}],
+    }
+
+
+class FakeExchangeClient:
+    """Serves a small exchangeInfo / ticker universe and counts requests"""
+
+    def __init__(self, *args, **kwargs):
+        self.exchange_info_calls = 0
+        self.fail = False
+        self.session = None
+
+    def get_exchange_info(self):
+        if self.fail:
+            raise ConnectionError("offline")
+        self.exchange_info_calls += 1
+        return {'symbols': [
+            make_symbol('BTCUSDT', 'BTC', 'USDT', tick='0.01000000'),
+            make_symbol('ETHUSDT', 'ETH', 'USDT', tick='0.01000000'),
+            make_symbol('SHIBUSDT', 'SHIB', 'USDT', tick='0.00000001'),
+            make_symbol('BTCUPUSDT', 'BTCUP', 'USDT', tick='0.00100000'),
+            make_symbol('ETHBTC', 'ETH', 'BTC', tick='0.00001000'),
+            make_symbol('LUNAUSDT', 'LUNA', 'USDT', tick='1.00000000', status='BREAK'),
+        ]}
+
+    def get_ticker(self, **params):
+        return [
+            {'symbol': 'BTCUSDT', 'quoteVolume': '78000000', 'priceChangePercent': '1.5'},
+            {'symbol': 'ETHUSDT', 'quoteVolume': '27900000', 'priceChangePercent': '-0.5'},
+            {'symbol': 'SHIBUSDT', 'quoteVolume': '90000', 'priceChangePercent': '4.0'},
+        ]
+
+
+def test_precision_and_tables():
+    """Precision and symbol tables match the per-call filter logic"""
+    print("\n🧪 Testing precomputed tables...")
+    assert tick_size_precision('0.01000000') == 2
+    assert tick_size_precision('1.00000000') == 0
+    assert tick_size_precision('1') == 0
+
+    meta = ExchangeMetadata(FakeExchangeClient())
+    assert meta.get_price_precision('BTCUSDT') == 2
+    assert meta.get_price_precision('SHIBUSDT') == 8
+    assert meta.get_price_precision('ETHBTC') == 5
+    assert meta.get_price_precision('NOPEUSDT') == 8
+
+    table = meta.get_tradeable_symbols('USDT', ['UP', 'DOWN'])
+    assert [s for s, _, _ in table] == ['BTCUSDT', 'ETHUSDT', 'SHIBUSDT']
+    assert table[0] == ('BTCUSDT', 'BTC', 'USDT')
+    assert [s for s, _, _ in meta.get_tradeable_symbols('BTC')] == ['ETHBTC']
+    assert meta.get_tradeable_symbols('USDT', ['UP', 'DOWN']) is table  # Memoised
+    assert meta.get_symbol_info('ETHBTC')['baseAsset'] == 'ETH'
+    assert meta.client.exchange_info_calls == 1
+    print("✅ Precomputed tables passed!")
+
+
+def test_ttl_refresh_and_failure_fallback():
+    """exchangeInfo is refetched after the TTL; failures keep the old tables"""
+    print("\n🧪 Testing TTL refresh...")
+    client = FakeExchangeClient()
+    meta = ExchangeMetadata(client, ttl=0.1)
+    meta.get_price_precision('BTCUSDT')
+    meta.get_price_precision('ETHUSDT')
+    assert client.exchange_info_calls == 1
+
+    time.sleep(0.15)
+    meta.get_price_precision('BTCUSDT')
+    assert client.exchange_info_calls == 2
+
+    client.fail = True
+    time.sleep(0.15)
+    assert meta.get_price_precision('BTCUSDT') == 2
+    print("✅ TTL refresh passed!")
+
+
+def test_binance_client_uses_metadata():
+    """get_all_symbols and get_price_precision share one exchangeInfo request"""
+    print("\n🧪 Testing BinanceClient integration...")
+    original = binance_client.Client
+    binance_client.Client = FakeExchangeClient
+    try:
+        client = BinanceClient('key', 'secret', use_kline_streams=False)
+    finally:
+        binance_client.Client = original
+
+    symbols = client.get_all_symbols(excluded_keywords=['UP', 'DOWN'], min_volume=1000000)
+    assert [s['symbol'] for s in symbols] == ['BTCUSDT', 'ETHUSDT']
+    assert symbols[0] == {'symbol': 'BTCUSDT', 'base_asset': 'BTC', 'quote_asset': 'USDT',
+                          'volume': 78000000.0, 'price_change_percent': 1.5}
+    assert len(client.get_all_symbols(excluded_keywords=['UP', 'DOWN'])) == 3
+    assert client.get_price_precision('BTCUSDT') == 2
+    assert client.format_price('BTCUSDT', 65000.123) == '65,000.12'
+    assert client.client.exchange_info_calls == 1
+    print("✅ BinanceClient integration passed!")
+
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("🚀 Exchange Metadata Test Suite")
+    print("=" * 50)
+
+    test_precision_and_tables()
+    test_ttl_refresh_and_failure_fallback()
+    test_binance_client_uses_metadata()
+
+    print("=" * 50)
+    print("✅ Tests completed!")
+    print("=" * 50)
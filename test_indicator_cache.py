@@ -0,0 +1,107 @@
+"""
+Test script for the indicator result cache
+Runs offline - synthetic candles and a fake Binance client
+"""
+
+import numpy as np
+
+from candles import Candles
+from indicator_cache import IndicatorCache, get_indicator_cache, window_key
+from indicators import analyze_multi_timeframe
+from stoch_rsi_analyzer import StochRSIAnalyzer
+from test_candles import make_klines
+
+PARAMS = (6, 6, 20, 80, 20, 80)  # rsi/mfi periods, rsi/mfi thresholds
+
+
+def make_frame(n=200):
+    return Candles.from_klines(make_klines(n)).to_frame()
+
+
+def test_cache_keys_and_eviction():
+    """Same window is a hit; a new candle or a ticking last candle is a miss"""
+    print("\n🧪 Testing cache keys / eviction...")
+    df = make_frame()
+    cache = IndicatorCache(max_entries=2)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'value': len(calls)}
+
+    first = cache.get_or_compute('BTCUSDT', '1h', 'rsi', (6,), df, compute)
+    assert cache.get_or_compute('BTCUSDT', '1h', 'rsi', (6,), df.copy(), compute) is first
+    assert len(calls) == 1
+
+    # Still-forming last candle ticked
+    ticked = df.copy()
+    ticked.iloc[-1, ticked.columns.get_loc('close')] += 1
+    assert window_key(ticked) != window_key(df)
+    cache.get_or_compute('BTCUSDT', '1h', 'rsi', (6,), ticked, compute)
+    assert len(calls) == 2
+
+    # New candle (window slides by one) -> miss, and the oldest entry is evicted
+    cache.get_or_compute('BTCUSDT', '1h', 'rsi', (6,), make_frame(201).iloc[1:], compute)
+    assert len(calls) == 3 and cache.get_stats()['entries'] == 2
+    cache.get_or_compute('BTCUSDT', '1h', 'rsi', (6,), df, compute)
+    assert len(calls) == 4
+
+    # Other params / symbols never share an entry; None is not cached
+    cache.get_or_compute('ETHUSDT', '1h', 'rsi', (6,), df, compute)
+    cache.get_or_compute('BTCUSDT', '1h', 'rsi', (14,), df, compute)
+    assert len(calls) == 6
+    cache.get_or_compute('BTCUSDT', '4h', 'rsi', (6,), df, lambda: None)
+    assert cache.get_or_compute('BTCUSDT', '4h', 'rsi', (6,), df, compute) == {'value': 7}
+
+    stats = cache.get_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 8
+    print("✅ Cache keys / eviction passed!")
+
+
+def test_cached_analysis_matches():
+    """analyze_multi_timeframe(symbol=...) and StochRSIAnalyzer reuse results on repeat calls"""
+    print("\n🧪 Testing cached analyses...")
+    get_indicator_cache().clear()
+    klines = {'1h': make_frame(200), '4h': make_frame(120)}
+
+    expected = analyze_multi_timeframe(klines, *PARAMS)
+    first = analyze_multi_timeframe(klines, *PARAMS, symbol='CACHEUSDT')
+    second = analyze_multi_timeframe(klines, *PARAMS, symbol='CACHEUSDT')
+    for tf, analysis in expected['timeframes'].items():
+        assert second['timeframes'][tf] is first['timeframes'][tf]
+        assert first['timeframes'][tf]['rsi'] == analysis['rsi']
+        assert np.allclose(first['timeframes'][tf]['mfi_series'], analysis['mfi_series'])
+    assert second['total_signal'] == expected['total_signal']
+
+    class FakeBinance:
+        def __init__(self):
+            self.frames = {'1h': make_frame(100), '4h': make_frame(100)}
+
+        def get_klines(self, symbol, interval, limit=500):
+            return self.frames[interval]
+
+    binance = FakeBinance()
+    analyzer = StochRSIAnalyzer(binance)
+    hits = get_indicator_cache().get_stats()['hits']
+    result = analyzer.analyze_timeframe('CACHEUSDT', '1h')
+    assert result == analyzer._analyze_frame(binance.frames['1h'], '1h')
+    assert analyzer.analyze_timeframe('CACHEUSDT', '1h') is result
+    assert get_indicator_cache().get_stats()['hits'] == hits + 1
+
+    # Changed settings -> recomputed
+    analyzer.rsi_length = 14
+    assert analyzer.analyze_timeframe('CACHEUSDT', '1h') is not result
+    print("✅ Cached analyses passed!")
+
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("🚀 Indicator Cache Test Suite")
+    print("=" * 50)
+
+    test_cache_keys_and_eviction()
+    test_cached_analysis_matches()
+
+    print("=" * 50)
+    print("✅ Tests completed!")
+    print("=" * 50)
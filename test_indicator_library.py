@@ -0,0 +1,207 @@
+"""
+Test script for the shared indicator library
+Runs offline - compares against the implementations it replaced
+"""
+
+import numpy as np
+import pandas as pd
+
+from candles import Candles
+from fair_value_gaps import FairValueGapDetector
+from indicators import (calculate_atr, calculate_ema, calculate_rsi, calculate_rsi_rma, calculate_true_range,
+                        find_first_in_band, find_first_touch, find_pivots)
+from order_blocks import OrderBlockDetector
+from pattern_recognition import MarketRegimeDetector
+from smart_money_concepts import SmartMoneyAnalyzer
+from stoch_rsi_analyzer import StochRSIAnalyzer
+from support_resistance import SupportResistanceDetector
+from test_candles import make_klines
+
+
+def make_frame(n=300):
+    df = Candles.from_klines(make_klines(n)).to_frame()
+    df.iloc[60:70, df.columns.get_loc('close')] = df['close'].iloc[60]  # Flat stretch
+    df.iloc[60:70, df.columns.get_loc('open')] = df['close'].iloc[60]
+    df.iloc[60:70, df.columns.get_loc('high')] = df['close'].iloc[60]
+    df.iloc[60:70, df.columns.get_loc('low')] = df['close'].iloc[60]
+    return df
+
+
+def reference_atr(df, period):
+    """Former detector _calculate_atr"""
+    tr1 = df['high'] - df['low']
+    tr2 = abs(df['high'] - df['close'].shift(1))
+    tr3 = abs(df['low'] - df['close'].shift(1))
+    return pd.concat([tr1, tr2, tr3], axis=1).max(axis=1).rolling(window=period).mean()
+
+
+def reference_ema(prices, period):
+    """Former MarketRegimeDetector._calculate_ema"""
+    if len(prices) < period:
+        return sum(prices) / len(prices)
+    multiplier = 2 / (period + 1)
+    ema = sum(prices[:period]) / period
+    for price in prices[period:]:
+        ema = (price - ema) * multiplier + ema
+    return ema
+
+
+def reference_pivots(df, length):
+    """Former per-bar pivot loop (OB / S/R / SMC)"""
+    high, low = df['high'], df['low']
+    pivot_highs = pd.Series(index=df.index, dtype=float)
+    pivot_lows = pd.Series(index=df.index, dtype=float)
+    for i in range(length, len(df) - length):
+        if high.iloc[i] == high[i - length:i + length + 1].max():
+            pivot_highs.iloc[i] = high.iloc[i]
+        if low.iloc[i] == low[i - length:i + length + 1].min():
+            pivot_lows.iloc[i] = low.iloc[i]
+    return pivot_highs, pivot_lows
+
+
+def reference_stoch_rsi(src, length, k_period, smooth):
+    """Former StochRSIAnalyzer.calculate_custom_rsi / calculate_stochastic"""
+    delta = src.diff()
+    gain = delta.where(delta > 0, 0.0)
+    loss = -delta.where(delta < 0, 0.0)
+    rs = gain.ewm(alpha=1 / length, adjust=False).mean() / loss.ewm(alpha=1 / length, adjust=False).mean()
+    rsi = (100 - (100 / (1 + rs))).fillna(100)
+
+    lowest, highest = src.rolling(window=k_period).min(), src.rolling(window=k_period).max()
+    stoch = (100 * (src - lowest) / (highest - lowest)).fillna(50)
+    return rsi, stoch.rolling(window=smooth).mean()
+
+
+def test_library_matches_former_implementations():
+    """ATR / EMA / RSI / Stochastic equal the per-module copies they replace"""
+    print("\n🧪 Testing indicator library...")
+    df = make_frame()
+
+    for period in (5, 14):
+        expected = reference_atr(df, period)
+        assert np.allclose(calculate_atr(df, period), expected, equal_nan=True)
+        assert np.allclose(FairValueGapDetector(binance_client=None)._calculate_atr(df, period),
+                           expected, equal_nan=True)
+    expected = reference_atr(df, 14)
+    assert np.allclose(OrderBlockDetector(binance_client=None)._calculate_atr(df), expected, equal_nan=True)
+    assert np.allclose(SupportResistanceDetector(binance_client=None)._calculate_atr(df), expected, equal_nan=True)
+    assert calculate_true_range(df.iloc[:0]).empty
+
+    closes = df['close'].tolist()
+    for period in (20, 50):
+        ema = calculate_ema(df['close'], period)
+        assert ema.iloc[:period - 1].isna().all()
+        assert np.isclose(ema.iloc[-1], reference_ema(closes, period))
+        assert np.isclose(ema.iloc[period + 9], reference_ema(closes[:period + 10], period))
+    assert calculate_ema(df['close'].iloc[:5], 20).isna().all()
+
+    analyzer = StochRSIAnalyzer(binance_client=None)
+    ohlc4 = analyzer.calculate_ohlc4(df)
+    expected_rsi, expected_k = reference_stoch_rsi(ohlc4, 6, 6, 6)
+    assert np.allclose(analyzer.calculate_custom_rsi(ohlc4, 6), expected_rsi)
+    assert np.allclose(analyzer.calculate_stochastic(ohlc4, 6, 6), expected_k, equal_nan=True)
+    assert np.allclose(calculate_rsi(ohlc4, 6), calculate_rsi_rma(ohlc4, 6))
+    print("✅ Indicator library passed!")
+
+
+def test_find_pivots_matches_loop():
+    """find_pivots equals the per-bar loops of all three detectors, ties and gaps included"""
+    print("\n🧪 Testing pivots...")
+    df = make_frame()
+    df.iloc[[5, 120], df.columns.get_loc('high')] = np.nan
+    df.iloc[[7, 121], df.columns.get_loc('low')] = np.nan
+
+    for length in (0, 1, 5, 10, 33, 50, 149, 150):
+        expected_highs, expected_lows = reference_pivots(df, length)
+        highs, lows = find_pivots(df, length)
+        assert highs.index.equals(df.index)
+        assert np.array_equal(highs.to_numpy(), expected_highs.to_numpy(), equal_nan=True), length
+        assert np.array_equal(lows.to_numpy(), expected_lows.to_numpy(), equal_nan=True), length
+    assert highs.isna().all()  # Window longer than the frame
+
+    # The flat stretch makes tied pivots
+    highs, lows = find_pivots(df, 3)
+    assert highs.iloc[60:70].notna().sum() > 1 or lows.iloc[60:70].notna().sum() > 1
+
+    expected = reference_pivots(df, 10)
+    for got in (OrderBlockDetector(binance_client=None)._find_swing_highs_lows(df, 10),
+                SupportResistanceDetector(binance_client=None, pivot_length=10)._find_pivot_highs_lows(df),
+                SmartMoneyAnalyzer(binance_client=None)._find_swing_points(df, 10)):
+        for series, reference in zip(got, expected):
+            assert np.array_equal(series.to_numpy(), reference.to_numpy(), equal_nan=True)
+    print("✅ Pivots passed!")
+
+
+def test_find_first_touch_matches_scan():
+    """find_first_touch / find_first_in_band equal a forward scan from each start"""
+    print("\n🧪 Testing first touch search...")
+    rng = np.random.default_rng(7)
+    for _ in range(200):
+        n = int(rng.integers(0, 80))
+        values = rng.normal(0, 1, n).round(1)
+        values[rng.random(n) < 0.1] = np.nan
+        starts = rng.integers(0, n + 3, 25)
+        levels = rng.normal(0, 1, 25).round(1)
+
+        for direction in ('below', 'above'):
+            got = find_first_touch(values, starts, levels, direction)
+            for start, level, index in zip(starts, levels, got):
+                touches = [j for j in range(start, n)
+                           if (values[j] <= level if direction == 'below' else values[j] >= level)]
+                assert index == (touches[0] if touches else -1)
+            strict = find_first_touch(values, starts, levels, direction, inclusive=False)
+            for start, level, index in zip(starts, levels, strict):
+                touches = [j for j in range(start, n)
+                           if (values[j] < level if direction == 'below' else values[j] > level)]
+                assert index == (touches[0] if touches else -1)
+
+        lower = rng.normal(-0.5, 0.5, 25).round(1)
+        upper = lower + abs(rng.normal(0, 0.5, 25)).round(1)
+        got = find_first_in_band(values, starts, lower, upper)
+        for start, low, high, index in zip(starts, lower, upper, got):
+            inside = [j for j in range(start, n) if low <= values[j] <= high]
+            assert index == (inside[0] if inside else -1)
+    assert len(find_first_touch([], [], [])) == 0 and len(find_first_in_band([1.0], [], [], [])) == 0
+    print("✅ First touch search passed!")
+
+
+def test_market_regime_inputs():
+    """MarketRegimeDetector gives the same regime for DataFrame and raw list klines"""
+    print("\n🧪 Testing market regime detector...")
+
+    class FakeBinance:
+        def __init__(self, klines):
+            self.klines = klines
+
+        def get_klines(self, symbol, interval, limit=500):
+            return self.klines
+
+    raw = [[str(v) for v in k] for k in make_klines(100)]
+    df = Candles.from_klines(make_klines(100)).to_frame()
+    from_frame = MarketRegimeDetector(FakeBinance(df)).detect_regime('BTCUSDT')
+    from_list = MarketRegimeDetector(FakeBinance(raw)).detect_regime('BTCUSDT')
+    assert from_frame == from_list
+    assert from_frame['regime'] in ('BULL', 'BEAR', 'SIDEWAYS')
+
+    detector = MarketRegimeDetector(FakeBinance(df))
+    closes = df['close'].tolist()
+    assert np.isclose(detector._calculate_ema(df['close'], 50), reference_ema(closes, 50))
+    assert np.isclose(detector._calculate_ema(df['close'].iloc[:10], 20), reference_ema(closes[:10], 20))
+    assert np.isclose(detector._calculate_atr(df, 14), reference_atr(df, 14).iloc[-1])
+    assert detector._calculate_atr(df.iloc[:10], 14) == 0
+    print("✅ Market regime detector passed!")
+
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("🚀 Indicator Library Test Suite")
+    print("=" * 50)
+
+    test_library_matches_former_implementations()
+    test_find_pivots_matches_loop()
+    test_find_first_touch_matches_scan()
+    test_market_regime_inputs()
+
+    print("=" * 50)
+    print("✅ Tests completed!")
+    print("=" * 50)
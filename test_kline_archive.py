@@ -0,0 +1,166 @@
+"""
+Test script for KlineArchive
+Runs offline - uses a synthetic market and a temporary directory
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import binance_client
+from binance_client import BinanceClient
+from candles import Candles
+from kline_archive import KlineArchive, RECORD_DTYPE
+from test_binance_client_cache import FakeMarketClient, HOUR
+
+
+def candles_for(market, first, last):
+    """Candles with open times first..last-1 (hours)"""
+    return Candles.from_klines([market._row(i) for i in range(first, last)])
+
+
+def test_append_and_memmap_read():
+    """Only closed, new candles are appended; reads return the tail"""
+    print("\n🧪 Testing append / read...")
+    market = FakeMarketClient()
+    with tempfile.TemporaryDirectory() as root:
+        archive = KlineArchive(root)
+        assert archive.read('BTCUSDT', '1h') is None
+
+        # Candle 99 is still forming at now_ms
+        now_ms = 99 * HOUR + 10
+        assert archive.append('BTCUSDT', '1h', candles_for(market, 0, 100), now_ms=now_ms) == 99
+        assert archive.append('BTCUSDT', '1h', candles_for(market, 50, 100), now_ms=now_ms) == 0
+        assert archive.append('BTCUSDT', '1h', candles_for(market, 90, 101), now_ms=101 * HOUR) == 2
+
+        path = os.path.join(root, '1h', 'BTCUSDT.bin')
+        assert os.path.getsize(path) == 101 * RECORD_DTYPE.itemsize
+        tail = archive.read('BTCUSDT', '1h', limit=10)
+        assert len(tail) == 10
+        assert tail.timestamp[-1] == 100 * HOUR
+        assert np.all(np.diff(tail.timestamp) == HOUR)
+        assert tail.close[-1] == 201.0 and tail.trades[0] == 7
+        assert archive.read_frame('BTCUSDT', '1h', limit=5).index[-1].value // 1_000_000 == 100 * HOUR
+
+        # Calendar intervals are not archived
+        assert archive.append('BTCUSDT', '1M', candles_for(market, 0, 10)) == 0
+    print("✅ Append / read passed!")
+
+
+def test_gap_backfill_and_restart():
+    """Gaps are backfilled over REST; oversized gaps restart the file"""
+    print("\n🧪 Testing gap backfill...")
+    market = FakeMarketClient()
+    with tempfile.TemporaryDirectory() as root:
+        archive = KlineArchive(root, max_backfill_pages=1)
+        archive.append('BTCUSDT', '1h', candles_for(market, 0, 100))
+        archive.append('BTCUSDT', '1h', candles_for(market, 400, 450), fetch=market.get_klines)
+
+        assert market.calls[-1]['startTime'] == 100 * HOUR
+        assert market.calls[-1]['endTime'] == 400 * HOUR - 1
+        full = archive.read('BTCUSDT', '1h')
+        assert len(full) == 450
+        assert np.all(np.diff(full.timestamp) == HOUR)
+
+        # 1500 missing candles > one backfill page -> restart from the new rows
+        archive.append('BTCUSDT', '1h', candles_for(market, 1950, 2000), fetch=market.get_klines)
+        restarted = archive.read('BTCUSDT', '1h')
+        assert len(restarted) == 50 and restarted.timestamp[0] == 1950 * HOUR
+    print("✅ Gap backfill passed!")
+
+
+def test_restart_reads_archive_then_delta():
+    """A new BinanceClient seeds its cold cache from disk plus a delta fetch"""
+    print("\n🧪 Testing cold start from archive...")
+    original = binance_client.Client
+    binance_client.Client = FakeMarketClient
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            first = BinanceClient('key', 'secret', use_kline_streams=False, archive_dir=root)
+            first.get_klines('BTCUSDT', '1h', limit=200)
+
+            second = BinanceClient('key', 'secret', use_kline_streams=False, archive_dir=root)
+            market = second.client
+            market.n_candles = 1003
+            df = second.get_klines('BTCUSDT', '1h', limit=200)
+
+            assert len(market.calls) == 1
+            assert market.calls[0]['startTime'] == 999 * HOUR
+            assert len(df) == 200
+            assert df.index[-1].value // 1_000_000 == 1002 * HOUR
+            expected = second._klines_to_dataframe(market.get_klines('BTCUSDT', '1h', limit=200))
+            assert np.array_equal(df[['open', 'high', 'low', 'close', 'volume']].values,
+                                  expected[['open', 'high', 'low', 'close', 'volume']].values)
+            assert second.archive.count('BTCUSDT', '1h') == 203
+    finally:
+        binance_client.Client = original
+    print("✅ Cold start from archive passed!")
+
+
+def test_downtime_costs_one_request():
+    """After downtime longer than the window, a cold read is one full fetch and the file restarts"""
+    print("\n🧪 Testing cold start after downtime...")
+    original = binance_client.Client
+    binance_client.Client = FakeMarketClient
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            first = BinanceClient('key', 'secret', use_kline_streams=False, archive_dir=root)
+            first.get_klines('BTCUSDT', '1h', limit=100)
+
+            # Five days offline: 120 new 1h candles > the 100-candle window
+            path = os.path.join(root, '1h', 'BTCUSDT.bin')
+            written = time.time() - 5 * 86400
+            os.utime(path, (written, written))
+
+            second = BinanceClient('key', 'secret', use_kline_streams=False, archive_dir=root)
+            market = second.client
+            market.n_candles = 1120
+            df = second.get_klines('BTCUSDT', '1h', limit=100)
+
+            assert [c['startTime'] for c in market.calls] == [None]  # No delta, no backfill
+            assert len(df) == 100 and df.index[-1].value // 1_000_000 == 1119 * HOUR
+            restarted = second.archive.read('BTCUSDT', '1h')
+            assert len(restarted) == 100 and restarted.timestamp[0] == 1020 * HOUR
+    finally:
+        binance_client.Client = original
+    print("✅ Cold start after downtime passed!")
+
+
+def test_trim_and_prune():
+    """Files keep their newest max_candles; idle files are removed"""
+    print("\n🧪 Testing trim / prune...")
+    market = FakeMarketClient()
+    with tempfile.TemporaryDirectory() as root:
+        archive = KlineArchive(root, max_candles=100, max_idle_days=7)
+        archive.append('BTCUSDT', '1h', candles_for(market, 0, 120))
+        assert archive.count('BTCUSDT', '1h') == 120  # Within the trim slack
+        archive.append('BTCUSDT', '1h', candles_for(market, 100, 130))
+        trimmed = archive.read('BTCUSDT', '1h')
+        assert len(trimmed) == 100 and trimmed.timestamp[0] == 30 * HOUR
+        assert np.all(np.diff(trimmed.timestamp) == HOUR)
+
+        archive.append('OLDUSDT', '1h', candles_for(market, 0, 10))
+        idle = time.time() - 8 * 86400
+        os.utime(os.path.join(root, '1h', 'OLDUSDT.bin'), (idle, idle))
+        assert archive.prune() == 1
+        assert archive.read('OLDUSDT', '1h') is None
+        assert archive.count('BTCUSDT', '1h') == 100
+    print("✅ Trim / prune passed!")
+
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("🚀 Kline Archive Test Suite")
+    print("=" * 50)
+
+    test_append_and_memmap_read()
+    test_gap_backfill_and_restart()
+    test_restart_reads_archive_then_delta()
+    test_downtime_costs_one_request()
+    test_trim_and_prune()
+
+    print("=" * 50)
+    print("✅ Tests completed!")
+    print("=" * 50)
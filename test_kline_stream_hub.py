@@ -0,0 +1,132 @@
+"""
+Test script for KlineStreamHub
+Runs fully offline against FakeKlineStreamServer
+"""
+
+import time
+
+from kline_stream_hub import KlineStreamHub, FakeKlineStreamServer
+
+FIVE_MIN = 300_000
+
+
+def make_row(open_time, close):
+    """Build a kline row in REST layout"""
+    return [open_time, str(close), str(close + 1), str(close - 1), str(close), '10',
+            open_time + FIVE_MIN - 1, '100', 5, '4', '40', '0']
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def _start(symbols=('BTCUSDT',)):
+    server = FakeKlineStreamServer()
+    server.start()
+    hub = KlineStreamHub(stream_url=server.url, max_candles=50, reconnect_delay=0.1)
+    hub.subscribe(list(symbols), '5m')
+    hub.start()
+    assert wait_for(lambda: hub.get_stats()['connected'] == 1), "hub did not connect"
+    return server, hub
+
+
+def test_seed_and_stream_updates():
+    """Seeded buffer is warm and follows streamed candles"""
+    print("\n🧪 Testing seed + stream updates...")
+    server, hub = _start()
+    try:
+        history = [make_row(i * FIVE_MIN, 100 + i) for i in range(10)]
+        assert hub.get_klines('BTCUSDT', '5m', 5) is None  # Cold before seeding
+
+        hub.seed('BTCUSDT', '5m', history)
+        assert hub.is_warm('BTCUSDT', '5m', 10)
+        assert not hub.is_warm('BTCUSDT', '5m', 11)
+
+        # Update the forming candle in place
+        server.push_kline('BTCUSDT', '5m', make_row(9 * FIVE_MIN, 500))
+        assert wait_for(lambda: hub.get_klines('BTCUSDT', '5m', 1)[0][4] == '500')
+        assert len(hub.get_klines('BTCUSDT', '5m', 10)) == 10
+
+        # Next candle opens
+        server.push_kline('BTCUSDT', '5m', make_row(10 * FIVE_MIN, 600))
+        assert wait_for(lambda: hub.get_klines('BTCUSDT', '5m', 11) is not None)
+        rows = hub.get_klines('BTCUSDT', '5m', 11)
+        assert rows[-1][0] == 10 * FIVE_MIN
+        assert rows[-2][4] == '500'
+        print("✅ Seed + stream updates passed!")
+    finally:
+        hub.stop()
+        server.stop()
+
+
+def test_gap_marks_buffer_cold():
+    """A skipped candle makes the buffer cold until re-seeded"""
+    print("\n🧪 Testing gap detection...")
+    server, hub = _start()
+    try:
+        hub.seed('BTCUSDT', '5m', [make_row(i * FIVE_MIN, 100) for i in range(5)])
+        server.push_kline('BTCUSDT', '5m', make_row(7 * FIVE_MIN, 100))
+        assert wait_for(lambda: not hub.is_warm('BTCUSDT', '5m'))
+
+        hub.seed('BTCUSDT', '5m', [make_row(i * FIVE_MIN, 100) for i in range(8)])
+        assert hub.is_warm('BTCUSDT', '5m', 8)
+        print("✅ Gap detection passed!")
+    finally:
+        hub.stop()
+        server.stop()
+
+
+def test_disconnect_marks_buffer_cold():
+    """Dropped connections cool buffers and the hub reconnects"""
+    print("\n🧪 Testing disconnect handling...")
+    server, hub = _start(symbols=('BTCUSDT', 'ETHUSDT'))
+    try:
+        hub.seed('ETHUSDT', '5m', [make_row(i * FIVE_MIN, 100) for i in range(5)])
+        assert hub.is_warm('ETHUSDT', '5m')
+
+        server.drop_connections()
+        assert wait_for(lambda: not hub.is_warm('ETHUSDT', '5m'))
+        assert wait_for(lambda: hub.get_stats()['connected'] == 1), "hub did not reconnect"
+
+        hub.seed('ETHUSDT', '5m', [make_row(i * FIVE_MIN, 100) for i in range(5)])
+        assert hub.is_warm('ETHUSDT', '5m')
+        print("✅ Disconnect handling passed!")
+    finally:
+        hub.stop()
+        server.stop()
+
+
+def test_seed_keeps_streamed_candles():
+    """Candles streamed after the REST snapshot survive seeding"""
+    print("\n🧪 Testing seed/stream race...")
+    hub = KlineStreamHub(max_candles=50)
+    hub.subscribe(['BTCUSDT'], '5m')
+    hub.seed('BTCUSDT', '5m', [make_row(i * FIVE_MIN, 100) for i in range(5)])
+    hub.apply_kline('BTCUSDT', '5m', make_row(5 * FIVE_MIN, 200))
+
+    # Older REST snapshot arrives late
+    hub.seed('BTCUSDT', '5m', [make_row(i * FIVE_MIN, 100) for i in range(5)])
+    rows = hub._buffers[('BTCUSDT', '5m')].rows
+    assert len(rows) == 6
+    assert rows[-1][4] == '200'
+    print("✅ Seed/stream race passed!")
+
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("🚀 Kline Stream Hub Test Suite")
+    print("=" * 50)
+
+    test_seed_and_stream_updates()
+    test_gap_marks_buffer_cold()
+    test_disconnect_marks_buffer_cold()
+    test_seed_keeps_streamed_candles()
+
+    print("=" * 50)
+    print("✅ Tests completed!")
+    print("=" * 50)
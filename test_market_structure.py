@@ -0,0 +1,118 @@
+"""
+Test script for the market structure engine
+Runs offline - compares against the former bar-by-bar BOS / CHoCH scan on synthetic candles
+"""
+
+import time
+
+import numpy as np
+
+from market_structure import MarketStructureEngine
+from smart_money_concepts import SmartMoneyAnalyzer
+from test_fair_value_gaps import make_frame
+
+
+def reference_structure(analyzer, df, length, structure_type):
+    """Former _analyze_market_structure loop: (trend, bos, choch, last high, last low)"""
+    swing_highs, swing_lows = analyzer._find_swing_points(df, length)
+    close = df['close'].to_numpy()
+    bos, choch = [], []
+    trend = last_high = last_low = prev_high = prev_low = None
+
+    for i in range(len(df)):
+        if not np.isnan(swing_highs.iloc[i]):
+            prev_high, last_high = last_high, float(swing_highs.iloc[i])
+        if not np.isnan(swing_lows.iloc[i]):
+            prev_low, last_low = last_low, float(swing_lows.iloc[i])
+        if last_high is None or last_low is None:
+            continue
+
+        if trend == 'BULLISH' and prev_high is not None and close[i] > prev_high:
+            bos.append(('BULLISH', prev_high, i))
+        if trend == 'BEARISH' and prev_low is not None and close[i] < prev_low:
+            bos.append(('BEARISH', prev_low, i))
+        if trend in ('BEARISH', None) and close[i] > last_high:
+            choch.append(('BULLISH', last_high, i))
+            trend = 'BULLISH'
+        if trend in ('BULLISH', None) and close[i] < last_low:
+            choch.append(('BEARISH', last_low, i))
+            trend = 'BEARISH'
+    return trend, bos, choch, last_high, last_low
+
+
+def summarize(structure):
+    return (structure['trend'],
+            [(e['bias'], e['price'], e['bar_index']) for e in structure['bos_levels']],
+            [(e['bias'], e['price'], e['bar_index']) for e in structure['choch_levels']],
+            structure['last_swing_high'], structure['last_swing_low'])
+
+
+def test_engine_matches_scan():
+    """Both structures from one pass equal the former per-structure scans"""
+    print("\n🧪 Testing market structure engine...")
+    for seed in range(10):
+        df = make_frame(100 + 40 * seed, seed)
+        analyzer = SmartMoneyAnalyzer(binance_client=None, swing_length=5 + seed, internal_length=2)
+        structures = analyzer._analyze_market_structures(df, {'SWING': analyzer.swing_length,
+                                                              'INTERNAL': analyzer.internal_length})
+        for name, length in (('SWING', analyzer.swing_length), ('INTERNAL', analyzer.internal_length)):
+            structure = structures[name]
+            assert summarize(structure) == reference_structure(analyzer, df, length, name)
+            assert all(e['structure_type'] == name for e in structure['bos_levels'] + structure['choch_levels'])
+            assert structure == analyzer._analyze_market_structure(df, length, name)
+
+        swing_highs, _ = analyzer._find_swing_points(df, analyzer.swing_length)
+        expected_eqh = analyzer._detect_equal_levels(swing_highs.dropna().tolist(), analyzer.eqh_eql_threshold)
+        assert structures['SWING']['eqh_groups'] == expected_eqh
+    print("✅ Market structure engine passed!")
+
+
+def test_incremental_updates():
+    """update() on growing or sliding frames equals run() over the whole history"""
+    print("\n🧪 Testing incremental structure updates...")
+    df = make_frame(600, 11)
+    lengths = {'SWING': 12, 'INTERNAL': 3}
+
+    growing = MarketStructureEngine(lengths)
+    sliding = MarketStructureEngine(lengths)
+    growing.run(df.iloc[:150])
+    sliding.run(df.iloc[:150])
+
+    for end in range(151, 600, 7):
+        expected = MarketStructureEngine(lengths).run(df.iloc[:end])
+        assert growing.update(df.iloc[:end]) == expected
+        assert sliding.update(df.iloc[max(0, end - 150):end]) == expected
+
+    # A frame that no longer overlaps the history starts over
+    restarted = sliding.update(df.iloc[400:500])
+    assert restarted == MarketStructureEngine(lengths).run(df.iloc[400:500])
+    print("✅ Incremental updates passed!")
+
+
+def test_engine_speed():
+    """Deep history in one pass"""
+    print("\n🧪 Testing structure engine speed...")
+    df = make_frame(5000, 2)
+    analyzer = SmartMoneyAnalyzer(binance_client=None)
+
+    start = time.time()
+    result = analyzer.analyze_smart_money_concepts(df)
+    elapsed = time.time() - start
+
+    assert result['statistics']['total_choch'] > 0
+    assert elapsed < 2.0
+    print(f"✅ Speed passed! ({len(df)} bars in {elapsed * 1000:.0f}ms)")
+
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("🚀 Market Structure Test Suite")
+    print("=" * 50)
+
+    test_engine_matches_scan()
+    test_incremental_updates()
+    test_engine_speed()
+
+    print("=" * 50)
+    print("✅ Tests completed!")
+    print("=" * 50)
@@ -0,0 +1,149 @@
+"""
+Test script for locally maintained order books
+Runs offline - snapshots and depth diffs come from a local BinanceReplayServer
+"""
+
+import time
+
+from binance_client import BinanceClient
+from binance_replay_server import BinanceReplayServer, MarketRecording
+from order_book_manager import LocalOrderBook, OrderBookManager
+from request_governor import RequestGovernor
+
+SYMBOLS = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def make_server():
+    recording = MarketRecording.synthetic(SYMBOLS, intervals=('5m',), n_candles=10)
+    server = BinanceReplayServer(recording)
+    server.start()
+    return server
+
+
+def make_manager(server, client, **kwargs):
+    fetch = lambda symbol, limit: client.get_order_book(symbol=symbol, limit=limit)
+    manager = OrderBookManager(fetch, stream_url=server.stream_url, reconnect_delay=0.1, **kwargs)
+    manager.start()
+    return manager
+
+
+def test_local_book_sequence_rules():
+    """Stale diffs are skipped, continuous diffs applied, gaps detected"""
+    print("\n🧪 Testing diff sequencing...")
+    book = LocalOrderBook('BTCUSDT')
+    book.load_snapshot({'lastUpdateId': 100,
+                        'bids': [['99.0', '1'], ['98.0', '2']],
+                        'asks': [['101.0', '1'], ['102.0', '2']]})
+
+    # Fully covered by the snapshot - ignored
+    assert book.apply_diff({'U': 90, 'u': 100, 'b': [['99.0', '0']], 'a': []})
+    assert 99.0 in book.bids
+
+    # Straddles the snapshot id - applied
+    assert book.apply_diff({'U': 95, 'u': 103, 'b': [['99.0', '0'], ['99.5', '3']], 'a': [['100.5', '4']]})
+    assert book.last_update_id == 103
+    depth = book.to_depth(2)
+    assert depth['bids'] == [['99.5', '3'], ['98.0', '2']]
+    assert depth['asks'] == [['100.5', '4'], ['101.0', '1']]
+
+    # Event 104 was missed
+    assert not book.apply_diff({'U': 105, 'u': 106, 'b': [], 'a': []})
+    assert not book.synced
+    print("✅ Diff sequencing passed!")
+
+
+def test_stream_sync_and_gap_recovery():
+    """Books follow streamed diffs and resync from a new snapshot after a gap"""
+    print("\n🧪 Testing stream sync + gap recovery...")
+    server = make_server()
+    client = BinanceClient('key', 'secret', governor=RequestGovernor(), api_url=server.api_url,
+                           use_kline_streams=False, use_depth_streams=False)
+    manager = make_manager(server, client.client)
+    try:
+        manager.track(['BTCUSDT'])
+        assert wait_for(lambda: manager.is_synced('BTCUSDT'))
+        assert wait_for(lambda: server.ws_client_count == 1)
+        assert manager.get_order_book('BTCUSDT', 100) == server.recording.depth['BTCUSDT']
+
+        best_bid = server.recording.depth['BTCUSDT']['bids'][0]
+        best_ask = server.recording.depth['BTCUSDT']['asks'][0]
+        server.push_depth_update('BTCUSDT', bids=[[best_bid[0], '0']], asks=[[best_ask[0], '123.0']])
+        assert wait_for(lambda: manager.get_order_book('BTCUSDT', 1)['asks'][0] == [best_ask[0], '123.0'])
+        assert manager.get_order_book('BTCUSDT', 1)['bids'][0] != best_bid
+        assert manager.get_order_book('BTCUSDT', 100) == server.recording.depth['BTCUSDT']
+
+        # Missed event -> gap on the next one -> fresh snapshot
+        server.push_depth_update('BTCUSDT', bids=[['1.0', '5']], deliver=False)
+        server.push_depth_update('BTCUSDT', asks=[[best_ask[0], '7.0']])
+        assert wait_for(lambda: manager.get_stats()['resyncs'] == 1)
+        assert wait_for(lambda: manager.get_order_book('BTCUSDT', 100) == server.recording.depth['BTCUSDT'])
+        assert manager.get_stats()['snapshots'] == 2
+        print("✅ Stream sync + gap recovery passed!")
+    finally:
+        manager.stop()
+        server.stop()
+
+
+def test_client_serves_tracked_books_from_memory():
+    """Reads never start tracking; tracked books share one connection, serve 100 levels, LRU caps them"""
+    print("\n🧪 Testing BinanceClient.get_order_book...")
+    server = make_server()
+    client = BinanceClient('key', 'secret', governor=RequestGovernor(), api_url=server.api_url,
+                           stream_url=server.stream_url, use_kline_streams=False, max_order_books=2)
+    try:
+        startup_weight = server.stats()['total_weight']  # Client ping
+
+        # Untracked symbols are plain REST reads
+        depth = client.get_order_book('BTCUSDT', limit=100)
+        assert len(depth['bids']) == 100
+        assert client.order_books is None and server.ws_client_count == 0
+
+        assert client.track_order_books(['BTCUSDT', 'ETHUSDT']) == 2
+        assert wait_for(lambda: client.order_books.is_synced('BTCUSDT') and client.order_books.is_synced('ETHUSDT'))
+        assert server.ws_client_count == 1  # Both books on one connection
+        rest_calls = server.stats()['requests']['depth']
+
+        for _ in range(20):
+            assert client.get_order_book('BTCUSDT', limit=100) == depth
+        assert client.get_order_book('SOLUSDT', limit=100) is not None  # REST
+        assert server.stats()['requests']['depth'] == rest_calls + 1
+        assert not client.order_books.is_tracked('SOLUSDT')
+
+        # Snapshots go well past the served depth (1000 levels, weight 50) so
+        # levels beyond it are never missing from a read
+        assert client.order_books.snapshot_limit == 1000 and client.order_books.max_depth == 100
+        assert server.stats()['total_weight'] - startup_weight == 5 * 2 + 50 * 2
+        assert client.order_books.get_order_book('BTCUSDT', 500) is None  # Deeper reads use REST
+
+        client.track_order_books(['SOLUSDT'])
+        assert wait_for(lambda: client.order_books.is_synced('SOLUSDT'))
+        assert not client.order_books.is_tracked('ETHUSDT')  # Least recently read
+        assert client.order_books.is_tracked('BTCUSDT')
+        assert server.ws_client_count == 1
+        print("✅ BinanceClient.get_order_book passed!")
+    finally:
+        client.order_books.stop()
+        server.stop()
+
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("🚀 Order Book Manager Test Suite")
+    print("=" * 50)
+
+    test_local_book_sequence_rules()
+    test_stream_sync_and_gap_recovery()
+    test_client_serves_tracked_books_from_memory()
+
+    print("=" * 50)
+    print("✅ Tests completed!")
+    print("=" * 50)
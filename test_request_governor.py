@@ -0,0 +1,205 @@
+"""
+Test script for RequestGovernor
+Runs offline - uses synthetic responses instead of Binance
+"""
+
+import threading
+import time
+
+import requests
+
+from async_binance_client import AsyncLoopThread
+from request_governor import (
+    BACKGROUND, INTERACTIVE, RequestGovernor, current_priority, endpoint_weight,
+    request_priority, weight_for_uri
+)
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def test_endpoint_weights():
+    """Documented Binance weights"""
+    print("\n🧪 Testing endpoint weights...")
+    assert endpoint_weight('klines') == 2
+    assert endpoint_weight('exchangeInfo') == 20
+    assert endpoint_weight('depth', {'limit': 100}) == 5
+    assert endpoint_weight('depth', {'limit': 500}) == 25
+    assert endpoint_weight('trades', {'limit': 500}) == 25
+    assert endpoint_weight('aggTrades', {'limit': 1000}) == 4
+    assert endpoint_weight('ticker/24hr', {'symbol': 'BTCUSDT'}) == 2
+    assert endpoint_weight('ticker/24hr') == 80
+    assert weight_for_uri('https://api.binance.com/api/v3/ticker/24hr') == 80
+    assert weight_for_uri('https://api.binance.com/api/v3/depth', {'limit': 100}) == 5
+    print("✅ Endpoint weights passed!")
+
+
+def test_bucket_limits_concurrent_workers():
+    """30 threads cannot spend more than the bucket allows"""
+    print("\n🧪 Testing concurrent acquire...")
+    # 600/min budget -> 10 weight/s refill, 1s burst = 10 tokens
+    governor = RequestGovernor(weight_limit=600, headroom=1.0, burst_seconds=1.0)
+    spent = []
+    lock = threading.Lock()
+
+    def worker():
+        governor.acquire(2)
+        with lock:
+            spent.append(time.monotonic())
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=worker) for _ in range(30)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # 60 weight with 10 up front and 10/s refill takes ~5s
+    elapsed = time.monotonic() - start
+    assert len(spent) == 30
+    assert elapsed >= 4.0, elapsed
+    assert governor.get_budget()['used_1m'] <= 60  # Window may roll over mid-test
+    print(f"✅ Concurrent acquire passed! ({elapsed:.1f}s)")
+
+
+def test_server_weight_header_backs_off():
+    """Reported usage near the limit exhausts the budget before a 429"""
+    print("\n🧪 Testing X-MBX-USED-WEIGHT-1M feedback...")
+    governor = RequestGovernor(weight_limit=1000, headroom=0.9)
+    governor.observe_response(FakeResponse(headers={'X-MBX-USED-WEIGHT-1M': '899'}))
+
+    budget = governor.get_budget()
+    assert budget['server_used_1m'] == 899
+    assert budget['available_1m'] == 1
+    assert governor.available() == 1
+    assert governor._wait_time(5) > 0
+    print("✅ Weight header feedback passed!")
+
+
+def test_429_blocks_all_requests():
+    """A 429 pauses every request for Retry-After seconds"""
+    print("\n🧪 Testing 429 handling...")
+    governor = RequestGovernor()
+    governor.observe_response(FakeResponse(status_code=429, headers={'Retry-After': '30'}))
+
+    budget = governor.get_budget()
+    assert 29 < budget['blocked_for'] <= 30
+    assert budget['rejected'] == 1
+    assert governor.available() == 0
+    print("✅ 429 handling passed!")
+
+
+def test_install_charges_client_requests():
+    """install() charges weight for python-binance requests and reads headers back"""
+    print("\n🧪 Testing client installation...")
+
+    class FakeBinanceClient:
+        def __init__(self):
+            self.session = requests.Session()
+            self.uris = []
+
+        def _request(self, method, uri, signed, force_params=False, **kwargs):
+            self.uris.append(uri)
+            return {}
+
+    governor = RequestGovernor()
+    client = FakeBinanceClient()
+    assert governor.install(client)
+    assert not governor.install(client)  # Idempotent
+
+    client._request('get', 'https://api.binance.com/api/v3/depth', False, data={'symbol': 'BTCUSDT', 'limit': 100})
+    client._request('get', 'https://api.binance.com/api/v3/aggTrades', False, data={'symbol': 'BTCUSDT'})
+    assert governor.get_budget()['used_1m'] == 9
+
+    for hook in client.session.hooks['response']:
+        hook(FakeResponse(headers={'X-MBX-USED-WEIGHT-1M': '120'}))
+    assert governor.get_budget()['server_used_1m'] == 120
+    print("✅ Client installation passed!")
+
+
+def test_background_leaves_interactive_reserve():
+    """Background requests stop at the reserve; interactive ones may spend it"""
+    print("\n🧪 Testing interactive reserve...")
+    # 600/min budget -> 10 weight/s, 1s burst = 10 tokens, 3 reserved
+    governor = RequestGovernor(weight_limit=600, headroom=1.0, burst_seconds=1.0, interactive_reserve=0.3)
+    assert current_priority() == BACKGROUND
+    assert governor.try_acquire(7) == 0
+    assert governor.try_acquire(1) > 0
+
+    with request_priority(INTERACTIVE):
+        assert governor.try_acquire(3) == 0
+    lanes = governor.get_budget()['lanes']
+    assert lanes[BACKGROUND]['weight'] == 7 and lanes[INTERACTIVE]['weight'] == 3
+    print("✅ Interactive reserve passed!")
+
+
+def test_interactive_preempts_background_sweep():
+    """A user request is served promptly while 20 scan workers saturate the budget"""
+    print("\n🧪 Testing interactive preemption...")
+    governor = RequestGovernor(weight_limit=600, headroom=1.0, burst_seconds=1.0)
+    stop = threading.Event()
+
+    def scan_worker():
+        while not stop.is_set():
+            governor.acquire(2)
+
+    workers = [threading.Thread(target=scan_worker, daemon=True) for _ in range(20)]
+    for t in workers:
+        t.start()
+    time.sleep(0.5)  # Bucket drained, workers queued
+
+    waits = []
+    with request_priority(INTERACTIVE):
+        for _ in range(5):
+            start = time.monotonic()
+            governor.acquire(2)
+            waits.append(time.monotonic() - start)
+    stop.set()
+    for t in workers:
+        t.join(timeout=5)
+
+    # 10 weight/s refill: each 2-weight request needs <= 0.2s of refill
+    assert max(waits) < 0.35, waits
+    assert governor.get_budget()['lanes'][INTERACTIVE]['requests'] == 5
+    assert governor.get_budget()['interactive_waiting'] == 0
+    print(f"✅ Interactive preemption passed! (max wait {max(waits):.2f}s)")
+
+
+def test_lane_follows_coroutines_to_loop_thread():
+    """AsyncLoopThread.run keeps the caller's lane"""
+    print("\n🧪 Testing lane propagation...")
+
+    async def lane():
+        return current_priority()
+
+    runner = AsyncLoopThread()
+    try:
+        assert runner.run(lane()) == BACKGROUND
+        with request_priority(INTERACTIVE):
+            assert runner.run(lane()) == INTERACTIVE
+        assert runner.run(lane()) == BACKGROUND
+    finally:
+        runner.stop()
+    print("✅ Lane propagation passed!")
+
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("🚀 Request Governor Test Suite")
+    print("=" * 50)
+
+    test_endpoint_weights()
+    test_bucket_limits_concurrent_workers()
+    test_server_weight_header_backs_off()
+    test_429_blocks_all_requests()
+    test_install_charges_client_requests()
+    test_background_leaves_interactive_reserve()
+    test_interactive_preempts_background_sweep()
+    test_lane_follows_coroutines_to_loop_thread()
+
+    print("=" * 50)
+    print("✅ Tests completed!")
+    print("=" * 50)
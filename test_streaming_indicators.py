@@ -0,0 +1,160 @@
+"""
+Test script for streaming indicator state
+Runs offline - compares against the batch indicator functions on synthetic candles
+"""
+
+import threading
+
+import numpy as np
+
+from candles import Candles
+from fair_value_gaps import FairValueGapDetector
+from indicators import calculate_hlcc4, calculate_mfi, calculate_rsi
+import pump_detector_realtime
+from pump_detector_realtime import RealtimePumpDetector
+from stoch_rsi_analyzer import StochRSIAnalyzer
+from streaming_indicators import StreamingATR, StreamingMFI, StreamingRSI, StreamingStoch
+from test_candles import make_klines
+
+
+def make_frame(n=300):
+    df = Candles.from_klines(make_klines(n)).to_frame()
+    df.iloc[40:46, df.columns.get_loc('high')] = df['high'].iloc[40]  # Some flat stretches
+    df.iloc[40:46, df.columns.get_loc('low')] = df['high'].iloc[40]
+    df.iloc[40:46, df.columns.get_loc('close')] = df['high'].iloc[40]
+    df.iloc[40:46, df.columns.get_loc('open')] = df['high'].iloc[40]
+    return df
+
+
+def replay(indicator, df):
+    """Committed value after every candle"""
+    candles = Candles.from_frame(df)
+    columns = [getattr(candles, name) for name in indicator.inputs]
+    return [indicator.update(*(float(c[i]) for c in columns)) for i in range(len(df))]
+
+
+def test_streaming_matches_batch():
+    """Every committed value equals the batch series at the same candle"""
+    print("\n🧪 Testing streaming vs batch...")
+    df = make_frame()
+
+    rsi = np.array(replay(StreamingRSI(period=14), df))
+    assert np.isnan(rsi[:14]).all()
+    assert np.allclose(rsi[14:], calculate_rsi(calculate_hlcc4(df), 14).to_numpy()[14:])
+
+    mfi = np.array(replay(StreamingMFI(period=14), df))
+    assert np.allclose(mfi, calculate_mfi(df, 14).to_numpy())
+
+    analyzer = StochRSIAnalyzer(binance_client=None)
+    ohlc4 = analyzer.calculate_ohlc4(df)
+    expected_k = analyzer.calculate_stochastic(ohlc4, 6, 6)
+    expected_d = analyzer.calculate_stochastic_d(expected_k, 6)
+    stoch = np.array(replay(StreamingStoch(6, 6, 6), df))
+    assert np.allclose(stoch[:, 0], expected_k.to_numpy(), equal_nan=True)
+    assert np.allclose(stoch[:, 1], expected_d.to_numpy(), equal_nan=True)
+
+    atr = np.array(replay(StreamingATR(period=14), df))
+    expected = FairValueGapDetector(binance_client=None)._calculate_atr(df, 14)
+    assert np.allclose(atr, expected.to_numpy(), equal_nan=True)
+    print("✅ Streaming vs batch passed!")
+
+
+def test_feed_peek_and_gaps():
+    """feed() commits closed candles once, peeks the forming one and detects gaps"""
+    print("\n🧪 Testing feed / peek...")
+    df = make_frame(200)
+    candles = Candles.from_frame(df)
+    full = calculate_rsi(calculate_hlcc4(df), 14).to_numpy()
+
+    rsi = StreamingRSI(period=14, history=4)
+    now = int(candles.close_time[99]) + 1  # Candles 0..99 closed
+    rsi.seed(candles[:100], now_ms=now)
+    assert rsi.last_open_time == candles.timestamp[99]
+
+    for last in range(100, 180):
+        now = int(candles.close_time[last - 1]) + 1  # Candle `last` still forming
+        window = candles[last - 9:last + 1]
+        peeked = rsi.feed(window, now_ms=now)
+        assert np.isclose(peeked, full[last])
+        assert np.isclose(rsi.value, full[last - 1])
+        assert np.isclose(rsi.feed(window, now_ms=now), peeked)  # Same tick again: no change
+        assert np.isclose(rsi.history[-3], full[last - 3])
+
+    # A window that starts after missed candles needs a reseed
+    assert rsi.feed(candles[190:200], now_ms=int(candles.close_time[199]) + 1) is None
+
+    # Peek never changes state
+    mfi = StreamingMFI(period=6)
+    mfi.seed(candles[:50], now_ms=int(candles.close_time[-1]) + 1)
+    before = mfi.value
+    mfi.peek(1e9, 0.0, 5e8, 1e6)
+    assert mfi.value == before and mfi.peek(1e9, 0.0, 5e8, 1e6) == mfi.peek(1e9, 0.0, 5e8, 1e6)
+    print("✅ Feed / peek passed!")
+
+
+def test_pump_detector_rsi_momentum():
+    """Layer 1 RSI is seeded once (from the batch frame when deep enough), then follows the windows"""
+    print("\n🧪 Testing Layer 1 RSI momentum...")
+
+    class FakeBinance:
+        def __init__(self, df):
+            self.df = df
+            self.end = 0
+            self.calls = 0
+
+        def get_klines(self, symbol, interval, limit=500):
+            self.calls += 1
+            return self.df.iloc[max(0, self.end - limit):self.end]
+
+    df = make_frame(300)
+    now = df['close_time'].to_numpy() + 1  # Time at which each candle has closed
+    binance = FakeBinance(df)
+    detector = RealtimePumpDetector(binance, telegram_bot=None, bot_detector=None)
+    # The state is seeded from the 100 candles ending at the first window's forming candle
+    full = np.r_[np.full(51, np.nan), calculate_rsi(calculate_hlcc4(df.iloc[51:]), 14).to_numpy()]
+
+    # Layer 1 batches fetch layer1_candles, so the seed needs no request of its own
+    batched = RealtimePumpDetector(binance, telegram_bot=None, bot_detector=None)
+    depth = batched.layer1_candles
+    assert depth == 100
+
+    original_time = pump_detector_realtime.time.time
+    try:
+        for last in range(150, 200):
+            binance.end = last + 1
+            pump_detector_realtime.time.time = lambda: (now[last - 1] + 1) / 1000  # Candle `last` forming
+            current, three_ago = detector._rsi_momentum('BTCUSDT', df.iloc[last - 9:last + 1])
+            assert np.isclose(current, full[last]) and np.isclose(three_ago, full[last - 3])
+            current, three_ago = batched._rsi_momentum('BTCUSDT', df.iloc[last + 1 - depth:last + 1])
+            assert np.isclose(current, full[last]) and np.isclose(three_ago, full[last - 3])
+
+        # Concurrent scans of one symbol (monitor + Telegram threads) commit each candle once
+        for last in range(200, 210):
+            pump_detector_realtime.time.time = lambda: (now[last - 1] + 1) / 1000
+            results = []
+            threads = [threading.Thread(target=lambda: results.append(
+                batched._rsi_momentum('BTCUSDT', df.iloc[last + 1 - depth:last + 1]))) for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            assert len(results) == 8
+            assert all(np.isclose(c, full[last]) and np.isclose(t, full[last - 3]) for c, t in results)
+    finally:
+        pump_detector_realtime.time.time = original_time
+    assert binance.calls == 1  # Only the 10-candle detector fetched a seed window
+    print("✅ Layer 1 RSI momentum passed!")
+
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("🚀 Streaming Indicator Test Suite")
+    print("=" * 50)
+
+    test_streaming_matches_batch()
+    test_feed_peek_and_gaps()
+    test_pump_detector_rsi_momentum()
+
+    print("=" * 50)
+    print("✅ Tests completed!")
+    print("=" * 50)
@@ -0,0 +1,96 @@
+"""
+Test script for support / resistance zone detection
+Runs offline - compares against the former break / retest scan on synthetic candles
+"""
+
+import time
+
+import numpy as np
+
+from support_resistance import SupportResistanceDetector
+from test_fair_value_gaps import make_frame
+
+
+def make_zone_frame(n, seed):
+    df = make_frame(n, seed)
+    df['volume'] = abs(np.random.default_rng(seed).normal(1000, 400, n))
+    return df
+
+
+def reference_statuses(detector, df):
+    """Former per-zone scans: {('RESISTANCE' | 'SUPPORT', bar_index): (status, pivot price)}"""
+    high, low, close, volume = (df[col].to_numpy() for col in ('high', 'low', 'close', 'volume'))
+    atr = detector._calculate_atr(df).to_numpy()
+    pivot_highs, pivot_lows = detector._find_pivot_highs_lows(df)
+    threshold = df['volume'].mean() * detector.volume_threshold
+
+    statuses = {}
+    for zone_type, pivots in (('RESISTANCE', pivot_highs), ('SUPPORT', pivot_lows)):
+        for i in range(len(df)):
+            if np.isnan(pivots.iloc[i]) or volume[i] < threshold:
+                continue
+            price = float(pivots.iloc[i])
+            width = atr[i] * detector.atr_box_width if not np.isnan(atr[i]) else price * 0.01
+            top, bottom = price + width / 2.0, price - width / 2.0
+
+            status = 'ACTIVE'
+            for j in range(i + 1, len(df)):
+                if (close[j] > top) if zone_type == 'RESISTANCE' else (close[j] < bottom):
+                    retest = low if zone_type == 'RESISTANCE' else high
+                    retested = any(bottom <= retest[k] <= top for k in range(j + 1, len(df)))
+                    status = 'BROKEN_RETESTED' if retested else 'BROKEN'
+                    break
+            statuses[(zone_type, i)] = (status, price)
+    return statuses
+
+
+def test_zones_match_scan():
+    """Zone statuses, active zones and statistics equal the former nested scans"""
+    print("\n🧪 Testing S/R zones...")
+    for seed in range(12):
+        n = 60 + 30 * seed
+        df = make_zone_frame(n, seed)
+        detector = SupportResistanceDetector(binance_client=None, pivot_length=3 + seed % 8,
+                                             volume_threshold_multiplier=1.0)
+        result = detector.detect_support_resistance_zones(df)
+        expected = reference_statuses(detector, df)
+        stats = result['statistics']
+
+        for zone_type, key in (('SUPPORT', 'support'), ('RESISTANCE', 'resistance')):
+            zones = {i: zone for (t, i), zone in expected.items() if t == zone_type}
+            assert stats[f'total_{key}_zones'] == len(zones)
+            assert stats[f'broken_{key}_zones'] == sum(status != 'ACTIVE' for status, _ in zones.values())
+
+            active = sorted((i for i, (status, _) in zones.items() if status == 'ACTIVE'),
+                            key=lambda i: abs(zones[i][1] - result['current_price']))[:detector.max_zones]
+            assert [z['bar_index'] for z in result[f'{key}_zones']] == active
+            assert all(z['status'] == 'ACTIVE' and not z['broken'] for z in result[f'{key}_zones'])
+    print("✅ S/R zones passed!")
+
+
+def test_zones_deep_history():
+    """Deep history stays fast"""
+    print("\n🧪 Testing S/R zones on deep history...")
+    df = make_zone_frame(3000, 5)
+    detector = SupportResistanceDetector(binance_client=None, pivot_length=5, volume_threshold_multiplier=1.0)
+
+    start = time.time()
+    result = detector.detect_support_resistance_zones(df)
+    elapsed = time.time() - start
+
+    assert result['statistics']['total_support_zones'] > 50
+    assert elapsed < 2.0
+    print(f"✅ Deep history passed! ({len(df)} bars in {elapsed * 1000:.0f}ms)")
+
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("🚀 Support / Resistance Test Suite")
+    print("=" * 50)
+
+    test_zones_match_scan()
+    test_zones_deep_history()
+
+    print("=" * 50)
+    print("✅ Tests completed!")
+    print("=" * 50)
@@ -0,0 +1,109 @@
+"""
+Test script for TickerSnapshot
+Runs offline - uses a fake ticker endpoint
+"""
+
+import threading
+import time
+
+import binance_client
+from binance_client import BinanceClient
+from ticker_snapshot import TickerSnapshot
+
+
+class FakeTickerClient:
+    """Serves a full 24hr ticker array and counts requests"""
+
+    def __init__(self, *args, **kwargs):
+        self.ticker_calls = 0
+        self.fail = False
+        self.session = None
+
+    def get_ticker(self, **params):
+        assert 'symbol' not in params, "per-symbol ticker request made"
+        if self.fail:
+            raise ConnectionError("offline")
+        self.ticker_calls += 1
+        time.sleep(0.05)  # Let concurrent readers pile up
+        return [
+            {'symbol': 'BTCUSDT', 'lastPrice': '65000.5', 'highPrice': '66000', 'lowPrice': '64000',
+             'priceChangePercent': '1.5', 'priceChange': '960', 'volume': '1200',
+             'quoteVolume': '78000000', 'count': 250000},
+            {'symbol': 'ETHUSDT', 'lastPrice': '3100', 'highPrice': '3200', 'lowPrice': '3000',
+             'priceChangePercent': '-0.5', 'priceChange': '-15', 'volume': '9000',
+             'quoteVolume': '27900000', 'count': 180000},
+        ]
+
+
+def test_single_refresh_for_concurrent_readers():
+    """Many threads reading at once trigger one bulk request"""
+    print("\n🧪 Testing concurrent snapshot reads...")
+    client = FakeTickerClient()
+    snapshot = TickerSnapshot(client, max_age=10)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(snapshot.get('BTCUSDT')))
+               for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert client.ticker_calls == 1
+    assert all(r['lastPrice'] == '65000.5' for r in results)
+    assert snapshot.get('NOPEUSDT') is None
+    print("✅ Concurrent snapshot reads passed!")
+
+
+def test_refresh_after_max_age_and_stale_fallback():
+    """Snapshots expire, and a failed refresh keeps serving recent data"""
+    print("\n🧪 Testing snapshot expiry...")
+    client = FakeTickerClient()
+    snapshot = TickerSnapshot(client, max_age=0.1, max_stale_age=5)
+    snapshot.get('BTCUSDT')
+    time.sleep(0.15)
+    snapshot.get('BTCUSDT')
+    assert client.ticker_calls == 2
+
+    client.fail = True
+    time.sleep(0.15)
+    assert snapshot.get('ETHUSDT')['lastPrice'] == '3100'
+    print("✅ Snapshot expiry passed!")
+
+
+def test_binance_client_reads_from_snapshot():
+    """get_24h_data / get_current_price / get_ticker share one request"""
+    print("\n🧪 Testing BinanceClient integration...")
+    original = binance_client.Client
+    binance_client.Client = FakeTickerClient
+    try:
+        client = BinanceClient('key', 'secret', use_kline_streams=False)
+    finally:
+        binance_client.Client = original
+
+    for symbol in ('BTCUSDT', 'ETHUSDT'):
+        assert client.get_current_price(symbol) > 0
+        data = client.get_24h_data(symbol)
+        assert data['last_price'] == client.get_current_price(symbol)
+        assert client.get_ticker(symbol)['symbol'] == symbol
+
+    data = client.get_24h_data('BTCUSDT')
+    assert data['volume'] == 78000000.0
+    assert data['trades'] == 250000
+    assert client.get_24h_data('NOPEUSDT') is None
+    assert client.client.ticker_calls == 1
+    print("✅ BinanceClient integration passed!")
+
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("🚀 Ticker Snapshot Test Suite")
+    print("=" * 50)
+
+    test_single_refresh_for_concurrent_readers()
+    test_refresh_after_max_age_and_stale_fallback()
+    test_binance_client_reads_from_snapshot()
+
+    print("=" * 50)
+    print("✅ Tests completed!")
+    print("=" * 50)
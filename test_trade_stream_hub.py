@@ -0,0 +1,108 @@
+"""
+Test script for aggTrade ring buffers
+Runs offline - REST trades and the aggTrade stream come from a local BinanceReplayServer
+"""
+
+import time
+
+import numpy as np
+
+from binance_client import BinanceClient
+from binance_replay_server import BinanceReplayServer, MarketRecording
+from request_governor import RequestGovernor
+from trade_stream_hub import AggTradeRing, agg_trades_to_records, records_to_agg_trades
+
+SYMBOLS = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def make_rows(first_id, n):
+    return [{'a': first_id + k, 'p': f'{100 + k}.5', 'q': '0.25', 'f': first_id + k, 'l': first_id + k,
+             'T': 1_000 + k, 'm': k % 2 == 0, 'M': True} for k in range(n)]
+
+
+def test_ring_wraparound():
+    """The ring keeps the newest `capacity` records in order across wraparound"""
+    print("\n🧪 Testing ring buffer...")
+    ring = AggTradeRing(capacity=100)
+    ring.extend(agg_trades_to_records(make_rows(1, 70)))
+    ring.extend(agg_trades_to_records(make_rows(71, 50)))
+    assert len(ring) == 100 and ring.last_id == 120
+    assert np.array_equal(ring.latest()['a'], np.arange(21, 121))
+    assert np.array_equal(ring.latest(5)['a'], np.arange(116, 121))
+
+    ring.extend(agg_trades_to_records(make_rows(121, 250)))
+    assert np.array_equal(ring.latest()['a'], np.arange(271, 371))
+
+    # Round trip to the REST layout
+    rows = make_rows(1, 3)
+    assert [(float(r['p']), float(r['q']), r['m']) for r in records_to_agg_trades(agg_trades_to_records(rows))] \
+        == [(float(r['p']), float(r['q']), r['m']) for r in rows]
+    print("✅ Ring buffer passed!")
+
+
+def test_client_serves_tracked_symbols_from_stream():
+    """Tracked symbols are seeded once over REST, then follow the stream"""
+    print("\n🧪 Testing streamed trade reads...")
+    recording = MarketRecording.synthetic(SYMBOLS, intervals=('5m',), n_candles=10)
+    server = BinanceReplayServer(recording)
+    server.start()
+    client = BinanceClient('key', 'secret', governor=RequestGovernor(), api_url=server.api_url,
+                           stream_url=server.stream_url, use_kline_streams=False, use_depth_streams=False)
+    try:
+        # Untracked symbols use the REST endpoints unchanged
+        assert len(client.get_recent_trades('ETHUSDT', limit=100)) == 100
+        assert server.stats()['requests']['trades'] == 1
+
+        assert client.track_trade_streams(['BTCUSDT', 'SOLUSDT']) == 2
+        assert wait_for(lambda: client.trade_hub.get_stats()['connected'])
+
+        first = client.get_aggregate_trades('BTCUSDT', limit=1000)  # REST seed (500 = full history)
+        assert len(first) == 500
+        rest_calls = server.stats()['requests']['aggTrades']
+
+        # Cold until a streamed trade joins up with the seed (subscription live)
+        assert client.trade_hub.get_stats()['warm'] == 0
+        server.push_agg_trade('BTCUSDT', '101.5', '3.0', is_buyer_maker=True)
+        assert wait_for(lambda: client.trade_hub.get_stats()['warm'] == 1)
+        assert client.get_aggregate_trades('BTCUSDT', 1)[0]['a'] == first[-1]['a'] + 1
+
+        trades = client.get_recent_trades('BTCUSDT', limit=500)
+        assert len(trades) == 500
+        assert trades[-1]['qty'] == '3.0' and trades[-1]['isBuyerMaker'] is True
+        assert [t['time'] for t in trades[:-1]] == [t['T'] for t in first[-499:]]
+        assert server.stats()['requests']['aggTrades'] == rest_calls
+        assert server.stats()['requests']['trades'] == 1
+
+        # A missed trade cools the ring; the next read re-seeds it over REST
+        server.push_agg_trade('BTCUSDT', '102.0', '1.0', deliver=False)
+        server.push_agg_trade('BTCUSDT', '102.5', '2.0')
+        assert wait_for(lambda: client.trade_hub.get_stats()['warm'] == 0)
+        trades = client.get_recent_trades('BTCUSDT', limit=3)
+        assert [t['qty'] for t in trades] == ['3.0', '1.0', '2.0']
+        assert server.stats()['requests']['aggTrades'] == rest_calls + 1
+        print("✅ Streamed trade reads passed!")
+    finally:
+        client.trade_hub.stop()
+        server.stop()
+
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("🚀 Trade Stream Hub Test Suite")
+    print("=" * 50)
+
+    test_ring_wraparound()
+    test_client_serves_tracked_symbols_from_stream()
+
+    print("=" * 50)
+    print("✅ Tests completed!")
+    print("=" * 50)
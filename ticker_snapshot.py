@@ -0,0 +1,85 @@
+"""
+Ticker Snapshot Service
+Bulk 24h ticker snapshot shared by every per-symbol ticker lookup
+
+Pulls the full /api/v3/ticker/24hr array (one request, weight 80) at most
+once per `max_age` seconds and indexes it by symbol. get_24h_data,
+get_current_price, BotDetector and AdvancedPumpDumpDetector read from it,
+so a /scan or /scanwatch over hundreds of symbols costs one ticker request
+instead of two per symbol.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TickerSnapshot:
+    """
+    Symbol-indexed 24h ticker snapshot, refreshed lazily
+
+    Usage:
+        snapshot = TickerSnapshot(client, max_age=10)
+        ticker = snapshot.get('BTCUSDT')      # raw Binance 24hr ticker dict
+        all_tickers = snapshot.get_all()      # {symbol: ticker}
+    """
+
+    def __init__(self, client, max_age: float = 10.0, max_stale_age: float = 120.0):
+        """
+        Initialize ticker snapshot
+
+        Args:
+            client: python-binance Client
+            max_age: Seconds a snapshot is served before it is refreshed
+            max_stale_age: If a refresh fails, keep serving the old snapshot this long
+        """
+        self.client = client
+        self.max_age = max_age
+        self.max_stale_age = max_stale_age
+
+        self._tickers: Dict[str, Dict] = {}
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self.refresh_count = 0
+
+    @property
+    def age(self) -> float:
+        """Seconds since the last successful refresh"""
+        return time.time() - self._fetched_at if self._fetched_at else float('inf')
+
+    def _ensure_fresh(self):
+        if self.age < self.max_age:
+            return
+
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self.age < self.max_age:
+                return
+            try:
+                tickers = self.client.get_ticker()
+                self._tickers = {t['symbol']: t for t in tickers}
+                self._fetched_at = time.time()
+                self.refresh_count += 1
+                logger.debug(f"Ticker snapshot refreshed ({len(self._tickers)} symbols)")
+            except Exception as e:
+                if self._tickers and self.age < self.max_stale_age:
+                    logger.warning(f"Ticker snapshot refresh failed, serving {self.age:.0f}s old data: {e}")
+                else:
+                    raise
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        """Raw 24hr ticker for one symbol (None if Binance doesn't list it)"""
+        self._ensure_fresh()
+        return self._tickers.get(symbol)
+
+    def get_all(self) -> Dict[str, Dict]:
+        """All raw 24hr tickers keyed by symbol (do not mutate)"""
+        self._ensure_fresh()
+        return self._tickers
+
+    def invalidate(self):
+        """Force a refresh on the next read"""
+        self._fetched_at = 0.0
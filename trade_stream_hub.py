@@ -0,0 +1,430 @@
+"""
+Trade Stream Hub
+Per-symbol aggregate-trade ring buffers fed by Binance @aggTrade streams
+
+BotDetector and AdvancedPumpDumpDetector read the last 500-1000 trades of a
+symbol on every analysis - get_recent_trades (weight 25) plus
+get_aggregate_trades (weight 4) per coin, which is what made BotMonitor
+scans crawl. The hub keeps a fixed-size, array-backed ring of recent
+aggregate trades for each monitored symbol instead, so reads are a slice of
+memory.
+
+A ring is "warm" when it has been seeded from REST aggTrades, its stream
+is connected, a streamed trade has joined up with the seed (so the
+subscription is known to be live) and no aggregate trade id has been
+skipped since. Any disconnect or id gap marks it cold until the next REST
+read re-seeds it.
+
+All monitored symbols share one combined connection; symbols are added and
+removed with live SUBSCRIBE / UNSUBSCRIBE messages (max 1024 streams per
+connection). At most `max_symbols` symbols are monitored - tracking a new
+one drops the least recently read.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import websockets
+
+from kline_stream_hub import BINANCE_STREAM_URL, _cancel_tasks_and_stop
+
+logger = logging.getLogger(__name__)
+
+# One record per aggregate trade (field names follow the REST/stream payload)
+AGG_TRADE_DTYPE = np.dtype([
+    ('a', '<i8'),   # aggregate trade id
+    ('p', '<f8'),   # price
+    ('q', '<f8'),   # quantity
+    ('f', '<i8'),   # first trade id
+    ('l', '<i8'),   # last trade id
+    ('T', '<i8'),   # trade time (ms)
+    ('m', '?'),     # buyer is maker (taker sold)
+])
+
+
+def agg_trade_stream_name(symbol: str) -> str:
+    """Binance aggregate trade stream name (e.g. 'btcusdt@aggTrade')"""
+    return f"{symbol.lower()}@aggTrade"
+
+
+def agg_trades_to_records(rows: List[Dict]) -> np.ndarray:
+    """REST aggTrades / stream aggTrade payloads -> AGG_TRADE_DTYPE records"""
+    records = np.empty(len(rows), dtype=AGG_TRADE_DTYPE)
+    if rows:
+        records['a'] = [r['a'] for r in rows]
+        records['p'] = [float(r['p']) for r in rows]
+        records['q'] = [float(r['q']) for r in rows]
+        records['f'] = [r['f'] for r in rows]
+        records['l'] = [r['l'] for r in rows]
+        records['T'] = [r['T'] for r in rows]
+        records['m'] = [r['m'] for r in rows]
+    return records
+
+
+def records_to_agg_trades(records: np.ndarray) -> List[Dict]:
+    """Records -> get_aggregate_trades() layout"""
+    return [
+        {'a': int(a), 'p': repr(float(p)), 'q': repr(float(q)), 'f': int(f), 'l': int(l),
+         'T': int(t), 'm': bool(m), 'M': True}
+        for a, p, q, f, l, t, m in records.tolist()
+    ]
+
+
+def records_to_trades(records: np.ndarray) -> List[Dict]:
+    """
+    Records -> get_recent_trades() layout
+
+    Each aggregate trade (one taker order filled at one price) becomes one
+    trade; the detectors only read price, qty, time and isBuyerMaker.
+    """
+    return [
+        {'id': int(l), 'price': repr(float(p)), 'qty': repr(float(q)), 'quoteQty': repr(float(p * q)),
+         'time': int(t), 'isBuyerMaker': bool(m), 'isBestMatch': True}
+        for a, p, q, f, l, t, m in records.tolist()
+    ]
+
+
+class AggTradeRing:
+    """Fixed-capacity ring of AGG_TRADE_DTYPE records (oldest overwritten first)"""
+
+    __slots__ = ('capacity', '_data', '_end', '_count', 'last_id', 'warm', 'awaiting_stream',
+                 'complete', 'updated_at')
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=AGG_TRADE_DTYPE)
+        self._end = 0       # next write position
+        self._count = 0
+        self.last_id = -1   # newest aggregate trade id held
+        self.warm = False
+        self.awaiting_stream = False  # Seeded - warm once the next streamed trade joins up
+        self.complete = False  # Holds the symbol's entire trade history
+        self.updated_at = 0.0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def clear(self):
+        self._end = 0
+        self._count = 0
+        self.last_id = -1
+
+    def extend(self, records: np.ndarray):
+        """Append records (ascending ids) with wraparound"""
+        n = len(records)
+        if n == 0:
+            return
+        if n >= self.capacity:
+            self._data[:] = records[-self.capacity:]
+            self._end = 0
+            self._count = self.capacity
+        else:
+            first = min(n, self.capacity - self._end)
+            self._data[self._end:self._end + first] = records[:first]
+            self._data[:n - first] = records[first:]
+            self._end = (self._end + n) % self.capacity
+            self._count = min(self._count + n, self.capacity)
+        self.last_id = int(records['a'][-1])
+        self.updated_at = time.time()
+
+    def latest(self, limit: Optional[int] = None) -> np.ndarray:
+        """Newest `limit` records, oldest first (a copy)"""
+        k = self._count if limit is None else min(limit, self._count)
+        return self._data[(np.arange(self._end - k, self._end)) % self.capacity]
+
+
+class TradeStreamHub:
+    """
+    Shared aggTrade WebSocket hub with per-symbol ring buffers
+
+    Usage:
+        hub = TradeStreamHub()
+        hub.start()
+        hub.track(['BTCUSDT', 'ETHUSDT'])
+        hub.seed('BTCUSDT', rest_agg_trades)      # done by BinanceClient
+        records = hub.get_records('BTCUSDT', 1000) # None while cold
+    """
+
+    def __init__(self, stream_url: str = BINANCE_STREAM_URL, capacity: int = 1000,
+                 max_symbols: int = 200, reconnect_delay: float = 5.0):
+        """
+        Initialize trade stream hub
+
+        Args:
+            stream_url: Base WebSocket URL (point at BinanceReplayServer offline)
+            capacity: Aggregate trades kept per symbol
+            max_symbols: Maximum monitored symbols (least recently read is dropped)
+            reconnect_delay: Seconds to wait before reconnecting a dropped stream
+        """
+        self.stream_url = stream_url.rstrip('/')
+        self.capacity = capacity
+        self.max_symbols = min(max_symbols, 1024)
+        self.reconnect_delay = reconnect_delay
+
+        self._rings: 'OrderedDict[str, AggTradeRing]' = OrderedDict()  # LRU by last read
+        self._lock = threading.Lock()
+
+        # Streams the open connection is subscribed to (loop thread only)
+        self._websocket = None
+        self._live_streams = set()
+        self._request_id = 0
+        self.connected = False
+
+        self._loop = None
+        self._thread = None
+        self._ready = threading.Event()
+        self.running = False
+
+        logger.info(f"Trade stream hub initialized ({self.stream_url}, {capacity} trades x {max_symbols} symbols)")
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the hub event loop and its stream connection"""
+        if self.running:
+            return False
+
+        self.running = True
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run_loop, name='trade-streams', daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=5)
+        asyncio.run_coroutine_threadsafe(self._run_connection(), self._loop)
+
+        logger.info("✅ Trade stream hub started")
+        return True
+
+    def stop(self):
+        """Close the stream connection and stop the event loop"""
+        if not self.running:
+            return False
+
+        self.running = False
+        if self._loop:
+            self._loop.call_soon_threadsafe(
+                lambda: asyncio.ensure_future(_cancel_tasks_and_stop(self._loop), loop=self._loop)
+            )
+        if self._thread:
+            self._thread.join(timeout=5)
+
+        with self._lock:
+            self.connected = False
+            for ring in self._rings.values():
+                ring.warm = False
+                ring.awaiting_stream = False
+
+        logger.info("⛔ Trade stream hub stopped")
+        return True
+
+    def _run_loop(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+            self._loop = None
+
+    # ------------------------------------------------------------------
+    # Tracking
+    # ------------------------------------------------------------------
+
+    def track(self, symbols: Iterable[str]) -> int:
+        """
+        Monitor symbols (subscribe their aggTrade streams)
+
+        Returns:
+            Number of newly tracked symbols
+        """
+        new = 0
+        with self._lock:
+            for symbol in symbols:
+                symbol = symbol.upper()
+                if symbol in self._rings:
+                    self._rings.move_to_end(symbol)
+                    continue
+                self._rings[symbol] = AggTradeRing(self.capacity)
+                new += 1
+            while len(self._rings) > self.max_symbols:
+                self._rings.popitem(last=False)
+
+        if new:
+            self._request_sync()
+            logger.info(f"Trade hub tracking {new} new symbols ({len(self._rings)} total)")
+        return new
+
+    def untrack(self, symbol: str):
+        """Stop monitoring a symbol"""
+        with self._lock:
+            removed = self._rings.pop(symbol.upper(), None)
+        if removed is not None:
+            self._request_sync()
+
+    def is_tracked(self, symbol: str) -> bool:
+        return symbol.upper() in self._rings
+
+    def _request_sync(self):
+        if self.running and self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._sync_subscriptions(), self._loop)
+
+    async def _sync_subscriptions(self):
+        """Bring the open connection's subscriptions in line with the tracked symbols"""
+        websocket = self._websocket
+        if websocket is None:
+            return  # Picked up on (re)connect
+
+        with self._lock:
+            wanted = {agg_trade_stream_name(s) for s in self._rings}
+        for method, streams in (('UNSUBSCRIBE', self._live_streams - wanted),
+                                ('SUBSCRIBE', wanted - self._live_streams)):
+            if not streams:
+                continue
+            self._request_id += 1
+            await websocket.send(json.dumps({'method': method, 'params': sorted(streams),
+                                             'id': self._request_id}))
+            if method == 'SUBSCRIBE':
+                self._live_streams |= streams
+            else:
+                self._live_streams -= streams
+
+    # ------------------------------------------------------------------
+    # Stream maintenance
+    # ------------------------------------------------------------------
+
+    async def _run_connection(self):
+        """Keep the combined aggTrade connection alive, reconnecting on failure"""
+        while self.running:
+            try:
+                async with websockets.connect(f"{self.stream_url}/stream", max_size=None) as websocket:
+                    self._websocket = websocket
+                    self._live_streams = set()
+                    await self._sync_subscriptions()
+                    with self._lock:
+                        self.connected = True
+                    logger.info(f"🔌 Trade hub connection up ({len(self._live_streams)} streams)")
+
+                    async for message in websocket:
+                        self._handle_message(message)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Trade hub connection error: {e}")
+            finally:
+                # Missed trades are possible from here on - force a REST re-seed
+                self._websocket = None
+                with self._lock:
+                    self.connected = False
+                    for ring in self._rings.values():
+                        ring.warm = False
+                        ring.awaiting_stream = False
+
+            if self.running:
+                await asyncio.sleep(self.reconnect_delay)
+
+    def _handle_message(self, message):
+        """Append one streamed aggregate trade to its ring"""
+        try:
+            payload = json.loads(message)
+            data = payload.get('data', payload)
+            if data.get('e') != 'aggTrade':
+                return
+            self.apply_agg_trade(data['s'], data)
+        except Exception as e:
+            logger.debug(f"Trade hub could not parse message: {e}")
+
+    def apply_agg_trade(self, symbol: str, trade: Dict):
+        """
+        Append one aggregate trade; a skipped id marks the ring cold, the
+        first trade following a seed marks it warm
+        """
+        with self._lock:
+            ring = self._rings.get(symbol.upper())
+            if ring is None:
+                return
+            trade_id = int(trade['a'])
+            if trade_id <= ring.last_id:
+                return  # Already held (seed / stream overlap)
+            if ring.last_id >= 0 and trade_id != ring.last_id + 1:
+                ring.warm = False
+                ring.awaiting_stream = False
+                logger.debug(f"Trade hub gap on {symbol}, waiting for re-seed")
+            elif ring.awaiting_stream:
+                ring.warm = self.connected
+                ring.awaiting_stream = False
+            ring.extend(agg_trades_to_records([trade]))
+
+    def seed(self, symbol: str, agg_trades: List[Dict], complete: bool = False):
+        """
+        Seed a ring with REST aggTrades (oldest first)
+
+        Trades streamed in after the snapshot are kept when they join up with
+        it, so a snapshot/stream race loses nothing. Until a streamed trade
+        has joined up the ring stays cold: the symbol's SUBSCRIBE may not be
+        live yet, and trades made before it is would be missing.
+
+        Args:
+            complete: The snapshot is the symbol's whole history (REST returned
+                fewer trades than requested), so short rings can still serve
+        """
+        if not agg_trades:
+            return
+
+        records = agg_trades_to_records(agg_trades)
+        with self._lock:
+            ring = self._rings.get(symbol.upper())
+            if ring is None:
+                return
+
+            streamed = ring.latest()
+            snapshot_last = int(records['a'][-1])
+            newer = streamed[streamed['a'] > snapshot_last]
+            contiguous = len(newer) == 0 or (
+                newer['a'][0] == snapshot_last + 1 and np.all(np.diff(newer['a']) == 1)
+            )
+
+            ring.clear()
+            ring.extend(records)
+            if contiguous:
+                ring.extend(newer)
+            ring.complete = complete
+            ring.warm = self.connected and contiguous and len(newer) > 0
+            ring.awaiting_stream = self.connected and contiguous and len(newer) == 0
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get_records(self, symbol: str, limit: int = 1000) -> Optional[np.ndarray]:
+        """
+        Newest `limit` aggregate trades as AGG_TRADE_DTYPE records, or None if cold
+
+        Reading a ring marks it recently used.
+        """
+        symbol = symbol.upper()
+        with self._lock:
+            ring = self._rings.get(symbol)
+            if ring is None or not ring.warm or (len(ring) < limit and not ring.complete):
+                return None
+            self._rings.move_to_end(symbol)
+            return ring.latest(limit)
+
+    def get_stats(self) -> Dict:
+        """Hub statistics for logging / status commands"""
+        with self._lock:
+            return {
+                'running': self.running,
+                'connected': self.connected,
+                'symbols': len(self._rings),
+                'warm': sum(1 for r in self._rings.values() if r.warm),
+            }
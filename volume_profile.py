@@ -17,6 +17,8 @@ import numpy as np
 import logging
 from typing import Dict, List, Optional, Tuple
 
+from candles import Candles
+
 logger = logging.getLogger(__name__)
 
 
@@ -61,16 +63,12 @@ class VolumeProfileAnalyzer:
                 logger.warning("Insufficient data for volume profile")
                 return None
             
-            # Ensure numeric types
-            df = df.copy()
-            df['high'] = pd.to_numeric(df['high'], errors='coerce')
-            df['low'] = pd.to_numeric(df['low'], errors='coerce')
-            df['close'] = pd.to_numeric(df['close'], errors='coerce')
-            df['volume'] = pd.to_numeric(df['volume'], errors='coerce')
+            # Typed column views (no copy for get_klines() frames)
+            candles = Candles.from_frame(df)
             
             # Get price range
-            price_high = float(df['high'].max())
-            price_low = float(df['low'].min())
+            price_high = float(np.nanmax(candles.high))
+            price_low = float(np.nanmin(candles.low))
             price_range = price_high - price_low
             
             if price_range <= 0:
@@ -84,12 +82,9 @@ class VolumeProfileAnalyzer:
             volume_at_levels = np.zeros(self.profile_levels)
             
             # Distribute volume across price levels
-            for idx, row in df.iterrows():
-                bar_high = float(row['high'])
-                bar_low = float(row['low'])
-                bar_volume = float(row['volume'])
-                
-                if pd.isna(bar_volume) or bar_volume <= 0:
+            for bar_high, bar_low, bar_volume in zip(candles.high.tolist(), candles.low.tolist(),
+                                                     candles.volume.tolist()):
+                if np.isnan(bar_volume) or bar_volume <= 0:
                     continue
                 
                 # Find which levels this bar touches
@@ -141,7 +136,7 @@ class VolumeProfileAnalyzer:
             val = price_low + (level_below_poc + 0.0) * price_step
             
             # Calculate statistics
-            total_traded_volume = float(df['volume'].sum())
+            total_traded_volume = float(np.nansum(candles.volume))
             num_bars = len(df)
             avg_volume_per_bar = total_traded_volume / num_bars if num_bars > 0 else 0
             
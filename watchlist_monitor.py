@@ -138,6 +138,9 @@ class WatchlistMonitor:
             
             logger.info(f"Checking {len(symbols)} watchlist symbols for signals...")
             
+            # Stream watchlist candles so repeated checks read from memory instead of REST
+            self.command_handler.binance.subscribe_klines(symbols, self.command_handler._config.TIMEFRAMES)
+            
             new_signals = []
             
             for symbol in symbols: